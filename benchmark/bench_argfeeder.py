@@ -0,0 +1,169 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2012  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Bind the arguments of every shell method of the core addons, once with the
+previous per call introspection of ArgFeeder.checkArgs and once with its
+compiled binding plan.
+
+usage: python benchmark/bench_argfeeder.py [iteration_count]
+"""
+
+import sys
+import time
+
+from pyshell.arg.argfeeder import ArgFeeder
+from pyshell.arg.exception import ArgException
+from pyshell.command.command import UniCommand
+from pyshell.command.engine import EngineV3
+from pyshell.control import ControlCenter
+
+ADDONS = ("pyshell.addons.addon",
+          "pyshell.addons.formatedprint",
+          "pyshell.addons.parameter",
+          "pyshell.addons.procedure",
+          "pyshell.addons.std",
+          "pyshell.addons.system",)
+
+CANDIDATE_ARGS = ([], ["1"], ["1", "2"], ["1", "2", "3"],)
+
+
+def legacyCheckArgs(feeder, args_list, mapped_args={}, engine=None):
+    "the ArgFeeder.checkArgs implementation before the binding plan"
+
+    if not hasattr(args_list, "__iter__"):
+        args_list = (args_list,)
+
+    ret = {}
+    arg_checker_index = 0
+    data_index = 0
+
+    for (name, checker) in feeder.arg_type_list.items():
+        checker.setEngine(engine)
+
+        if name in mapped_args:
+            ret[name] = feeder.manageMappedArg(name,
+                                               checker,
+                                               mapped_args[name])
+            arg_checker_index += 1
+            continue
+
+        if checker.getMinimumSize() is not None:
+            if len(args_list[data_index:]) < checker.getMinimumSize():
+                if len(args_list[data_index:]) == 0:
+                    break
+                else:
+                    raise ArgException("(ArgFeeder) not enough data for "
+                                       "the argument '"+name+"'")
+
+        if checker.getMaximumSize() is None:
+            ret[name] = checker.getValue(args_list[data_index:],
+                                         data_index,
+                                         name)
+            data_index = len(args_list)
+        else:
+            if (checker.getMinimumSize() is not None and
+               checker.getMinimumSize() == checker.getMaximumSize() == 1):
+                max_index = data_index+checker.getMaximumSize()
+                value = args_list[data_index:max_index][0]
+            else:
+                max_index = data_index+checker.getMaximumSize()
+                value = args_list[data_index:max_index]
+
+            ret[name] = checker.getValue(value, data_index, name)
+            data_index += checker.getMaximumSize()
+
+        arg_checker_index += 1
+
+    items_list = list(feeder.arg_type_list.items())
+    for i in range(arg_checker_index, len(feeder.arg_type_list)):
+        (name, checker) = items_list[i]
+        checker.setEngine(engine)
+
+        if name in mapped_args:
+            ret[name] = feeder.manageMappedArg(name,
+                                               checker,
+                                               mapped_args[name])
+            continue
+
+        if not checker.hasDefaultValue(name):
+            raise ArgException("(ArgFeeder) some arguments aren't "
+                               "bounded, missing data : '"+name+"'")
+
+        ret[name] = checker.getDefaultValue(name)
+
+    return ret
+
+
+def collectCalls(engine):
+    "every (feeder, args) couple of the addon methods that can be bound"
+
+    calls = []
+    for addon in ADDONS:
+        module = __import__(addon, fromlist=["_loaders"], level=0)
+        for name, value in sorted(vars(module).items()):
+            feeder = getattr(value, "checker", None)
+            if not isinstance(feeder, ArgFeeder):
+                continue
+
+            for args in CANDIDATE_ARGS:
+                try:
+                    feeder.checkArgs(args, {}, engine)
+                except Exception:
+                    continue
+
+                calls.append((feeder, args,))
+
+    return calls
+
+
+def run(calls, engine, count, check_args):
+    start = time.time()
+    for i in range(0, count):
+        for feeder, args in calls:
+            check_args(feeder, args, {}, engine)
+
+    return time.time() - start
+
+
+def main(count):
+    engine = EngineV3([UniCommand(process=lambda: None)],
+                      [[]],
+                      [[{}, {}, {}]],
+                      ControlCenter())
+    calls = collectCalls(engine)
+
+    legacy = run(calls, engine, count, legacyCheckArgs)
+    plan = run(calls, engine, count, ArgFeeder.checkArgs)
+
+    print("%10s %12s %12s %12s" % ("bindings",  # noqa
+                                   "legacy (us)",
+                                   "plan (us)",
+                                   "speedup"))
+    total = float(len(calls) * count)
+    print("%10d %12.3f %12.3f %12.2f" % (len(calls),  # noqa
+                                         legacy / total * 1000000.0,
+                                         plan / total * 1000000.0,
+                                         legacy / plan))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main(2000)
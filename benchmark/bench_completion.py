@@ -0,0 +1,96 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2012  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Drive the completer the way readline does, one call per candidate index
+until None is returned, with and without the completion cache, then print
+the throughput of both in completed lines per second.
+
+usage: python benchmark/bench_completion.py [line_count]
+"""
+
+import sys
+import time
+
+from pyshell.command.registry import CommandRegistry
+from pyshell.utils.completion import CompletionEngine
+from pyshell.utils.completion import computeCandidates
+
+LINES = ("",
+         "co",
+         "context ",
+         "context g",
+         "addon ",
+         "group12 ",
+         "group12 command1",
+         "var set ")
+
+
+def buildRegistry():
+    registry = CommandRegistry()
+    for name in ("context", "environment", "var", "addon", "parameter",):
+        for action in ("get", "set", "list", "create", "remove", "unset",):
+            registry.insert((name, action,), None)
+
+    for group in range(0, 50):
+        for command in range(0, 10):
+            registry.insert(("group%d" % group, "command%d" % command,),
+                            None)
+
+    return registry
+
+
+def completeCached(engine, line, registry):
+    index = 0
+    while engine.complete(line, len(line), registry, index) is not None:
+        index += 1
+
+
+def completeUncached(engine, line, registry):
+    index = 0
+    while True:
+        candidates = computeCandidates(line, registry)
+        if index >= len(candidates):
+            break
+        index += 1
+
+
+def run(count, completer):
+    registry = buildRegistry()
+    engine = CompletionEngine()
+    lines = [LINES[i % len(LINES)] for i in range(0, count)]
+
+    start = time.time()
+    for line in lines:
+        completer(engine, line, registry)
+    return time.time() - start
+
+
+def main(count):
+    print("%14s %10s %16s" % ("completer", "lines", "lines/sec"))  # noqa
+    for name, completer in (("cached", completeCached,),
+                            ("uncached", completeUncached,),):
+        duration = run(count, completer)
+        print("%14s %10d %16.0f" % (name, count, count / duration))  # noqa
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main(2000)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2012  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Compare the latency of a job executed by a cold started shell with the
+latency of the same job sent to a warm daemon, either by a client process
+or by a client living in the benchmark process.
+
+usage: python benchmark/bench_daemon.py [job_count]
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from pyshell.daemonclient import DaemonClient
+
+COMMAND = "echo hello world"
+
+
+def coldStart(directory, count):
+    script = os.path.join(directory, "script.pys")
+    with open(script, "w") as script_file:
+        script_file.write(COMMAND + "\n")
+
+    with open(os.devnull, "w") as devnull:
+        start = time.time()
+        for i in range(0, count):
+            subprocess.call([sys.executable, "-m", "pyshell",
+                             "-p", directory,
+                             "-s", script],
+                            stdout=devnull,
+                            stderr=devnull)
+        return time.time() - start
+
+
+def clientProcess(socket_path, count):
+    with open(os.devnull, "w") as devnull:
+        start = time.time()
+        for i in range(0, count):
+            subprocess.call([sys.executable, "-m", "pyshell",
+                             "-c", socket_path,
+                             COMMAND],
+                            stdout=devnull,
+                            stderr=devnull)
+        return time.time() - start
+
+
+def inProcessClient(socket_path, count):
+    start = time.time()
+    for i in range(0, count):
+        with DaemonClient(socket_path) as client:
+            client.execute(COMMAND)
+    return time.time() - start
+
+
+def startDaemon(directory, socket_path):
+    with open(os.devnull, "w") as devnull:
+        daemon = subprocess.Popen([sys.executable, "-m", "pyshell",
+                                   "-p", directory,
+                                   "-d", socket_path],
+                                  stdout=devnull,
+                                  stderr=devnull)
+
+    for i in range(0, 200):
+        if os.path.exists(socket_path):
+            return daemon
+        time.sleep(0.05)
+
+    daemon.kill()
+    raise Exception("the daemon did not start")
+
+
+def main(count):
+    directory = tempfile.mkdtemp()
+    socket_path = os.path.join(directory, "daemon.sock")
+    daemon = None
+
+    try:
+        results = [("cold start", coldStart(directory, count),)]
+
+        daemon = startDaemon(directory, socket_path)
+        results.append(("client process",
+                        clientProcess(socket_path, count),))
+        results.append(("in process", inProcessClient(socket_path, count),))
+    finally:
+        if daemon is not None:
+            daemon.terminate()
+            daemon.wait()
+        shutil.rmtree(directory)
+
+    print("%16s %10s %16s" % ("execution", "jobs", "ms/job"))  # noqa
+    for name, duration in results:
+        latency = duration * 1000 / count
+        print("%16s %10d %16.2f" % (name, count, latency))  # noqa
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main(20)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2012  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Print a growing amount of byte lists with printBytesAsString, once with
+the data by data post process and once with its bunch implementation.
+
+usage: python benchmark/bench_engine_bunch.py [item_count]
+"""
+
+import os
+import sys
+import time
+
+from pyshell.arg.decorator import shellMethod
+from pyshell.command.command import MultiOutput
+from pyshell.command.command import UniCommand
+from pyshell.command.engine import EngineV3
+from pyshell.utils.postprocess import printBytesAsString
+
+
+@shellMethod(byte_list=printBytesAsString.checker.arg_type_list["byte_list"])
+def printBytesAsStringByData(byte_list):
+    return printBytesAsString(byte_list)
+
+
+def run(count, post_process):
+    @shellMethod()
+    def generate():
+        return MultiOutput([[0x25, 0x42, 0xFF]] * count)
+
+    first = UniCommand(pre_process=generate, post_process=post_process)
+    engine = EngineV3([first], [None], [[{}, {}, {}]])
+    engine.setInjectionLimit(0)
+
+    # drop the printed lines, only the engine and the printer are measured
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        start = time.time()
+        engine.execute()
+        return time.time() - start
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+
+def main(count):
+    print("%10s %12s %12s" % ("items", "by data (s)", "bunch (s)"))  # noqa
+    print("%10d %12.3f %12.3f" % (count,  # noqa
+                                  run(count, printBytesAsStringByData),
+                                  run(count, printBytesAsString)))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main(100000)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2012  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Execute "range 0 N | identity" for a growing N and print the time to the
+first output, the total time and the memory peak (if tracemalloc is
+available).  With lazy outputs, the time to the first output and the
+memory peak must not depend on N.
+
+usage: python benchmark/bench_engine_lazy.py [max_power_of_ten]
+"""
+
+import sys
+import time
+
+from pyshell.addons.std import generator
+from pyshell.arg.checker.default import DefaultChecker
+from pyshell.arg.decorator import shellMethod
+from pyshell.command.command import UniCommand
+from pyshell.command.engine import EngineV3
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+def run(count):
+    first_output = []
+
+    @shellMethod(value=DefaultChecker.getArg())
+    def identity(value):
+        if len(first_output) == 0:
+            first_output.append(time.time())
+        return value
+
+    @shellMethod()
+    def generate():
+        return generator(0, count, 1, True)
+
+    first = UniCommand(pre_process=generate)
+    second = UniCommand(process=identity, post_process=identity)
+    engine = EngineV3([first, second],
+                      [None, None],
+                      [[{}, {}, {}], [{}, {}, {}]])
+    engine.setInjectionLimit(0)
+
+    if tracemalloc is not None:
+        tracemalloc.start()
+
+    start = time.time()
+    engine.execute()
+    duration = time.time() - start
+
+    peak = 0
+    if tracemalloc is not None:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return first_output[0] - start, duration, peak
+
+
+def main(max_power):
+    print("%10s %16s %12s %14s" % ("items",  # noqa
+                                   "first output (s)",
+                                   "total (s)",
+                                   "peak (KiB)"))
+    for power in range(3, max_power + 1):
+        count = 10 ** power
+        first, duration, peak = run(count)
+        print("%10d %16.6f %12.3f %14.1f" % (count,  # noqa
+                                             first,
+                                             duration,
+                                             peak / 1024.0))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main(5)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2012  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Execute a latency bound process (a sleep of one millisecond per data),
+once sequentially and once as a parallel process with growing pool sizes.
+
+usage: python benchmark/bench_engine_parallel.py [item_count]
+"""
+
+import sys
+import time
+
+from pyshell.arg.checker.default import DefaultChecker
+from pyshell.arg.decorator import shellMethod
+from pyshell.command.command import MultiOutput
+from pyshell.command.command import UniCommand
+from pyshell.command.engine import EngineV3
+
+
+@shellMethod(arg=DefaultChecker.getInteger())
+def resolve(arg):
+    time.sleep(0.001)
+    return arg
+
+
+def run(count, pool_size, parallel):
+    @shellMethod()
+    def generate():
+        return MultiOutput(list(range(0, count)))
+
+    # the data reach a process data by data from the previous command, the
+    # bunch to dispatch has to come from the preProcess of the same command
+    cmd = UniCommand(pre_process=generate, process=resolve, parallel=parallel)
+    engine = EngineV3([cmd], [None], [[{}, {}, {}]])
+    engine.setPoolSize(pool_size)
+
+    start = time.time()
+    engine.execute()
+    return time.time() - start
+
+
+def main(count):
+    print("%10s %10s %12s" % ("items", "workers", "time (s)"))  # noqa
+    print("%10d %10s %12.3f" % (count,  # noqa
+                                "none",
+                                run(count, 1, False)))
+    for pool_size in (2, 4, 8, 16,):
+        print("%10d %10d %12.3f" % (count,  # noqa
+                                    pool_size,
+                                    run(count, pool_size, True)))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main(1000)
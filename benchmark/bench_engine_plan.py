@@ -0,0 +1,95 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2012  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Execute some static pipelines with the straight line plan and with the
+stack machine, then print the time spent per item for both.
+
+usage: python benchmark/bench_engine_plan.py [item_count]
+"""
+
+import sys
+import time
+
+from pyshell.arg.checker.default import DefaultChecker
+from pyshell.arg.decorator import shellMethod
+from pyshell.command.command import MultiOutput
+from pyshell.command.command import UniCommand
+from pyshell.command.engine import EngineV3
+
+
+@shellMethod(value=DefaultChecker.getArg())
+def identity(value):
+    return value
+
+
+def generator(count):
+    @shellMethod()
+    def generate():
+        return MultiOutput(range(0, count))
+
+    return generate
+
+
+def pipeOfTwo(count):
+    # generator | identity
+    return [UniCommand(pre_process=generator(count)),
+            UniCommand(process=identity, post_process=identity)]
+
+
+def pipeOfFour(count):
+    # generator | identity | identity | identity
+    cmd_list = [UniCommand(pre_process=generator(count))]
+    for i in range(0, 3):
+        cmd_list.append(UniCommand(identity, identity, identity))
+
+    return cmd_list
+
+
+def run(cmd_list, static_plan):
+    engine = EngineV3(cmd_list,
+                      [None] * len(cmd_list),
+                      [[{}, {}, {}]] * len(cmd_list))
+    engine.setInjectionLimit(0)
+    engine.setStaticPlanEnabled(static_plan)
+
+    start = time.time()
+    engine.execute()
+    return time.time() - start
+
+
+def main(count):
+    print("%14s %10s %16s %16s" % ("pipeline",  # noqa
+                                   "items",
+                                   "static (us/item)",
+                                   "stack (us/item)"))
+    for name, builder in (("two commands", pipeOfTwo,),
+                          ("four commands", pipeOfFour,),):
+        static_duration = run(builder(count), True)
+        stack_duration = run(builder(count), False)
+        print("%14s %10d %16.3f %16.3f" % (name,  # noqa
+                                           count,
+                                           static_duration * 1000000.0 / count,
+                                           stack_duration * 1000000.0 / count))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main(50000)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2012  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Micro-benchmark of the engine stack: cost of the stack accessors and
+overhead per item of a complete engine execution.
+
+usage: python benchmark/bench_engine_stack.py [item_count]
+"""
+
+import sys
+import timeit
+
+from pyshell.arg.checker.default import DefaultChecker
+from pyshell.arg.decorator import shellMethod
+from pyshell.command.command import MultiOutput
+from pyshell.command.command import UniCommand
+from pyshell.command.engine import EngineV3
+from pyshell.command.stackEngine import EngineStack
+
+ACCESSOR_LOOP = 1000000
+
+stack = EngineStack()
+stack.push([1, 2, 3], [0, 0], 0, None)
+stack.push([4, 5, 6], [0, 1], 1, None)
+frame = stack.top()
+
+
+def benchAccessors():
+
+    statements = (("stack.dataOnTop()", "frame.data"),
+                  ("stack.subCmdIndexOnTop()", "frame.path[-1]"),
+                  ("stack.typeOnIndex(0)", "stack[0].type"),
+                  ("stack.setTypeOnTop(1)", "frame.type = 1"),)
+
+    print("%-28s %10s" % ("statement", "ns/call"))  # noqa
+    for statement_list in statements:
+        for statement in statement_list:
+            timer = timeit.Timer(statement,
+                                 setup="from __main__ import stack, frame")
+            duration = timer.timeit(number=ACCESSOR_LOOP)
+            print("%-28s %10.1f" % (statement,  # noqa
+                                    duration * 1e9 / ACCESSOR_LOOP))
+
+
+@shellMethod(value=DefaultChecker.getArg())
+def identity(value):
+    return value
+
+
+def benchEngine(count):
+    @shellMethod()
+    def generate():
+        return MultiOutput(range(0, count))
+
+    first = UniCommand(pre_process=generate)
+    second = UniCommand(process=identity, post_process=identity)
+    engine = EngineV3([first, second],
+                      [None, None],
+                      [[{}, {}, {}], [{}, {}, {}]])
+
+    duration = timeit.timeit(engine.execute, number=1)
+    print("engine: %d items, %.3f s, %.2f us/item" % (  # noqa
+          count, duration, duration * 1e6 / count))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        item_count = int(sys.argv[1])
+    else:
+        item_count = 50000
+
+    benchAccessors()
+    benchEngine(item_count)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2012  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Stream a growing amount of data through a two commands pipe and print the
+time spent per item.  With a linear engine, the cost per item must stay
+roughly constant whatever the amount of data.
+
+usage: python benchmark/bench_engine_stream.py [max_power_of_ten]
+"""
+
+import sys
+import time
+
+from pyshell.arg.checker.default import DefaultChecker
+from pyshell.arg.decorator import shellMethod
+from pyshell.command.command import MultiOutput
+from pyshell.command.command import UniCommand
+from pyshell.command.engine import EngineV3
+
+
+@shellMethod(value=DefaultChecker.getArg())
+def identity(value):
+    return value
+
+
+def run(count):
+    @shellMethod()
+    def generate():
+        return MultiOutput(range(0, count))
+
+    first = UniCommand(pre_process=generate)
+    second = UniCommand(process=identity, post_process=identity)
+    engine = EngineV3([first, second],
+                      [None, None],
+                      [[{}, {}, {}], [{}, {}, {}]])
+    engine.setInjectionLimit(0)
+
+    start = time.time()
+    engine.execute()
+    return time.time() - start
+
+
+def main(max_power):
+    print("%10s %12s %14s" % ("items", "total (s)", "per item (us)"))  # noqa
+    for power in range(3, max_power + 1):
+        count = 10 ** power
+        duration = run(count)
+        print("%10d %12.3f %14.3f" % (count,  # noqa
+                                      duration,
+                                      duration * 1000000.0 / count))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main(6)
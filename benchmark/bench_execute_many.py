@@ -0,0 +1,109 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2012  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Execute a batch of printing command lines, once with one execute call per
+line and once with a single executeMany call, then print the throughput of
+both in lines per second.  The output of execute is sent to /dev/null.
+
+usage: python benchmark/bench_execute_many.py [line_count]
+"""
+
+import os
+import sys
+import time
+
+from pyshell.arg.checker.default import DefaultChecker
+from pyshell.arg.checker.list import ListArgChecker
+from pyshell.arg.decorator import shellMethod
+from pyshell.command.command import UniCommand
+from pyshell.command.registry import CommandRegistry
+from pyshell.system.manager.parent import ParentManager
+from pyshell.system.parameter.environment import EnvironmentParameter
+from pyshell.system.setting.environment import EnvironmentGlobalSettings
+from pyshell.utils.constants import ENVIRONMENT_LEVEL_TRIES_KEY
+from pyshell.utils.executing import execute
+from pyshell.utils.executing import executeMany
+from pyshell.utils.printing import Printer
+from pyshell.utils.printing import printShell
+
+LINES = ("cmd a",
+         "cmd a b c d",
+         "other cmd 1 2 3",
+         "cmd $var",
+         "other cmd -flag value")
+
+
+@shellMethod(args=ListArgChecker(DefaultChecker.getArg()))
+def command(args):
+    printShell(" ".join(args))
+    return args
+
+
+def prepare():
+    registry = CommandRegistry()
+    registry.insert(("cmd",), UniCommand(command))
+    registry.insert(("other", "cmd",), UniCommand(command))
+
+    params = ParentManager()
+    params.getEnvironmentManager().setParameter(
+        ENVIRONMENT_LEVEL_TRIES_KEY,
+        EnvironmentParameter(
+            value=registry,
+            settings=EnvironmentGlobalSettings(
+                checker=DefaultChecker.getArg())),
+        local_param=False)
+    Printer.getInstance().setParameters(params)
+
+    return params
+
+
+def runExecute(params, lines):
+    for line in lines:
+        execute(line, params)
+
+
+def runExecuteMany(params, lines):
+    executeMany(lines, params)
+
+
+def main(count):
+    params = prepare()
+    lines = [LINES[i % len(LINES)] for i in range(0, count)]
+
+    print("%14s %10s %16s" % ("api", "lines", "lines/sec"))  # noqa
+    for name, run in (("execute", runExecute,),
+                      ("executeMany", runExecuteMany,),):
+        stdout = sys.stdout
+        with open(os.devnull, "w") as devnull:
+            sys.stdout = devnull
+            try:
+                start = time.time()
+                run(params, lines)
+                duration = time.time() - start
+            finally:
+                sys.stdout = stdout
+
+        print("%14s %10d %16.0f" % (name, count, count / duration))  # noqa
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main(20000)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2012  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Read the parameters of an environment manager from several threads at
+the same time, one thread updating a parameter in the meantime, once with
+the reader-writer lock of the manager and once with an exclusive lock,
+then print the lookups per second of both.
+
+usage: python benchmark/bench_parameter_contention.py [lookup_count]
+"""
+
+import sys
+import threading
+import time
+from threading import Lock
+
+from pyshell.system.manager.parent import ParentManager
+from pyshell.system.parameter.environment import EnvironmentParameter
+
+THREAD_COUNTS = (1, 4, 16, 32,)
+NAMES = ("shell.prompt",
+         "shell.levelTries",
+         "shell.tabsize",
+         "shell.useHistory",
+         "shell.historyFile",
+         "shell.executionTimeout",
+         "addon.std.value",
+         "addon.parameter.value",)
+
+
+class ExclusiveLock(object):
+    # the lock used by the managers before the reader-writer lock
+
+    def __init__(self):
+        # an odd version sends every reader to the lock
+        self.version = 1
+        self._lock = Lock()
+        self.acquire = self._lock.acquire
+        self.release = self._lock.release
+        self.acquireRead = self._lock.acquire
+        self.releaseRead = self._lock.release
+
+
+def prepare(exclusive):
+    params = ParentManager()
+    env = params.getEnvironmentManager()
+
+    if exclusive:
+        env._internalLock = ExclusiveLock()
+
+    for name in NAMES:
+        env.setParameter(name, EnvironmentParameter(name), local_param=False)
+
+    return env
+
+
+def reader(env, count):
+    for index in range(0, count):
+        env.getParameter(NAMES[index % len(NAMES)], local_param=False)
+
+
+def writer(env, stop):
+    value = 0
+    while not stop.is_set():
+        env.setParameter("addon.std.value",
+                         EnvironmentParameter(value),
+                         local_param=False)
+        value += 1
+        time.sleep(0.001)
+
+
+def run(env, thread_count, count):
+    per_thread = count // thread_count
+    threads = [threading.Thread(target=reader, args=(env, per_thread,))
+               for index in range(0, thread_count)]
+
+    stop = threading.Event()
+    updater = threading.Thread(target=writer, args=(env, stop,))
+    updater.start()
+
+    start = time.time()
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    duration = time.time() - start
+    stop.set()
+    updater.join()
+
+    return per_thread * thread_count / duration
+
+
+def main(count):
+    print("%8s %16s %16s" % ("threads",  # noqa
+                             "exclusive/sec",
+                             "shared/sec"))
+    for thread_count in THREAD_COUNTS:
+        exclusive = run(prepare(True), thread_count, count)
+        shared = run(prepare(False), thread_count, count)
+        print("%8d %16.0f %16.0f" % (thread_count,  # noqa
+                                     exclusive,
+                                     shared))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
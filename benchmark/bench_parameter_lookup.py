@@ -0,0 +1,107 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2012  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Look up the ten parameters read on each command execution with a perfect
+match, once with their canonical name, solved with the exact name index,
+and once with a leading dot, solved with the mltries, then print the
+lookups per second of both.
+
+usage: python benchmark/bench_parameter_lookup.py [lookup_count]
+"""
+
+import sys
+import time
+
+from pyshell.system.manager.parent import ParentManager
+from pyshell.utils.constants import CONTEXT_COLORATION_KEY
+from pyshell.utils.constants import CONTEXT_EXECUTION_KEY
+from pyshell.utils.constants import CONTEXT_PROFILING_KEY
+from pyshell.utils.constants import DEBUG_ENVIRONMENT_NAME
+from pyshell.utils.constants import ENVIRONMENT_EXECUTION_TIMEOUT_KEY
+from pyshell.utils.constants import ENVIRONMENT_INJECTION_LIMIT_KEY
+from pyshell.utils.constants import ENVIRONMENT_LEVEL_TRIES_KEY
+from pyshell.utils.constants import ENVIRONMENT_PARSER_CACHE_SIZE_KEY
+from pyshell.utils.constants import ENVIRONMENT_POOL_SIZE_KEY
+from pyshell.utils.constants import ENVIRONMENT_TAB_SIZE_KEY
+
+ENVIRONMENT_NAMES = (ENVIRONMENT_LEVEL_TRIES_KEY,
+                     ENVIRONMENT_PARSER_CACHE_SIZE_KEY,
+                     ENVIRONMENT_EXECUTION_TIMEOUT_KEY,
+                     ENVIRONMENT_INJECTION_LIMIT_KEY,
+                     ENVIRONMENT_POOL_SIZE_KEY,
+                     ENVIRONMENT_TAB_SIZE_KEY,)
+
+CONTEXT_NAMES = (CONTEXT_PROFILING_KEY,
+                 CONTEXT_COLORATION_KEY,
+                 CONTEXT_EXECUTION_KEY,
+                 DEBUG_ENVIRONMENT_NAME,)
+
+# the other parameters of the managers, they share the prefix of the
+# lookups as the parameters of the addons do
+OTHER_COUNT = 100
+
+
+def prepare():
+    params = ParentManager()
+    env = params.getEnvironmentManager()
+    context = params.getContextManager()
+
+    for name in ENVIRONMENT_NAMES:
+        env.setParameter(name, 0, local_param=False)
+
+    for name in CONTEXT_NAMES:
+        context.setParameter(name, (0, 1,), local_param=False)
+
+    for index in range(0, OTHER_COUNT):
+        env.setParameter("%s%d" % (ENVIRONMENT_NAMES[0], index,),
+                         0,
+                         local_param=False)
+        context.setParameter("%s%d" % (CONTEXT_NAMES[0], index,),
+                             (0, 1,),
+                             local_param=False)
+
+    lookups = [(env, name,) for name in ENVIRONMENT_NAMES]
+    lookups.extend((context, name,) for name in CONTEXT_NAMES)
+    return lookups
+
+
+def run(lookups, count, prefix):
+    lookups = [(manager, prefix + name,) for manager, name in lookups]
+    start = time.time()
+
+    for index in range(0, count):
+        manager, name = lookups[index % len(lookups)]
+        if manager.getParameter(name, perfect_match=True) is None:
+            raise Exception("parameter '%s' not found" % name)
+
+    return count / (time.time() - start)
+
+
+def main(count):
+    lookups = prepare()
+
+    print("%10s %10s %16s" % ("lookup", "count", "lookups/sec"))  # noqa
+    for name, prefix in (("mltries", ".",), ("index", "",),):
+        print("%10s %10d %16.0f" % (name,  # noqa
+                                    count,
+                                    run(lookups, count, prefix)))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2012  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Parse a set of representative command lines with the tokenizer and with
+the character by character parser, then print the throughput of both in
+lines per second.
+
+usage: python benchmark/bench_parser.py [line_count]
+"""
+
+import sys
+import time
+
+from pyshell.utils.parsing import Parser
+
+LINES = ("help",
+         "echo hello world",
+         "var set -key my_var -values 1 2 3 4",
+         "context get execution | echo $var &",
+         "echo \"quoted string with | pipe\" and\\ escaped\\ spaces",
+         "parameter list environment | printColumn",
+         "procedure create -file /tmp/some/file.ps -name proc",
+         "echo $a $b $c -1.5 -flag | grep abc | wc")
+
+
+def run(count, by_character):
+    lines = [LINES[i % len(LINES)] for i in range(0, count)]
+
+    start = time.time()
+    for line in lines:
+        Parser(line).parse(by_character)
+    return time.time() - start
+
+
+def main(count):
+    print("%14s %10s %16s" % ("parser", "lines", "lines/sec"))  # noqa
+    for name, by_character in (("tokenizer", False,),
+                               ("character", True,),):
+        duration = run(count, by_character)
+        print("%14s %10d %16.0f" % (name, count, count / duration))  # noqa
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main(100000)
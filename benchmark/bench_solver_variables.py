@@ -0,0 +1,120 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2012  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Expand lines holding many variables with long list values, once with the
+previous Solver._solveVariables, one list rebuild and one locked lookup
+per variable, and once with the single pass expansion.
+
+usage: python benchmark/bench_solver_variables.py [iteration_count]
+"""
+
+import sys
+import time
+
+from pyshell.system.manager.parent import ParentManager
+from pyshell.system.manager.variable import VariableParameterManager
+from pyshell.system.parameter.variable import VariableParameter
+from pyshell.utils.parsing import Parser
+from pyshell.utils.solving import Solver
+from pyshell.utils.solving import _addValueToIndex
+
+# (variable count in the line, value count in each variable)
+CASES = ((4, 1,), (4, 64,), (32, 1,), (32, 64,), (128, 16,),)
+
+
+class LegacySolver(Solver):
+    "the Solver._solveVariables implementation before the single pass"
+
+    def _solveVariables(self, token_list, arg_spotted, param_spotted):
+        if len(arg_spotted) == 0:
+            return token_list
+
+        token_list = list(token_list)
+        index_correction = 0
+
+        for arg_index in arg_spotted:
+            arg_index += index_correction
+            string_token = token_list[arg_index][1:]
+            del token_list[arg_index]
+
+            var = self.variables_container.getParameter(string_token)
+            if var is None:
+                var_size = 0
+            else:
+                values = var.getValue()
+                pre_list = token_list[0:arg_index]
+                post_list = token_list[arg_index:]
+                token_list = pre_list + values + post_list
+                var_size = len(values)
+
+            if var_size != 1:
+                index_correction += var_size-1
+                _addValueToIndex(param_spotted, arg_index+1, index_correction)
+
+        return token_list
+
+
+def prepare(var_count, value_count):
+    variables = VariableParameterManager(ParentManager())
+    tokens = ["cmd"]
+    for i in range(0, var_count):
+        name = "var%d" % i
+        variables.setParameter(name,
+                               VariableParameter(list(range(0, value_count))))
+        tokens.append("$"+name)
+        tokens.append("-p%d" % i)
+
+    parser = Parser(" ".join(tokens))
+    parser.parse()
+    return parser[0], variables
+
+
+def run(solver, line, variables, count):
+    token_list, arg_spotted, param_spotted = line
+    solver.variables_container = variables
+
+    start = time.time()
+    for i in range(0, count):
+        solver._solveVariables(token_list, arg_spotted, list(param_spotted))
+
+    return time.time() - start
+
+
+def main(count):
+    print("%6s %6s %12s %12s %8s" % ("vars",  # noqa
+                                     "values",
+                                     "legacy (us)",
+                                     "single (us)",
+                                     "speedup"))
+    for var_count, value_count in CASES:
+        line, variables = prepare(var_count, value_count)
+        legacy = run(LegacySolver(), line, variables, count)
+        single = run(Solver(), line, variables, count)
+        print("%6d %6d %12.3f %12.3f %8.2f" % (var_count,  # noqa
+                                               value_count,
+                                               legacy / count * 1000000.0,
+                                               single / count * 1000000.0,
+                                               legacy / single))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main(2000)
@@ -19,12 +19,12 @@
 import getopt
 import sys
 
-from pyshell.executer import CommandExecuter
+from pyshell.daemonclient import runClient
 
 
 def usage():
     print("\nexecuter.py [-h -p <parameter directory> -s <script file>"  # noqa
-          " -n -g <granularity integer>]")
+          " -n -g <granularity integer> -d <socket> -c <socket>]")
 
 
 def help():
@@ -34,17 +34,23 @@ def help():
           "-p, --parameter:   define a custom parameter directory\n"
           "-s, --script:      define a script to execute\n"
           "-n, --no-exit:     start the shell after the script\n"
-          "-g, --granularity: set the error granularity for file script\n")
+          "-g, --granularity: set the error granularity for file script\n"
+          "-d, --daemon:      serve the commands on a unix socket\n"
+          "-c, --client:      send the command line args, or the lines of\n"
+          "                   stdin if no arg, to a daemon\n")
 
 if __name__ == "__main__":
     # manage args
     opts = ()
     try:
-        opts, args = getopt.getopt(sys.argv[1:], "hp:s:ng:", ["help",
-                                                              "parameter=",
-                                                              "script=",
-                                                              "no-exit",
-                                                              "granularity="])
+        opts, args = getopt.getopt(sys.argv[1:], "hp:s:ng:d:c:",
+                                   ["help",
+                                    "parameter=",
+                                    "script=",
+                                    "no-exit",
+                                    "granularity=",
+                                    "daemon=",
+                                    "client="])
     except getopt.GetoptError as err:
         # print help information and exit:
         # will print something like "option -a not recognized"
@@ -57,6 +63,8 @@ if __name__ == "__main__":
     ScriptFile = None
     ExitAfterScript = True
     Granularity = float("inf")
+    DaemonSocket = None
+    ClientSocket = None
 
     for o, a in opts:  # TODO test every args
         if o in ("-h", "--help"):
@@ -75,9 +83,25 @@ if __name__ == "__main__":
                 print("invalid value for granularity: "+str(ve))  # noqa
                 usage()
                 exit(-1)
+        elif o in ("-d", "--daemon"):
+            DaemonSocket = a
+        elif o in ("-c", "--client"):
+            ClientSocket = a
         else:
             print("unknown parameter: "+str(o))  # noqa
 
+    # the client does not need a shell instance, the daemon already holds one
+    if ClientSocket is not None:
+        if len(args) > 0:
+            lines = (" ".join(args),)
+        else:
+            lines = sys.stdin
+
+        sys.exit(runClient(ClientSocket, lines))
+
+    # imported here, a client process does not need to load the shell
+    from pyshell.executer import CommandExecuter
+
     # run basic instance
     executer = CommandExecuter(ParameterDirectory, args)
 
@@ -86,5 +110,7 @@ if __name__ == "__main__":
     else:
         ExitAfterScript = False
 
-    if not ExitAfterScript:
+    if DaemonSocket is not None:
+        executer.daemonLoop(DaemonSocket)
+    elif not ExitAfterScript:
         executer.mainLoop()
@@ -21,15 +21,19 @@ import readline
 
 from tries.exception import triesException
 
+from pyshell.arg.accessor.context import ContextAccessor
+from pyshell.arg.accessor.default import DefaultAccessor
 from pyshell.arg.accessor.environment import EnvironmentAccessor
 from pyshell.arg.checker.boolean import BooleanValueArgChecker
 from pyshell.arg.checker.default import DefaultChecker
+from pyshell.arg.checker.float import FloatArgChecker
 from pyshell.arg.checker.integer import IntegerArgChecker
 from pyshell.arg.checker.list import ListArgChecker
 from pyshell.arg.decorator import shellMethod
 from pyshell.command.command import MultiOutput
 from pyshell.register.command import registerCommand
 from pyshell.register.command import registerStopHelpTraversalAt
+from pyshell.utils.constants import CONTEXT_EXECUTION_KEY
 from pyshell.utils.constants import ENVIRONMENT_CONFIG_DIRECTORY_KEY
 from pyshell.utils.constants import ENVIRONMENT_HISTORY_FILE_NAME_KEY
 from pyshell.utils.constants import ENVIRONMENT_LEVEL_TRIES_KEY
@@ -40,8 +44,14 @@ from pyshell.utils.exception import DefaultPyshellException
 from pyshell.utils.exception import USER_ERROR
 from pyshell.utils.exception import USER_WARNING
 from pyshell.utils.exception import WARNING
+from pyshell.utils.executing import execute
+from pyshell.utils.executing import getJobManager
+from pyshell.utils.executing import getParserCache
+from pyshell.utils.executing import getSolverCache
+from pyshell.utils.parsing import buildCommandLine
 from pyshell.utils.postprocess import listFlatResultHandler
 from pyshell.utils.postprocess import listResultHandler
+from pyshell.utils.postprocess import printColumn
 
 # # FUNCTION SECTION # #
 
@@ -289,12 +299,167 @@ def helpFun(mltries, args=None):
              multi_output=BooleanValueArgChecker())
 def generator(start=0, stop=100, step=1, multi_output=True):
     "generate a list of integer"
+    if step == 0:
+        raise DefaultPyshellException("range step must not be zero",
+                                      USER_ERROR)
+
     if multi_output:
-        return MultiOutput(list(range(start, stop, step)))
+        # lazy output, the integers are produced when the next commands
+        # need them
+        return _rangeIterator(start, stop, step)
     else:
         return list(range(start, stop, step))
 
 
+def _rangeIterator(start, stop, step):
+    value = start
+    if step > 0:
+        while value < stop:
+            yield value
+            value += step
+    else:
+        while value > stop:
+            yield value
+            value += step
+
+
+@shellMethod(args=ListArgChecker(DefaultChecker.getString()),
+             parameters=DefaultAccessor.getContainer(),
+             tab_size=EnvironmentAccessor(ENVIRONMENT_TAB_SIZE_KEY),
+             con_execution=ContextAccessor(CONTEXT_EXECUTION_KEY))
+def profile(args, parameters, tab_size=None, con_execution=None):
+    "execute a command line and print the time spent in each command"
+    ex, engine = execute(buildCommandLine(args), parameters, profiling=True)
+
+    if engine is None:
+        if ex is not None:
+            raise ex
+
+        raise DefaultPyshellException("no profile available, the command "
+                                      "was not executed in this thread",
+                                      USER_WARNING)
+
+    table = engine.getProfiler().buildTable()
+
+    # the post process is not reached on failure, the profile of the
+    # executed part of the line is printed before the error
+    if ex is not None:
+        printColumn(table, tab_size, con_execution)
+        raise ex
+
+    return table
+
+
+@shellMethod(seconds=FloatArgChecker(0),
+             args=ListArgChecker(DefaultChecker.getString()),
+             parameters=DefaultAccessor.getContainer())
+def timeout(seconds, args, parameters):
+    "execute a command line with a time limit in seconds, 0 means no limit"
+    ex, engine = execute(buildCommandLine(args),
+                         parameters,
+                         timeout=seconds,
+                         collect_results=True)
+
+    if ex is not None:
+        raise ex
+
+    # nothing executed in this thread, e.g. an empty or a background line
+    if engine is None:
+        return MultiOutput()
+
+    # each result of the line is a data for the next command
+    return MultiOutput(engine.getResults())
+
+
+def _cacheStatistics(cache, clear):
+    size, count, hits, misses = cache.getStatistics()
+
+    if clear:
+        cache.clear()
+
+    return [("size", "entries", "hits", "misses",),
+            (str(size), str(count), str(hits), str(misses),)]
+
+
+@shellMethod(clear=BooleanValueArgChecker())
+def parserCacheStatistics(clear=False):
+    "print the usage statistics of the parsed command line cache"
+    return _cacheStatistics(getParserCache(), clear)
+
+
+@shellMethod(clear=BooleanValueArgChecker())
+def solverCacheStatistics(clear=False):
+    "print the usage statistics of the command resolution cache"
+    return _cacheStatistics(getSolverCache(), clear)
+
+
+def _jobTable(jobs):
+    lines = [("id", "status", "duration", "name", "command",)]
+    for job in jobs:
+        duration = job.getDuration()
+        if duration is None:
+            duration = "-"
+        else:
+            duration = "%.3fs" % duration
+
+        name = job.getName()
+        if name is None:
+            name = "-"
+
+        lines.append((str(job.getId()),
+                      job.getStatus(),
+                      duration,
+                      name,
+                      job.getCommand(),))
+
+    return lines
+
+
+@shellMethod(clean=BooleanValueArgChecker())
+def jobList(clean=False):
+    "list the background jobs"
+    manager = getJobManager()
+    jobs = manager.getJobs()
+
+    if clean:
+        manager.clear()
+
+    if len(jobs) == 0:
+        raise DefaultPyshellException("no job available", WARNING)
+
+    return _jobTable(jobs)
+
+
+@shellMethod(ids=ListArgChecker(IntegerArgChecker(1)),
+             timeout=FloatArgChecker(0))
+def jobWait(ids=None, timeout=None):
+    "wait the end of the background jobs, all of them if no id is given"
+    manager = getJobManager()
+
+    if ids is not None and len(ids) == 0:
+        ids = None
+
+    not_finished = manager.wait(ids, timeout)
+
+    if len(not_finished) > 0:
+        excmsg = "timeout reached, job(s) still running: %s"
+        excmsg %= ", ".join(str(job.getId()) for job in not_finished)
+        raise DefaultPyshellException(excmsg, USER_WARNING)
+
+    if ids is None:
+        return _jobTable(manager.getJobs())
+
+    return _jobTable(manager.getJob(job_id) for job_id in ids)
+
+
+@shellMethod(job_id=IntegerArgChecker(1))
+def jobKill(job_id):
+    "stop a background job after its running process"
+    if not getJobManager().kill(job_id):
+        raise DefaultPyshellException("job %s is already finished" % job_id,
+                                      USER_WARNING)
+
+
 @shellMethod(
     use_history=EnvironmentAccessor(ENVIRONMENT_USE_HISTORY_KEY),
     parameter_directory=EnvironmentAccessor(ENVIRONMENT_CONFIG_DIRECTORY_KEY),
@@ -352,6 +517,18 @@ registerCommand(("help",), pro=helpFun, post=listResultHandler)
 registerCommand(("?",), pro=helpFun, post=listResultHandler)
 registerStopHelpTraversalAt(("?",))
 registerCommand(("range",), pre=generator)
+registerCommand(("profile",), pro=profile, post=printColumn)
+registerCommand(("timeout",), pre=timeout)
+registerCommand(("cache", "parser",),
+                pro=parserCacheStatistics,
+                post=printColumn)
+registerCommand(("cache", "solver",),
+                pro=solverCacheStatistics,
+                post=printColumn)
+registerStopHelpTraversalAt(("cache",))
+registerCommand(("jobs",), pro=jobList, post=printColumn)
+registerCommand(("wait",), pro=jobWait, post=printColumn)
+registerCommand(("kill",), pro=jobKill)
 registerCommand(("history", "load",), pro=historyLoad)
 registerCommand(("history", "save",), pro=historySave)
 registerStopHelpTraversalAt(("history",))
@@ -18,16 +18,16 @@
 
 import os
 
-from tries import multiLevelTries
-
 import pyshell.addons
 from pyshell.arg.accessor.default import DefaultAccessor
 from pyshell.arg.accessor.environment import EnvironmentAccessor
 from pyshell.arg.checker.default import DefaultChecker
 from pyshell.arg.checker.file import FilePathArgChecker
+from pyshell.arg.checker.float import FloatArgChecker
 from pyshell.arg.checker.integer import IntegerArgChecker
 from pyshell.arg.checker.string43 import StringArgChecker
 from pyshell.arg.decorator import shellMethod
+from pyshell.command.registry import CommandRegistry
 from pyshell.register.command import registerCommand
 from pyshell.register.context import registerContextInteger
 from pyshell.register.context import registerContextString
@@ -47,14 +47,29 @@ from pyshell.utils.constants import CONTEXT_COLORATION_NONE
 from pyshell.utils.constants import CONTEXT_EXECUTION_DAEMON
 from pyshell.utils.constants import CONTEXT_EXECUTION_KEY
 from pyshell.utils.constants import CONTEXT_EXECUTION_SHELL
+from pyshell.utils.constants import CONTEXT_PROFILING_DISABLED
+from pyshell.utils.constants import CONTEXT_PROFILING_ENABLED
+from pyshell.utils.constants import CONTEXT_PROFILING_KEY
 from pyshell.utils.constants import DEBUG_ENVIRONMENT_NAME
 from pyshell.utils.constants import DEFAULT_CONFIG_DIRECTORY
 from pyshell.utils.constants import ENVIRONMENT_ADDON_TO_LOAD_DEFAULT
 from pyshell.utils.constants import ENVIRONMENT_ADDON_TO_LOAD_KEY
 from pyshell.utils.constants import ENVIRONMENT_CONFIG_DIRECTORY_KEY
+from pyshell.utils.constants import ENVIRONMENT_EXECUTION_TIMEOUT_DEFAULT
+from pyshell.utils.constants import ENVIRONMENT_EXECUTION_TIMEOUT_KEY
 from pyshell.utils.constants import ENVIRONMENT_HISTORY_FILE_NAME_KEY
 from pyshell.utils.constants import ENVIRONMENT_HISTORY_FILE_NAME_VALUE
+from pyshell.utils.constants import ENVIRONMENT_INJECTION_LIMIT_DEFAULT
+from pyshell.utils.constants import ENVIRONMENT_INJECTION_LIMIT_KEY
+from pyshell.utils.constants import ENVIRONMENT_JOB_POOL_SIZE_DEFAULT
+from pyshell.utils.constants import ENVIRONMENT_JOB_POOL_SIZE_KEY
+from pyshell.utils.constants import ENVIRONMENT_JOB_QUEUE_SIZE_DEFAULT
+from pyshell.utils.constants import ENVIRONMENT_JOB_QUEUE_SIZE_KEY
 from pyshell.utils.constants import ENVIRONMENT_LEVEL_TRIES_KEY
+from pyshell.utils.constants import ENVIRONMENT_PARSER_CACHE_SIZE_DEFAULT
+from pyshell.utils.constants import ENVIRONMENT_PARSER_CACHE_SIZE_KEY
+from pyshell.utils.constants import ENVIRONMENT_POOL_SIZE_DEFAULT
+from pyshell.utils.constants import ENVIRONMENT_POOL_SIZE_KEY
 from pyshell.utils.constants import ENVIRONMENT_PROMPT_DEFAULT
 from pyshell.utils.constants import ENVIRONMENT_PROMPT_KEY
 from pyshell.utils.constants import ENVIRONMENT_SAVE_KEYS_DEFAULT
@@ -103,7 +118,7 @@ registerEnvironment(ENVIRONMENT_TAB_SIZE_KEY, param)
 
 # # ENVIRONMENT_LEVEL_TRIES_KEY
 
-param = registerEnvironmentAny(ENVIRONMENT_LEVEL_TRIES_KEY, multiLevelTries())
+param = registerEnvironmentAny(ENVIRONMENT_LEVEL_TRIES_KEY, CommandRegistry())
 param.settings.setRemovable(False)
 param.settings.setTransient(True)
 param.settings.setReadOnly(True)
@@ -137,6 +152,72 @@ param = registerEnvironmentBoolean(ENVIRONMENT_USE_HISTORY_KEY,
                                    ENVIRONMENT_USE_HISTORY_VALUE)
 param.settings.setRemovable(False)
 
+# # ENVIRONMENT_INJECTION_LIMIT_KEY
+
+settings = EnvironmentGlobalSettings(transient=False,
+                                     read_only=False,
+                                     removable=False,
+                                     checker=IntegerArgChecker(0))
+
+param = EnvironmentParameter(value=ENVIRONMENT_INJECTION_LIMIT_DEFAULT,
+                             settings=settings)
+registerEnvironment(ENVIRONMENT_INJECTION_LIMIT_KEY, param)
+
+# # ENVIRONMENT_POOL_SIZE_KEY
+
+settings = EnvironmentGlobalSettings(transient=False,
+                                     read_only=False,
+                                     removable=False,
+                                     checker=IntegerArgChecker(1))
+
+param = EnvironmentParameter(value=ENVIRONMENT_POOL_SIZE_DEFAULT,
+                             settings=settings)
+registerEnvironment(ENVIRONMENT_POOL_SIZE_KEY, param)
+
+# # ENVIRONMENT_PARSER_CACHE_SIZE_KEY
+
+settings = EnvironmentGlobalSettings(transient=False,
+                                     read_only=False,
+                                     removable=False,
+                                     checker=IntegerArgChecker(0))
+
+param = EnvironmentParameter(value=ENVIRONMENT_PARSER_CACHE_SIZE_DEFAULT,
+                             settings=settings)
+registerEnvironment(ENVIRONMENT_PARSER_CACHE_SIZE_KEY, param)
+
+# # ENVIRONMENT_JOB_POOL_SIZE_KEY
+
+settings = EnvironmentGlobalSettings(transient=False,
+                                     read_only=False,
+                                     removable=False,
+                                     checker=IntegerArgChecker(1))
+
+param = EnvironmentParameter(value=ENVIRONMENT_JOB_POOL_SIZE_DEFAULT,
+                             settings=settings)
+registerEnvironment(ENVIRONMENT_JOB_POOL_SIZE_KEY, param)
+
+# # ENVIRONMENT_JOB_QUEUE_SIZE_KEY
+
+settings = EnvironmentGlobalSettings(transient=False,
+                                     read_only=False,
+                                     removable=False,
+                                     checker=IntegerArgChecker(1))
+
+param = EnvironmentParameter(value=ENVIRONMENT_JOB_QUEUE_SIZE_DEFAULT,
+                             settings=settings)
+registerEnvironment(ENVIRONMENT_JOB_QUEUE_SIZE_KEY, param)
+
+# # ENVIRONMENT_EXECUTION_TIMEOUT_KEY
+
+settings = EnvironmentGlobalSettings(transient=False,
+                                     read_only=False,
+                                     removable=False,
+                                     checker=FloatArgChecker(0))
+
+param = EnvironmentParameter(value=ENVIRONMENT_EXECUTION_TIMEOUT_DEFAULT,
+                             settings=settings)
+registerEnvironment(ENVIRONMENT_EXECUTION_TIMEOUT_KEY, param)
+
 # # ENVIRONMENT_ADDON_TO_LOAD_KEY
 
 
@@ -168,6 +249,14 @@ param = registerContextString(CONTEXT_COLORATION_KEY, values)
 param.settings.setRemovable(False)
 param.settings.setReadOnly(True)
 
+# # CONTEXT_PROFILING_KEY
+
+values = (CONTEXT_PROFILING_DISABLED, CONTEXT_PROFILING_ENABLED,)
+param = registerContextString(CONTEXT_PROFILING_KEY, values)
+param.settings.setRemovable(False)
+param.settings.setTransient(True)
+param.settings.setReadOnly(True)
+
 ##
 
 
@@ -16,6 +16,8 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import time
+
 import pytest
 
 from tries import multiLevelTries
@@ -29,13 +31,32 @@ from pyshell.addons.std import helpFun
 from pyshell.addons.std import historyLoad
 from pyshell.addons.std import historySave
 from pyshell.addons.std import intToAscii
+from pyshell.addons.std import jobKill
+from pyshell.addons.std import jobList
+from pyshell.addons.std import jobWait
 from pyshell.addons.std import man
+from pyshell.addons.std import parserCacheStatistics
+from pyshell.addons.std import profile
+from pyshell.addons.std import solverCacheStatistics
+from pyshell.addons.std import timeout
 from pyshell.addons.std import usageFun
 from pyshell.arg.checker.default import DefaultChecker
+from pyshell.arg.checker.list import ListArgChecker
+from pyshell.arg.decorator import shellMethod
 from pyshell.command.command import MultiOutput
+from pyshell.command.command import UniCommand
+from pyshell.command.engine import isLazyOutput
+from pyshell.command.exception import ExecutionTimeoutException
+from pyshell.command.profiler import ExecutionProfiler
+from pyshell.system.manager.parent import ParentManager
 from pyshell.system.parameter.environment import EnvironmentParameter
 from pyshell.system.setting.environment import EnvironmentGlobalSettings
+from pyshell.utils.constants import ENVIRONMENT_LEVEL_TRIES_KEY
 from pyshell.utils.exception import DefaultPyshellException
+from pyshell.utils.executing import execute
+from pyshell.utils.jobs import JobManager
+from pyshell.utils.parsing import ParserCache
+from pyshell.utils.solving import SolverCache
 
 
 class TestStd(object):
@@ -151,14 +172,191 @@ class TestUsage(object):
 
     def test_generatorWithMultiOutput(self):
         result = generator(start=0, stop=100, step=1, multi_output=True)
-        assert result == list(range(0, 100, 1))
-        assert isinstance(result, MultiOutput)
+        assert isLazyOutput(result)
+        assert list(result) == list(range(0, 100, 1))
+
+    def test_generatorNegativeStep(self):
+        result = generator(start=10, stop=-5, step=-3, multi_output=True)
+        assert list(result) == list(range(10, -5, -3))
+
+    def test_generatorNullStep(self):
+        with pytest.raises(DefaultPyshellException):
+            generator(start=0, stop=100, step=0, multi_output=True)
 
     def test_generatorWithoutMultiOutput(self):
         result = generator(start=0, stop=100, step=1, multi_output=False)
         assert result == list(range(0, 100, 1))
         assert not isinstance(result, MultiOutput)
 
+    def test_profile(self, monkeypatch):
+        command_lines = []
+
+        def fakeExecute(string, parameters, profiling=False):
+            assert profiling
+            command_lines.append(string)
+            return None, FakeEngine()
+
+        monkeypatch.setattr(monkey_std, 'execute', fakeExecute)
+        result = profile(["range", "0", "10"], None)
+        assert command_lines == ["range 0 10"]
+        assert len(result) == 2
+        assert result[1][0] == "0.0 echo"
+
+    def test_profileQuoting(self, monkeypatch):
+        command_lines = []
+
+        def fakeExecute(string, parameters, profiling=False):
+            command_lines.append(string)
+            return None, FakeEngine()
+
+        monkeypatch.setattr(monkey_std, 'execute', fakeExecute)
+        profile(["echo", "a | b"], None)
+        assert command_lines == ['echo "a | b"']
+
+    def test_profileFailure(self, monkeypatch, capsys):
+        def fakeExecute(string, parameters, profiling=False):
+            return DefaultPyshellException("plop"), FakeEngine()
+
+        monkeypatch.setattr(monkey_std, 'execute', fakeExecute)
+        with pytest.raises(DefaultPyshellException) as excinfo:
+            profile(["range", "0", "10"], None)
+        assert str(excinfo.value) == "plop"
+
+        # the profile of the failed line is printed before the error
+        out, err = capsys.readouterr()
+        assert "0.0 echo" in out
+
+    def test_profileParsingFailure(self, monkeypatch):
+        def fakeExecute(string, parameters, profiling=False):
+            return DefaultPyshellException("plop"), None
+
+        monkeypatch.setattr(monkey_std, 'execute', fakeExecute)
+        with pytest.raises(DefaultPyshellException) as excinfo:
+            profile(["range", "0", "10"], None)
+        assert str(excinfo.value) == "plop"
+
+    def test_profileWithoutEngine(self, monkeypatch):
+        def fakeExecute(string, parameters, profiling=False):
+            return None, None
+
+        monkeypatch.setattr(monkey_std, 'execute', fakeExecute)
+        with pytest.raises(DefaultPyshellException):
+            profile(["range", "0", "10", "&"], None)
+
+    def test_timeout(self, monkeypatch):
+        calls = []
+
+        def fakeExecute(string,
+                        parameters,
+                        timeout=None,
+                        collect_results=False):
+            calls.append((string, timeout, collect_results,))
+            return None, FakeEngine()
+
+        monkeypatch.setattr(monkey_std, 'execute', fakeExecute)
+        result = timeout(2.5, ["echo", "a | b", "$c"], None)
+        assert isinstance(result, MultiOutput)
+        assert result == [["a | b"]]
+        assert calls == [('echo "a | b" \\$c', 2.5, True,)]
+
+    def test_timeoutWithoutEngine(self, monkeypatch):
+        def fakeExecute(string,
+                        parameters,
+                        timeout=None,
+                        collect_results=False):
+            return None, None
+
+        monkeypatch.setattr(monkey_std, 'execute', fakeExecute)
+        assert timeout(2.5, ["range", "0", "10", "&"], None) == []
+
+    def test_timeoutFailure(self, monkeypatch):
+        def fakeExecute(string,
+                        parameters,
+                        timeout=None,
+                        collect_results=False):
+            return ExecutionTimeoutException("plop"), FakeEngine()
+
+        monkeypatch.setattr(monkey_std, 'execute', fakeExecute)
+        with pytest.raises(ExecutionTimeoutException):
+            timeout(2.5, ["range", "0", "10"], None)
+
+    def test_parserCacheStatistics(self, monkeypatch):
+        cache = ParserCache(8)
+        cache.getParser("echo a")
+        cache.getParser("echo a")
+        monkeypatch.setattr(monkey_std, 'getParserCache', lambda: cache)
+
+        result = parserCacheStatistics()
+        assert result == [("size", "entries", "hits", "misses",),
+                          ("8", "1", "1", "1",)]
+        assert cache.getStatistics() == (8, 1, 1, 1,)
+
+    def test_parserCacheStatisticsClear(self, monkeypatch):
+        cache = ParserCache(8)
+        cache.getParser("echo a")
+        monkeypatch.setattr(monkey_std, 'getParserCache', lambda: cache)
+
+        result = parserCacheStatistics(clear=True)
+        assert result[1] == ("8", "1", "0", "1",)
+        assert cache.getStatistics() == (8, 0, 0, 0,)
+
+    def test_solverCacheStatistics(self, monkeypatch):
+        cache = SolverCache(16)
+        monkeypatch.setattr(monkey_std, 'getSolverCache', lambda: cache)
+
+        result = solverCacheStatistics()
+        assert result == [("size", "entries", "hits", "misses",),
+                          ("16", "0", "0", "0",)]
+
+    def test_jobListEmpty(self, monkeypatch):
+        manager = JobManager(1)
+        monkeypatch.setattr(monkey_std, 'getJobManager', lambda: manager)
+
+        with pytest.raises(DefaultPyshellException):
+            jobList()
+
+    def test_jobWaitAndList(self, monkeypatch):
+        manager = JobManager(1)
+        monkeypatch.setattr(monkey_std, 'getJobManager', lambda: manager)
+        manager.submit(lambda job: (None, None,), "echo a &", "proc")
+
+        result = jobWait(timeout=4.0)
+        assert result[0] == ("id", "status", "duration", "name", "command",)
+        assert result[1][0:2] == ("1", "done",)
+        assert result[1][3:] == ("proc", "echo a &",)
+
+        result = jobList(clean=True)
+        assert len(result) == 2
+        assert manager.getJobs() == []
+
+    def test_jobKillFinished(self, monkeypatch):
+        manager = JobManager(1)
+        monkeypatch.setattr(monkey_std, 'getJobManager', lambda: manager)
+        job = manager.submit(lambda job: (None, None,), "echo a &")
+        assert job.wait(4)
+
+        with pytest.raises(DefaultPyshellException):
+            jobKill(job.getId())
+
+    def test_jobKillUnknown(self, monkeypatch):
+        manager = JobManager(1)
+        monkeypatch.setattr(monkey_std, 'getJobManager', lambda: manager)
+
+        with pytest.raises(DefaultPyshellException):
+            jobKill(3)
+
+
+class FakeEngine(object):
+    def __init__(self):
+        self.profiler = ExecutionProfiler()
+        self.profiler.record(0, 0, 0, echo, 0.0, 0.0, 0.0)
+
+    def getProfiler(self):
+        return self.profiler
+
+    def getResults(self):
+        return [["a | b"]]
+
 
 class FakeReadline(object):
     def __init__(self):
@@ -444,3 +642,66 @@ class TestHelp(object):
         assert len(result) == 2
         assert result[0] == "toto tutu: HELP"
         assert result[1] == "toto: HELP"
+
+
+@shellMethod(args=ListArgChecker(DefaultChecker.getArg()))
+def slow(args):
+    time.sleep(0.05)
+    return args
+
+
+class TestTimeout(object):
+    # the timeout command executed in a real pipeline
+
+    def setup_method(self, method):
+        self.received = []
+
+        @shellMethod(args=ListArgChecker(DefaultChecker.getArg()))
+        def collect(args):
+            self.received.append(args)
+            return args
+
+        mltries = multiLevelTries()
+        mltries.insert(("timeout",), UniCommand(pre_process=timeout))
+        mltries.insert(("slow",), UniCommand(process=slow))
+        mltries.insert(("collect",), UniCommand(process=collect))
+        mltries.insert(("range",), UniCommand(pre_process=generator))
+
+        self.params = ParentManager()
+        self.params.getEnvironmentManager().setParameter(
+            ENVIRONMENT_LEVEL_TRIES_KEY,
+            EnvironmentParameter(
+                value=mltries,
+                settings=EnvironmentGlobalSettings(
+                    checker=DefaultChecker.getArg())),
+            local_param=False)
+
+    def test_timeoutExpired(self):
+        ex, engine = execute("timeout 0.02 slow 1 | slow | slow", self.params)
+        assert isinstance(ex, ExecutionTimeoutException)
+
+    def test_timeoutNotExpired(self):
+        ex, engine = execute("timeout 5 slow 1 | slow", self.params)
+        assert ex is None
+        assert engine.getLastResult() == [["1"]]
+
+    def test_timeoutInPipeline(self):
+        ex, engine = execute('timeout 5 slow "a | b" | collect', self.params)
+        assert ex is None
+        assert self.received == [["a | b"]]
+
+    def test_timeoutMultipleData(self):
+        # every data produced by the timed line goes to the next command
+        ex, engine = execute("timeout 5 range 0 3 | collect", self.params)
+        assert ex is None
+        assert self.received == [[0], [1], [2]]
+
+        self.received = []
+        ex, engine = execute("range 0 3 | collect", self.params)
+        assert self.received == [[0], [1], [2]]
+
+    def test_timeoutExpiredInPipeline(self):
+        ex, engine = execute("timeout 0.02 slow 1 | slow | collect",
+                             self.params)
+        assert isinstance(ex, ExecutionTimeoutException)
+        assert self.received == []
@@ -17,7 +17,9 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from abc import ABCMeta, abstractmethod
+from collections import namedtuple
 
+from pyshell.arg.checker.boolean import BooleanValueArgChecker
 from pyshell.arg.exception import ArgException
 from pyshell.arg.exception import ArgInitializationException
 
@@ -47,6 +49,17 @@ class ArgsChecker():
         pass
 
 
+# kind of binding slots of a compiled plan
+SLOT_SINGLE = 0  # exactly one data
+SLOT_FIXED = 1   # a bounded amount of data
+SLOT_GREEDY = 2  # every remaining data
+SLOT_EMPTY = 3   # no data, accessor or default value only
+
+# description of an argument settable with "-name value" in a command line
+DashedParameter = namedtuple("DashedParameter",
+                             ("name", "maximum", "boolean",))
+
+
 class ArgFeeder(ArgsChecker):
 
     #
@@ -61,6 +74,41 @@ class ArgFeeder(ArgsChecker):
                                              "ordered dictionnary")
 
         self.arg_type_list = arg_type_list
+        self.compilePlan()
+
+    def compilePlan(self):
+        """
+        compute how every argument is bound to the data, the plan has to be
+        compiled again if the size of a checker is updated
+        """
+
+        plan = []
+        dashed = {}
+        for (name, checker) in self.arg_type_list.items():
+            minimum = checker.getMinimumSize()
+            maximum = checker.getMaximumSize()
+            dashed[name] = DashedParameter(
+                name,
+                maximum,
+                isinstance(checker, BooleanValueArgChecker))
+
+            if maximum is None:
+                kind = SLOT_GREEDY
+            elif maximum == 0:
+                kind = SLOT_EMPTY
+            elif minimum == maximum == 1:
+                kind = SLOT_SINGLE
+            else:
+                kind = SLOT_FIXED
+
+            plan.append((name, checker, kind, minimum, maximum,))
+
+        self.plan = tuple(plan)
+        self.dashed = dashed
+
+    def getDashedParameters(self):
+        "return a dictionnary of DashedParameter, the keys are the names"
+        return self.dashed
 
     def manageMappedArg(self, name, checker, args):
         if (checker.getMaximumSize() is not None and
@@ -96,66 +144,68 @@ class ArgFeeder(ArgsChecker):
             # argcheckers
 
         ret = {}
-        arg_checker_index = 0
+        plan = self.plan
+        plan_index = 0
         data_index = 0
+        data_count = len(args_list)
+        has_mapped_args = len(mapped_args) > 0
 
-        for (name, checker) in self.arg_type_list.items():
+        for (name, checker, kind, minimum, maximum) in plan:
             # set the engine
             checker.setEngine(engine)
 
             # is it a mapped args ?
-            if name in mapped_args:
+            if has_mapped_args and name in mapped_args:
                 ret[name] = self.manageMappedArg(name,
                                                  checker,
                                                  mapped_args[name])
-                arg_checker_index += 1
+                plan_index += 1
+                continue
+
+            if kind == SLOT_EMPTY:
+                ret[name] = checker.getValue(args_list[0:0], data_index, name)
+                plan_index += 1
                 continue
 
-            # is there a minimum limit
-            if checker.getMinimumSize() is not None:
-                # is there at least getMinimumSize() item in the data stream?
-                if len(args_list[data_index:]) < checker.getMinimumSize():
-                    # no more string token, end of stream ?
-                    if len(args_list[data_index:]) == 0:
-                        # we will check if there is some default value
-                        break
-                    else:
-                        # there are data but not enough
-                        raise ArgException("(ArgFeeder) not enough data for "
-                                           "the argument '"+name+"'")
-
-            # is there a maximum limit?
-            if checker.getMaximumSize() is None:
+            # is there at least minimum item in the data stream?
+            if minimum is not None and data_count - data_index < minimum:
+                # no more string token, end of stream ?
+                if data_count == data_index:
+                    # we will check if there is some default value
+                    break
+
+                # there are data but not enough
+                raise ArgException("(ArgFeeder) not enough data for "
+                                   "the argument '"+name+"'")
+
+            if kind == SLOT_SINGLE:
+                # checker only need one item (most common case)
+                ret[name] = checker.getValue(args_list[data_index],
+                                             data_index,
+                                             name)
+                data_index += 1
+            elif kind == SLOT_GREEDY:
                 # No max limit, it consumes all remaining data
                 ret[name] = checker.getValue(args_list[data_index:],
                                              data_index,
                                              name)
-                # will not stop the loop but will notify that every data has
-                # been consumed
-                data_index = len(args_list)
+                data_index = data_count
             else:
-                # special case: checker only need one item? (most common case)
-                if (checker.getMinimumSize() is not None and
-                   checker.getMinimumSize() == checker.getMaximumSize() == 1):
-                    max_index = data_index+checker.getMaximumSize()
-                    value = args_list[data_index:max_index][0]
-                else:
-                    max_index = data_index+checker.getMaximumSize()
-                    value = args_list[data_index:max_index]
-
-                ret[name] = checker.getValue(value, data_index, name)
-                data_index += checker.getMaximumSize()
+                max_index = data_index + maximum
+                ret[name] = checker.getValue(args_list[data_index:max_index],
+                                             data_index,
+                                             name)
+                data_index += maximum
 
-            arg_checker_index += 1
+            plan_index += 1
 
         # MORE THAN THE LAST ARG CHECKER HAVEN'T BEEN CONSUMED YET
-        items_list = list(self.arg_type_list.items())
-        for i in range(arg_checker_index, len(self.arg_type_list)):
-            (name, checker) = items_list[i]
+        for i in range(plan_index, len(plan)):
+            name, checker = plan[i][0:2]
             checker.setEngine(engine)
 
             # is it a mapped args ?
-            if name in mapped_args:
+            if has_mapped_args and name in mapped_args:
                 ret[name] = self.manageMappedArg(name,
                                                  checker,
                                                  mapped_args[name])
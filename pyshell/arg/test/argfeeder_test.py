@@ -19,7 +19,14 @@
 import pytest
 
 from pyshell.arg.argfeeder import ArgFeeder
+from pyshell.arg.argfeeder import DashedParameter
+from pyshell.arg.argfeeder import SLOT_EMPTY
+from pyshell.arg.argfeeder import SLOT_FIXED
+from pyshell.arg.argfeeder import SLOT_GREEDY
+from pyshell.arg.argfeeder import SLOT_SINGLE
 from pyshell.arg.checker.argchecker import ArgChecker
+from pyshell.arg.checker.boolean import BooleanValueArgChecker
+from pyshell.arg.checker.defaultvalue import DefaultValueChecker
 from pyshell.arg.exception import ArgException
 from pyshell.arg.exception import ArgInitializationException
 
@@ -120,6 +127,56 @@ class TestArgChecker(object):
         assert r["toto1"] == "1"
         assert r["toto2"] == ["2", "3"]
 
+    def test_compilePlan(self):
+        d = OrderedDict()
+        d["toto1"] = ArgChecker()
+        d["toto2"] = ArgChecker(0, 2)
+        d["toto3"] = DefaultValueChecker(42)
+        d["toto4"] = ArgChecker(None, None)
+        af = ArgFeeder(d)
+
+        kinds = [(name, kind,) for name, checker, kind, mini, maxi in af.plan]
+        assert kinds == [("toto1", SLOT_SINGLE,),
+                         ("toto2", SLOT_FIXED,),
+                         ("toto3", SLOT_EMPTY,),
+                         ("toto4", SLOT_GREEDY,)]
+
+        r = af.checkArgs(["1", "2", "3", "4", "5"])
+        assert r == {"toto1": "1",
+                     "toto2": ["2", "3"],
+                     "toto3": 42,
+                     "toto4": ["4", "5"]}
+
+        r = af.checkArgs(["1"])
+        assert r == {"toto1": "1", "toto2": [], "toto3": 42, "toto4": []}
+
+    def test_compilePlanAfterSizeUpdate(self):
+        d = OrderedDict()
+        d["toto1"] = ArgChecker()
+        af = ArgFeeder(d)
+        assert af.checkArgs(["1", "2"])["toto1"] == "1"
+
+        # the plan keeps the sizes known at its compilation
+        d["toto1"].setSize(2, 2)
+        af.compilePlan()
+        assert af.checkArgs(["1", "2"])["toto1"] == ["1", "2"]
+
+    def test_dashedParameters(self):
+        d = OrderedDict()
+        d["toto1"] = ArgChecker()
+        d["toto2"] = ArgChecker(0, None)
+        d["toto3"] = BooleanValueArgChecker()
+        af = ArgFeeder(d)
+
+        dashed = af.getDashedParameters()
+        assert dashed == {"toto1": DashedParameter("toto1", 1, False),
+                          "toto2": DashedParameter("toto2", None, False),
+                          "toto3": DashedParameter("toto3", 1, True)}
+
+        d["toto1"].setSize(2, 3)
+        af.compilePlan()
+        assert af.getDashedParameters()["toto1"].maximum == 3
+
     def test_usage(self):
         d = OrderedDict()
         d["toto1"] = ArgChecker()
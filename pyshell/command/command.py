@@ -16,6 +16,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from pyshell.arg.accessor.engine import EngineAccessor
 from pyshell.arg.checker.default import DefaultChecker
 from pyshell.arg.checker.list import ListArgChecker
 from pyshell.arg.decorator import defaultMethod
@@ -30,7 +31,24 @@ class MultiOutput(list):
     pass
 
 
+def _isUsingEngine(method):
+    checker = getattr(method, "checker", None)
+    arg_type_list = getattr(checker, "arg_type_list", {})
+
+    for arg_checker in arg_type_list.values():
+        if isinstance(arg_checker, EngineAccessor) and \
+           arg_checker.getTypeName() == EngineAccessor.getTypeName():
+            return True
+
+    return False
+
+
 class Command(Cloneable):
+    # the data of a parallel process are dispatched to a pool of workers,
+    # threads by default or processes if process_pool is True
+    parallel = False
+    process_pool = False
+
     # default preProcess
     @shellMethod(args=ListArgChecker(DefaultChecker.getArg()))
     @defaultMethod()
@@ -60,6 +78,8 @@ class Command(Cloneable):
         parent.preProcess = self.preProcess
         parent.process = self.process
         parent.postProcess = self.postProcess
+        parent.parallel = self.parallel
+        parent.process_pool = self.process_pool
 
         return parent
 
@@ -89,7 +109,9 @@ class MultiCommand(list):
                    pre_process=None,
                    process=None,
                    post_process=None,
-                   use_args=True):
+                   use_args=True,
+                   parallel=False,
+                   process_pool=False):
         c = Command()
 
         if pre_process == process == post_process is None:
@@ -97,6 +119,23 @@ class MultiCommand(list):
                                    " the three callable pre/pro/post object "
                                    "must be different of None")
 
+        if parallel and process is None:
+            raise CommandException("(MultiCommand) addProcess, a parallel "
+                                   "command needs a process")
+
+        if process_pool and not parallel:
+            raise CommandException("(MultiCommand) addProcess, a process pool"
+                                   " can only be used by a parallel command")
+
+        # the workers can not use the engine, it is not thread safe
+        if parallel and _isUsingEngine(process):
+            raise CommandException("(MultiCommand) addProcess, a parallel "
+                                   "process can not take the engine as "
+                                   "argument")
+
+        c.parallel = bool(parallel)
+        c.process_pool = bool(process_pool)
+
         if pre_process is not None:
             # preProcess must be callable
             if not hasattr(pre_process, "__call__"):
@@ -327,15 +366,27 @@ class MultiCommand(list):
 # special command class, with only one command (the starting point)
 #
 class UniCommand(MultiCommand):
-    def __init__(self, pre_process=None, process=None, post_process=None):
+    def __init__(self,
+                 pre_process=None,
+                 process=None,
+                 post_process=None,
+                 parallel=False,
+                 process_pool=False):
         MultiCommand.__init__(self)
-        MultiCommand.addProcess(self, pre_process, process, post_process)
+        MultiCommand.addProcess(self,
+                                pre_process,
+                                process,
+                                post_process,
+                                parallel=parallel,
+                                process_pool=process_pool)
 
     def addProcess(self,
                    pre_process=None,
                    process=None,
                    post_process=None,
-                   use_args=True):
+                   use_args=True,
+                   parallel=False,
+                   process_pool=False):
         pass  # block the procedure to add more commands
 
     def addStaticCommand(self, cmd, use_args=True):
@@ -347,3 +398,53 @@ class UniCommand(MultiCommand):
             parent = UniCommand(cmd.preProcess, cmd.process, cmd.postProcess)
 
         return MultiCommand.clone(self, parent)
+
+
+#
+# execution state of a registered command, an engine works on these states
+# and never updates the registered command.  The sub commands are shared
+# with the registered command, only the list of sub commands, their enabling
+# state, the dynamic sub commands and the counters (pre, pro and post count
+# of each sub command) belong to the execution.
+#
+class CommandState(MultiCommand):
+    def __init__(self, command):
+        if not isinstance(command, MultiCommand):
+            raise CommandException("(CommandState) init, the command is not "
+                                   "a MultiCommand instance, got '" +
+                                   str(type(command))+"'")
+
+        MultiCommand.__init__(self)
+        self.command = command
+        self.help_message = command.help_message
+        self.usage_builder = command.usage_builder
+        self.counters = []
+
+        # the dynamic sub commands of the registered command are not kept,
+        # and every static sub command is enabled, like a reset would do
+        for i in range(0, len(command) - command.dymamic_count):
+            c, a, e = command[i]
+            self.append((c, a, True,))
+
+    def getCommand(self):
+        return self.command
+
+    def append(self, sub_command):
+        MultiCommand.append(self, sub_command)
+        self.counters.append([0, 0, 0])
+
+    def reset(self):
+        del self[:]
+        CommandState.__init__(self, self.command)
+
+    def clone(self, parent=None):
+        return CommandState(self.command)
+
+    def getPreCount(self, index=0):
+        return self.counters[index][0]
+
+    def getProCount(self, index=0):
+        return self.counters[index][1]
+
+    def getPostCount(self, index=0):
+        return self.counters[index][2]
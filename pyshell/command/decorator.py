@@ -19,6 +19,8 @@
 # TODO
 #   use wraps https://docs.python.org/2/library/functools.html#functools.wraps
 
+from pyshell.command.exception import CommandException
+
 # use to mark a command that is allowed to return None
 
 
@@ -27,3 +29,24 @@ def allowToReturnNone(enable=True):
         fun.allowToReturnNone = enable
         return fun
     return decorator
+
+
+# use to give a process/postProcess an implementation able to handle a whole
+# data bunch in one call.  Every data is checked by the checker of the
+# decorated method, mapped args included, then bunch_fun is called with the
+# list of the checked arguments (one dict of keyword arguments per data).
+# bunch_fun must return one output per data (or None).  The decorated method
+# is still used when the data are processed one by one.
+#
+# The side effects of a bunch call are made once for the whole bunch, e.g. a
+# print bunch_fun formats every data then prints them in one call, where the
+# decorated method formats and prints the data one after the other.
+def bunchProcessing(bunch_fun):
+    if not hasattr(bunch_fun, "__call__"):
+        raise CommandException("(bunchProcessing) the given bunch_fun is "
+                               "not a callable object")
+
+    def decorator(fun):
+        fun.bunchProcess = bunch_fun
+        return fun
+    return decorator
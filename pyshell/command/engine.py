@@ -16,20 +16,35 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import types
+
 from pyshell.command.command import Command
+from pyshell.command.command import CommandState
 from pyshell.command.command import MultiCommand
 from pyshell.command.command import MultiOutput
 from pyshell.command.exception import EngineInterruptionException
 from pyshell.command.exception import ExecutionException
 from pyshell.command.exception import ExecutionInitException
+from pyshell.command.exception import ExecutionTimeoutException
+from pyshell.command.profiler import ExecutionProfiler
+from pyshell.command.profiler import timer
+from pyshell.command.stackEngine import DataBunch
 from pyshell.command.stackEngine import EngineStack
+from pyshell.command.stackEngine import StackFrame
 from pyshell.command.utils import equalMap
 from pyshell.command.utils import equalPath
 from pyshell.command.utils import isAValidIndex
 from pyshell.command.utils import raisIfInvalidMap  # TODO fix grammar error
 from pyshell.command.utils import raiseIfInvalidPath
+from pyshell.command.workerpool import mapInPool
 from pyshell.system.parameter.environment import EnvironmentParameter
 from pyshell.system.parameter.environment import ParametersLocker
+from pyshell.utils.constants import CONTEXT_PROFILING_ENABLED
+from pyshell.utils.constants import CONTEXT_PROFILING_KEY
+from pyshell.utils.constants import ENVIRONMENT_INJECTION_LIMIT_DEFAULT
+from pyshell.utils.constants import ENVIRONMENT_INJECTION_LIMIT_KEY
+from pyshell.utils.constants import ENVIRONMENT_POOL_SIZE_DEFAULT
+from pyshell.utils.constants import ENVIRONMENT_POOL_SIZE_KEY
 from pyshell.utils.synchronized import FAKELOCK
 
 # TODO TO TEST
@@ -39,7 +54,8 @@ from pyshell.utils.synchronized import FAKELOCK
 #   test insertion of data in the future
 #   action after process execution (addpath, reset index, skipcount)
 
-DEFAULT_EXECUTION_LIMIT = 255
+DEFAULT_INJECTION_LIMIT = ENVIRONMENT_INJECTION_LIMIT_DEFAULT
+BUNCH_SIZE_LIMIT = 4096
 PREPROCESS_INSTRUCTION = 0
 PROCESS_INSTRUCTION = 1
 POSTPROCESS_INSTRUCTION = 2
@@ -52,6 +68,35 @@ EMPTY_DATA_TOKEN = _EmptyDataToken()
 EMPTY_MAPPED_ARGS = {}
 
 
+def isLazyOutput(value):
+    # an iterator (generator, file, ...) produces one data per item, a list,
+    # a tuple or any other iterable stays a single data
+    return (hasattr(value, "__iter__") and
+            (hasattr(value, "__next__") or hasattr(value, "next")))
+
+
+def _getLockableParameters(data):
+    lockable_list = []
+    for k, v in data.items():
+        if not isinstance(v, EnvironmentParameter):
+            continue
+
+        if not v.isLockEnable():
+            continue
+
+        lockable_list.append(v)
+
+    return lockable_list
+
+
+def _mergeOutputs(outputs):
+    merged = []
+    for output in outputs:
+        merged.extend(output)
+
+    return merged
+
+
 class EngineV3(object):
     # ##  INIT # ##
     def __init__(self, cmd_list, args_list, mapped_args_list, env=None):
@@ -76,7 +121,7 @@ class EngineV3(object):
                                          "not a valid populated list of equal "
                                          "size with the command list")
 
-        # reset every commands
+        # check every commands
         for i in range(0, len(cmd_list)):
             c = cmd_list[i]
 
@@ -95,28 +140,135 @@ class EngineV3(object):
                                              "> in the arg list is different "
                                              "of None or List instance")
 
-            # reset the information stored in the command from a previous
-            # execution
-            c.reset()
-
+        # the registered commands are never updated by the engine, the
+        # counters, the enabling state and the dynamic sub commands are
+        # stored in an execution state, one per position in the pipeline,
+        # even if the same command is used at several positions.
         self.args_list = args_list
-        self.cmd_list = cmd_list  # list of MultiCommand
+        self.cmd_list = [CommandState(c) for c in cmd_list]
         self.mapped_args_list = mapped_args_list
         # TODO env must be a container instance
         self.env = env
         self.stack = EngineStack()
         self._isInProcess = False
         self.selfkillreason = None
+        self.deadline = None
         self.topPreIndexOpp = None
         self.topProcessToPre = False
         self.lastResult = None
 
+        # the outputs of every data of the root post process, only kept if
+        # the collect is enabled, lastResult only holds the last ones
+        self.results = None
+
+        # the amount of processed data is unbounded, only the data injected
+        # by the commands themselves are counted to stop a runaway loop.
+        # A limit of 0 disable the check.
+        self.injectionCount = 0
+        self.injectionLimit = DEFAULT_INJECTION_LIMIT
+
+        # the amount of workers used to execute a parallel process
+        self.poolSize = ENVIRONMENT_POOL_SIZE_DEFAULT
+
+        # the profiler is only created if the profiling is enabled, there
+        # is no profiling cost otherwise
+        self.profiler = None
+
+        if env is not None:
+            # every environment setting is retrieved with one lookup
+            parameters = env.getEnvironmentManager().getParameters(
+                (ENVIRONMENT_INJECTION_LIMIT_KEY, ENVIRONMENT_POOL_SIZE_KEY,),
+                perfect_match=True)
+
+            param = parameters[ENVIRONMENT_INJECTION_LIMIT_KEY]
+            if param is not None:
+                self.injectionLimit = param.getValue()
+
+            param = parameters[ENVIRONMENT_POOL_SIZE_KEY]
+            if param is not None:
+                self.poolSize = param.getValue()
+
+            param = env.getContextManager().getParameter(
+                CONTEXT_PROFILING_KEY,
+                perfect_match=True)
+            if (param is not None and
+               param.getSelectedValue() == CONTEXT_PROFILING_ENABLED):
+                self.profiler = ExecutionProfiler()
+
+        # a pipeline of static commands is executed with a straight line
+        # plan, any dynamic api (injection, split, merge, skip, ...) disables
+        # it and the stack machine takes over.
+        self.staticPlanEnabled = True
+
         # init stack with a None data, on the subcmd 0 of the command 0,
         # with a preprocess action
 
         # init data to start the engine
         self.stack.push([EMPTY_DATA_TOKEN], [0], PREPROCESS_INSTRUCTION)
 
+    def setInjectionLimit(self, limit):
+        if type(limit) is not int or limit < 0:
+            raise ExecutionException("(engine) setInjectionLimit, the limit "
+                                     "must be a positive integer, got '" +
+                                     str(limit)+"'")
+
+        self.injectionLimit = limit
+
+    def getInjectionLimit(self):
+        return self.injectionLimit
+
+    def setPoolSize(self, size):
+        if type(size) is not int or size < 1:
+            raise ExecutionException("(engine) setPoolSize, the size must be "
+                                     "a strictly positive integer, got '" +
+                                     str(size)+"'")
+
+        self.poolSize = size
+
+    def getPoolSize(self):
+        return self.poolSize
+
+    def setResultCollectingEnabled(self, state=True):
+        if not state:
+            self.results = None
+        elif self.results is None:
+            self.results = []
+
+    def isResultCollectingEnabled(self):
+        return self.results is not None
+
+    def getResults(self):
+        "return the outputs of every data of the execution, None if disabled"
+        return self.results
+
+    def setProfilingEnabled(self, state=True):
+        if not state:
+            self.profiler = None
+        elif self.profiler is None:
+            self.profiler = ExecutionProfiler()
+
+    def isProfilingEnabled(self):
+        return self.profiler is not None
+
+    def getProfiler(self):
+        return self.profiler
+
+    def setStaticPlanEnabled(self, state):
+        self.staticPlanEnabled = bool(state)
+
+    def isStaticPlanEnabled(self):
+        return self.staticPlanEnabled
+
+    def _consumeInjection(self, meth_name):
+        if (self.injectionLimit > 0 and
+           self.injectionCount >= self.injectionLimit):
+            raise ExecutionException("(engine) "+meth_name+", the injection "
+                                     "limit of this execution has been "
+                                     "reached ("+str(self.injectionLimit) +
+                                     "), a command is probably looping")
+
+        self.injectionCount += 1
+
     def _getTheIndexWhereToStartTheSearch(self, process_type):
         # check process_type, must be pre/pro/post
         if process_type != PREPROCESS_INSTRUCTION and \
@@ -137,8 +289,9 @@ class EngineV3(object):
         # find the place to start the lookup
         if process_type != POSTPROCESS_INSTRUCTION:
             for i in range(0, stack_length):
-                if (self.stack.typeOnDepth(i) == POSTPROCESS_INSTRUCTION or
-                    (self.stack.typeOnDepth(i) == PROCESS_INSTRUCTION and
+                frame_type = self.stack.depth(i).type
+                if (frame_type == POSTPROCESS_INSTRUCTION or
+                    (frame_type == PROCESS_INSTRUCTION and
                      process_type == PREPROCESS_INSTRUCTION)):
                     continue
 
@@ -167,30 +320,31 @@ class EngineV3(object):
         index = self._getTheIndexWhereToStartTheSearch(process_type)
         to_ret = None
 
-        while index >= 0 and process_type == self.stack.typeOnIndex(index):
+        while index >= 0 and process_type == self.stack[index].type:
+            frame = self.stack[index]
             equals, same_length, equals_count, path1_is_higher = \
-                equalPath(self.stack[index][1], cmd_path)
+                equalPath(frame.path, cmd_path)
 
             if equals:
                 if process_type != PREPROCESS_INSTRUCTION:
-                    return self.stack[index], index
+                    return frame, index
                 else:
                     if to_ret is None:
                         to_ret = []
 
-                    to_ret.append((self.stack[index], index,))
+                    to_ret.append((frame, index,))
 
             elif (process_type == PREPROCESS_INSTRUCTION and
                   same_length and equals_count == len(cmd_path)-1):
                 if to_ret is None:
                     to_ret = []
 
-                to_ret.append((self.stack[index], index,))
+                to_ret.append((frame, index,))
 
             # A lower path has been found on the stack, no way to find
             # a better path
             elif ((path1_is_higher is not None and path1_is_higher) or
-                  len(self.stack[index][1]) < len(cmd_path)):
+                  len(frame.path) < len(cmd_path)):
                 break
 
             index -= 1
@@ -209,7 +363,9 @@ class EngineV3(object):
                             cmd_path,
                             process_type,
                             only_append=False):
+        self.staticPlanEnabled = False
         obj, index = self._findIndexToInject(cmd_path, process_type)
+        self._consumeInjection("injectDataProOrPos")
 
         if obj is None:
             # can only append ?
@@ -225,10 +381,10 @@ class EngineV3(object):
 
             # insert a new object
             self.stack.insert(index,
-                              ([data], cmd_path[:], process_type, None,))
+                              StackFrame([data], cmd_path[:], process_type))
 
         else:
-            obj[0].append(data)
+            obj.data.append(data)
 
     def injectDataPro(self, data, cmd_path, process_type, only_append=False):
         self._injectDataProOrPos(data,
@@ -248,6 +404,7 @@ class EngineV3(object):
                       enabling_map=None,
                       only_append=False,
                       if_no_match_execute_sooner_as_possible=True):
+        self.staticPlanEnabled = False
         item_candidate_list = self._findIndexToInject(cmd_path,
                                                       PREPROCESS_INSTRUCTION)
 
@@ -256,6 +413,8 @@ class EngineV3(object):
                          len(self.cmd_list[len(cmd_path)-1]),
                          "injectDataPre")
 
+        self._consumeInjection("injectDataPre")
+
         # no match
         if len(item_candidate_list) == 1 and item_candidate_list[0][0] is None:
             if only_append:
@@ -272,18 +431,18 @@ class EngineV3(object):
             new_cmd_path[-1] = 0
 
             self.stack.insert(item_candidate_list[0][1],
-                              ([data],
-                              new_cmd_path,
-                              PREPROCESS_INSTRUCTION,
-                              enabling_map,))
+                              StackFrame([data],
+                                         new_cmd_path,
+                                         PREPROCESS_INSTRUCTION,
+                                         enabling_map))
         else:
             # try to find an equal map
             for item, index in item_candidate_list:
-                if not equalMap(enabling_map, item[3]):
+                if not equalMap(enabling_map, item.enabling_map):
                     continue
 
                 # append
-                item[0].append(data)
+                item.data.append(data)
                 return
 
             # no equal map found
@@ -303,35 +462,35 @@ class EngineV3(object):
                                              "insert data in the future")
 
                 self.stack.insert(item_candidate_list[0][1]+1,
-                                  ([data],
-                                   new_cmd_path,
-                                   PREPROCESS_INSTRUCTION,
-                                   enabling_map,))
+                                  StackFrame([data],
+                                             new_cmd_path,
+                                             PREPROCESS_INSTRUCTION,
+                                             enabling_map))
             else:
                 self.stack.insert(item_candidate_list[-1][1],
-                                  ([data],
-                                   new_cmd_path,
-                                   PREPROCESS_INSTRUCTION,
-                                   enabling_map,))
+                                  StackFrame([data],
+                                             new_cmd_path,
+                                             PREPROCESS_INSTRUCTION,
+                                             enabling_map))
 
     def insertDataToPreProcess(self, data, only_for_the_linked_sub_cmd=True):
         self.stack.raiseIfEmpty("insertDataToPreProcess")
 
         # the current process must be pro or pos
-        if self.stack.typeOnTop() == PREPROCESS_INSTRUCTION:
+        if self.stack.top().type == PREPROCESS_INSTRUCTION:
             self.appendData(data)
             return
 
         # computer map
         enabling_map = None
         if only_for_the_linked_sub_cmd:
-            cmd_length_on_top = self.stack.subCmdLengthOnTop(self.cmd_list)
+            cmd_length_on_top = self.stack.top().subCmdLength(self.cmd_list)
             enabling_map = [False] * cmd_length_on_top
-            enabling_map[self.stack.subCmdIndexOnTop()] = True
+            enabling_map[self.stack.top().subCmdIndex()] = True
 
         # inject data
         self.injectDataPre(data,
-                           self.stack.pathOnTop(),
+                           self.stack.top().path,
                            enabling_map,
                            False,
                            True)
@@ -340,7 +499,7 @@ class EngineV3(object):
         self.stack.raiseIfEmpty("insertDataToProcess")
 
         # the current process must be post
-        if self.stack.typeOnTop() != POSTPROCESS_INSTRUCTION:
+        if self.stack.top().type != POSTPROCESS_INSTRUCTION:
             raise ExecutionException("(engine) insertDataToProcess, only a "
                                      "process in postprocess state can execute"
                                      " this function")
@@ -356,25 +515,25 @@ class EngineV3(object):
 
         # inject data
         self.injectDataPro(data,
-                           self.stack.pathOnTop(),
-                           self.stack.pathOnTop())
+                           self.stack.top().path,
+                           self.stack.top().path)
 
     def insertDataToNextSubCommandPreProcess(self, data):
         self.stack.raiseIfEmpty("insertDataToNextSubCommandPreProcess")
 
         # is there a next pre process sub command ?
-        cmd_length_on_top = self.stack.subCmdLengthOnTop(self.cmd_list)-1
-        if self.stack.subCmdIndexOnTop() == cmd_length_on_top:
+        cmd_length_on_top = self.stack.top().subCmdLength(self.cmd_list)-1
+        if self.stack.top().subCmdIndex() == cmd_length_on_top:
             raise ExecutionException("(engine) "
                                      "insertDataToNextSubCommandPreProcess, "
                                      "there is no next pre process available "
                                      "to insert new data")
 
-        cmd_path = self.stack.pathOnTop()[:]
+        cmd_path = self.stack.top().path[:]
         cmd_path[-1] += 1
 
         # create enabling map
-        enabling_map = [False] * self.stack.subCmdLengthOnTop(self.cmd_list)
+        enabling_map = [False] * self.stack.top().subCmdLength(self.cmd_list)
         enabling_map[cmd_path[-1]] = True
 
         # inject in asLateAsPossible
@@ -401,8 +560,8 @@ class EngineV3(object):
                                               data_index,
                                               start_skip_range,
                                               range_length=1):
-        emap = self.stack.enablingMapOnIndex(data_index)
-        cmd_id = self.stack.cmdIndexOnIndex(data_index)
+        emap = self.stack[data_index].enabling_map
+        cmd_id = self.stack[data_index].cmdIndex()
 
         for j in range(0, min(start_skip_range, len(self.cmd_list[cmd_id]))):
             if (not self.cmd_list[cmd_id].isdisabledCmd(j) and
@@ -421,11 +580,11 @@ class EngineV3(object):
                                              data_index,
                                              start_skip_range,
                                              range_length=1):
-        emap = self.stack.enablingMapOnIndex(data_index)
+        emap = self.stack[data_index].enabling_map
         if emap is None:
             return True
 
-        cmd_id = self.stack.cmdIndexOnIndex(data_index)
+        cmd_id = self.stack[data_index].cmdIndex()
 
         for j in range(0, min(start_skip_range, len(emap))):
             if not emap[j]:
@@ -443,6 +602,7 @@ class EngineV3(object):
                    sub_cmd_id,
                    skip_count=1,
                    allow_to_disable_data_bunch=False):
+        self.staticPlanEnabled = False
         if skip_count < 1:
             raise ExecutionException("(engine) _skipOnCmd, skip count must be "
                                      "equal or bigger than 1")
@@ -464,15 +624,15 @@ class EngineV3(object):
         cmd_to_update = []
 
         for i in range(0, len(self.cmd_list)):
-            if self.cmd_list[i] == self.cmd_list[cmd_id]:
+            if self.cmd_list[i] is self.cmd_list[cmd_id]:
                 cmd_to_update.append(i)
 
         # explore the stack looking after these paths
         for i in range(0, self.stack.size()):
-            if self.stack.typeOnIndex(i) != PREPROCESS_INSTRUCTION:
+            if self.stack[i].type != PREPROCESS_INSTRUCTION:
                 break
 
-            if self.stack.cmdIndexOnIndex(i) not in cmd_to_update:
+            if self.stack[i].cmdIndex() not in cmd_to_update:
                 continue
 
             if (not allow_to_disable_data_bunch and
@@ -490,6 +650,7 @@ class EngineV3(object):
             self.cmd_list[cmd_id].disableCmd(i)
 
     def _enableOnCmd(self, cmd_id, sub_cmd_id, enable_count=1):
+        self.staticPlanEnabled = False
         if enable_count < 1:
             raise ExecutionException("(engine) _enableOnCmd, enable count must"
                                      " be equal or bigger than 1")
@@ -507,6 +668,7 @@ class EngineV3(object):
             self.cmd_list[cmd_id].enableCmd(i)
 
     def _skipOnDataBunch(self, data_bunch_index, sub_cmd_id, skip_count=1):
+        self.staticPlanEnabled = False
         if skip_count < 1:
             raise ExecutionException("(engine) _skipOnDataBunch, skip count "
                                      "must be equal or bigger than 1")
@@ -518,13 +680,13 @@ class EngineV3(object):
                       data_bunch_index,
                       "_skipOnDataBunch",
                       "stack")
-        isAValidIndex(self.stack.getCmd(data_bunch_index, self.cmd_list),
+        isAValidIndex(self.stack[data_bunch_index].getCmd(self.cmd_list),
                       sub_cmd_id,
                       "_skipOnDataBunch",
                       "sub command list")
 
         #  can only skip the next command if the state is pre_process
-        if self.stack.typeOnIndex(data_bunch_index) != PREPROCESS_INSTRUCTION:
+        if self.stack[data_bunch_index].type != PREPROCESS_INSTRUCTION:
             raise ExecutionException("(engine) _skipOnDataBunch, can only skip"
                                      " method on PREPROCESS item")
 
@@ -536,11 +698,11 @@ class EngineV3(object):
                                      " in this databunch will be disabled with"
                                      " this skip range")
 
-        enabling_map = self.stack.enablingMapOnIndex(data_bunch_index)
+        frame = self.stack[data_bunch_index]
+        enabling_map = frame.enabling_map
 
         if enabling_map is None:
-            cmd_length = self.stack.subCmdLengthOnIndex(data_bunch_index,
-                                                        self.cmd_list)
+            cmd_length = frame.subCmdLength(self.cmd_list)
             enabling_map = [True] * cmd_length
 
         for i in range(sub_cmd_id,
@@ -550,9 +712,10 @@ class EngineV3(object):
 
             enabling_map[i] = False
 
-        self.stack.setEnableMapOnIndex(data_bunch_index, enabling_map)
+        frame.enabling_map = enabling_map
 
     def _enableOnDataBunch(self, data_bunch_index, sub_cmd_id, enable_count=1):
+        self.staticPlanEnabled = False
         if enable_count < 1:
             raise ExecutionException("(engine) _skipOnDataBunch, skip count "
                                      "must be equal or bigger than 1")
@@ -564,13 +727,13 @@ class EngineV3(object):
                       data_bunch_index,
                       "_skipOnDataBunch",
                       "stack")
-        isAValidIndex(self.stack.getCmd(data_bunch_index, self.cmd_list),
+        isAValidIndex(self.stack[data_bunch_index].getCmd(self.cmd_list),
                       sub_cmd_id,
                       "_skipOnDataBunch",
                       "sub command list")
 
         #  can only skip the next command if the state is pre_process
-        if self.stack.typeOnIndex(data_bunch_index) != PREPROCESS_INSTRUCTION:
+        if self.stack[data_bunch_index].type != PREPROCESS_INSTRUCTION:
             raise ExecutionException("(engine) _skipOnDataBunch, can only "
                                      "skip method on PREPROCESS item")
 
@@ -579,7 +742,7 @@ class EngineV3(object):
                                                      enable_count):
             enabling_map = None
         else:
-            enabling_map = self.stack.enablingMapOnIndex(data_bunch_index)
+            enabling_map = self.stack[data_bunch_index].enabling_map
 
             enable_until = min(sub_cmd_id+enable_count, len(enabling_map))
             for i in range(sub_cmd_id, enable_until):
@@ -588,9 +751,10 @@ class EngineV3(object):
 
                 enabling_map[i] = True
 
-        self.stack.setEnableMapOnIndex(data_bunch_index, enabling_map)
+        self.stack[data_bunch_index].enabling_map = enabling_map
 
     def skipNextSubCommandOnTheCurrentData(self, skip_count=1):
+        self.staticPlanEnabled = False
         if skip_count < 1:
             raise ExecutionException("(engine) "
                                      "skipNextSubCommandOnTheCurrentData, skip"
@@ -598,7 +762,7 @@ class EngineV3(object):
 
         self.stack.raiseIfEmpty("skipNextSubCommandOnTheCurrentData")
         #  can only skip the next command if the state is pre_process
-        if self.stack.typeOnTop() != PREPROCESS_INSTRUCTION:
+        if self.stack.top().type != PREPROCESS_INSTRUCTION:
             raise ExecutionException("(engine) "
                                      "skipNextSubCommandOnTheCurrentData, can"
                                      " only skip method on PREPROCESS item")
@@ -613,33 +777,34 @@ class EngineV3(object):
                                          "present on this databunch, can not "
                                          "skip the next sub command")
         else:
-            self.stack[-1][1][-1] += skip_count
+            self.stack.top().path[-1] += skip_count
 
     def skipNextSubCommandForTheEntireDataBunch(self, skip_count=1):
         self.stack.raiseIfEmpty("skipNextSubCommandForTheEntireDataBunch")
-        self._skipOnDataBunch(-1, self.stack.subCmdIndexOnTop()+1, skip_count)
+        self._skipOnDataBunch(-1, self.stack.top().subCmdIndex()+1, skip_count)
 
     def skipNextSubCommandForTheEntireExecution(self, skip_count=1):
         self.stack.raiseIfEmpty("skipNextSubCommandForTheEntireExecution")
-        self._skipOnCmd(self.stack.cmdIndexOnTop(),
-                        self.stack.subCmdIndexOnTop(),
+        self._skipOnCmd(self.stack.top().cmdIndex(),
+                        self.stack.top().subCmdIndex(),
                         skip_count)
 
     def disableEnablingMapOnDataBunch(self, index=-1):
+        self.staticPlanEnabled = False
         isAValidIndex(self.stack,
                       index,
                       "disableEnablingMapOnDataBunch",
                       "stack")
 
         #  can only skip the next command if the state is pre_process
-        if self.stack.typeOnIndex(index) != PREPROCESS_INSTRUCTION:
+        if self.stack[index].type != PREPROCESS_INSTRUCTION:
             raise ExecutionException("(engine) disableEnablingMapOnDataBunch, "
                                      "can only skip method on PREPROCESS item")
 
-        mapping = self.stack.enablingMapOnIndex(index)
+        mapping = self.stack[index].enabling_map
 
         if mapping is not None:
-            self.stack.setEnableMapOnIndex(index, None)
+            self.stack[index].enabling_map = None
 
     def enableSubCommandInCurrentDataBunchMap(self, index_sub_cmd):
         self._enableOnDataBunch(-1, index_sub_cmd, 1)
@@ -654,9 +819,10 @@ class EngineV3(object):
         self._skipOnCmd(index_cmd, index_sub_cmd, 1)
 
     def flushArgs(self, index=None):  # None index means current command
+        self.staticPlanEnabled = False
         if index is None:
             self.stack.raiseIfEmpty("flushArgs")
-            cmd_id = self.stack.cmdIndexOnTop()
+            cmd_id = self.stack.top().cmdIndex()
         else:
             cmd_id = index
 
@@ -671,6 +837,7 @@ class EngineV3(object):
                       cmd_id=None,
                       only_add_once=True,
                       use_args=True):
+        self.staticPlanEnabled = False
         # is a valid cmd ?
         # only the Command are allowed in the list
         if not isinstance(cmd, Command):
@@ -682,7 +849,7 @@ class EngineV3(object):
         # insert, check the cmd path on the stack
         if cmd_id is None:
             self.stack.raiseIfEmpty("addSubCommand")
-            cmd_id = self.stack.cmdIndexOnTop()
+            cmd_id = self.stack.top().cmdIndex()
 
         isAValidIndex(self.cmd_list, cmd_id, "addSubCommand", "command list")
 
@@ -693,25 +860,26 @@ class EngineV3(object):
         # the cmd at cmd_id
         cmd_to_update = []
         for i in range(0, len(self.cmd_list)):
-            if self.cmd_list[i] == self.cmd_list[cmd_id]:
+            if self.cmd_list[i] is self.cmd_list[cmd_id]:
                 cmd_to_update.append(i)
 
         for i in range(0, self.stack.size()):
-            if self.stack.typeOnIndex(i) != PREPROCESS_INSTRUCTION:
+            if self.stack[i].type != PREPROCESS_INSTRUCTION:
                 break
 
             # is it a wrong path ?
-            if self.stack.cmdIndexOnIndex(i) not in cmd_to_update:
+            if self.stack[i].cmdIndex() not in cmd_to_update:
                 continue
 
             # is there an enabled mapping ?
-            enabling_map = self.stack.enablingMapOnIndex(i)
+            enabling_map = self.stack[i].enabling_map
             if enabling_map is None:
                 continue
 
             enabling_map.append(True)
 
     def addCommand(self, cmd, convert_process_to_pre_process=False):
+        self.staticPlanEnabled = False
         # only the MultiCommand are allowed in the list
         if not isinstance(cmd, MultiCommand):
             raise ExecutionException("(engine) addCommand, cmd is not a "
@@ -725,10 +893,10 @@ class EngineV3(object):
         stack_size = self.stack.size()
         for i in range(0, len(self.stack)):
             # if we reach a preprocess, we never reach again a process
-            if self.stack.typeOnIndex(i) == PREPROCESS_INSTRUCTION:
+            if self.stack[i].type == PREPROCESS_INSTRUCTION:
                 continue
 
-            if self.stack.typeOnIndex(i) == POSTPROCESS_INSTRUCTION:
+            if self.stack[i].type == POSTPROCESS_INSTRUCTION:
                 break
 
             # so, here we only have PROCESS_INSTRUCTION
@@ -738,7 +906,7 @@ class EngineV3(object):
             #   the current data of a top process is currently consumed by a
             #   process, so on the next iteration it will not be a problem
             #   anymore.  But if a next data exist, it is a problem.
-            if i == stack_size-1 and len(self.stack.dataOnTop()) == 1:
+            if i == stack_size-1 and len(self.stack.top().data) == 1:
                 continue
 
             if not convert_process_to_pre_process:
@@ -751,40 +919,39 @@ class EngineV3(object):
             if self._isInProcess and i == (self.stack.size()-1):
                 self.topProcessToPre = True
             else:
-                new_path = self.stack.pathOnIndex(i)[:]
+                new_path = self.stack[i].path[:]
                 # no need to compute the index, the cmd will be reset,
                 # so the first available sub cmd will be at the index 0
                 new_path.append(0)
-                self.stack.setPathOnIndex(i, new_path)
+                self.stack[i].path = new_path
 
-            self.stack.setTypeOnIndex(i, PREPROCESS_INSTRUCTION)
+            self.stack[i].type = PREPROCESS_INSTRUCTION
 
-        cmd.reset()
-        self.cmd_list.append(cmd)
+        self.cmd_list.append(CommandState(cmd))
 
     def isCurrentRootCommand(self):
         self.stack.raiseIfEmpty("isCurrentRootCommand")
-        return self.stack.cmdIndexOnTop() == 0
+        return self.stack.top().cmdIndex() == 0
 
     def isCurrentProcessCommand(self):
         self.stack.raiseIfEmpty("isCurrentProcessCommand")
-        return self.stack.cmdIndexOnTop() == len(self.cmd_list)-1
+        return self.stack.top().cmdIndex() == len(self.cmd_list)-1
 
     def getCurrentCommand(self):
         self.stack.raiseIfEmpty("getCurrentCommand")
-        return self.cmd_list[self.stack.cmdIndexOnTop()]
+        return self.cmd_list[self.stack.top().cmdIndex()]
 
     def hasPreviousCommand(self):
         self.stack.raiseIfEmpty("hasPreviousCommand")
-        return self.stack.cmdIndexOnTop() > 0
+        return self.stack.top().cmdIndex() > 0
 
     def getPreviousCommand(self):
         self.stack.raiseIfEmpty("getPreviousCommand")
-        if self.stack.cmdIndexOnTop() == 0:
+        if self.stack.top().cmdIndex() == 0:
             raise ExecutionException("(engine) getPreviousCommand, there is no"
                                      " previous command")
 
-        return self.cmd_list[self.stack.cmdIndexOnTop()-1]
+        return self.cmd_list[self.stack.top().cmdIndex()-1]
 
 # ##  SPLIT/MERGE meth # ##
 
@@ -797,15 +964,14 @@ class EngineV3(object):
                       toppest_item_to_merge,
                       "mergeDataAndSetEnablingMap",
                       "stack")
+        frame = self.stack[toppest_item_to_merge]
         raisIfInvalidMap(new_map,
-                         self.stack.subCmdLengthOnIndex(toppest_item_to_merge,
-                                                        self.cmd_list),
+                         frame.subCmdLength(self.cmd_list),
                          "mergeDataAndSetEnablingMap")
 
         # current index must be enabled in map
         if new_map is not None:
-            subindex = self.stack.subCmdIndexOnIndex(toppest_item_to_merge)
-            if not new_map[subindex]:
+            if not new_map[frame.subCmdIndex()]:
                 raise ExecutionException("(engine) mergeDataAndSetEnablingMap,"
                                          " the current sub command is disabled"
                                          " in the new map")
@@ -818,12 +984,13 @@ class EngineV3(object):
         self.mergeData(toppest_item_to_merge, count, None)
 
         # set the new map
-        self.stack.setEnableMapOnIndex(toppest_item_to_merge-count+1, new_map)
+        self.stack[toppest_item_to_merge-count+1].enabling_map = new_map
 
     def mergeData(self,
                   toppest_item_to_merge=-1,
                   count=2,
                   index_of_the_map_to_keep=None):
+        self.staticPlanEnabled = False
         # need at least two item to merge
         if count < 2:
             return False  # no need to merge
@@ -839,7 +1006,7 @@ class EngineV3(object):
                                      "data on stack to merge from this index")
 
         # can only merge on PREPROCESS
-        if (self.stack.typeOnIndex(toppest_item_to_merge) !=
+        if (self.stack[toppest_item_to_merge].type !=
            PREPROCESS_INSTRUCTION):
             raise ExecutionException("(engine) mergeDataOnStack, try to merge "
                                      "a not preprocess action")
@@ -853,12 +1020,11 @@ class EngineV3(object):
                                          " map of the selected items")
 
             # get the valid map
-            enabling_map = self.stack.enablingMapOnIndex(
-                index_of_the_map_to_keep)
+            enabling_map = self.stack[index_of_the_map_to_keep].enabling_map
 
             if enabling_map is not None:
                 # the current index must be enabled in the new map
-                subindex = self.stack.subCmdIndexOnIndex(toppest_item_to_merge)
+                subindex = self.stack[toppest_item_to_merge].subCmdIndex()
                 if not enabling_map[subindex]:
                     raise ExecutionException("(engine) "
                                              "mergeDataAndSetEnablingMap, the "
@@ -870,13 +1036,12 @@ class EngineV3(object):
             enabling_map = None
 
         # extract information from first item
-        path = self.stack.pathOnIndex(toppest_item_to_merge)
+        path = self.stack[toppest_item_to_merge].path
 
         for i in range(1, count):
-            current_stack_item = self.stack.itemOnIndex(
-                toppest_item_to_merge-i)
+            current_stack_item = self.stack[toppest_item_to_merge-i]
             equals, same_length, equals_count, path1_is_higher = \
-                equalPath(path, current_stack_item[1])
+                equalPath(path, current_stack_item.path)
 
             # the path must be the same for each item to merge
             #   execpt for the last command, the items not at the top of the
@@ -893,7 +1058,7 @@ class EngineV3(object):
                                          str(equals_count)+">")
 
             # the action must be the same type
-            if current_stack_item[2] != PREPROCESS_INSTRUCTION:
+            if current_stack_item.type != PREPROCESS_INSTRUCTION:
                 raise ExecutionException("(engine) mergeDataOnStack, the "
                                          "action of the item at index <" +
                                          str(i)+"> is different of the action"
@@ -902,14 +1067,14 @@ class EngineV3(object):
         # merge data and keep start/end command
         data_bunch = []
         for i in range(0, count):
-            data_bunch.extend(self.stack.dataOnIndex(toppest_item_to_merge-i))
+            data_bunch.extend(self.stack[toppest_item_to_merge-i].data)
             del self.stack[toppest_item_to_merge - i]
 
         self.stack.insert(toppest_item_to_merge-count+1,
-                          (data_bunch,
-                           path,
-                           PREPROCESS_INSTRUCTION,
-                           enabling_map,))
+                          StackFrame(data_bunch,
+                                     path,
+                                     PREPROCESS_INSTRUCTION,
+                                     enabling_map))
         return True
 
     def splitDataAndSetEnablingMap(self,
@@ -922,8 +1087,8 @@ class EngineV3(object):
                       item_to_split,
                       "splitDataAndSetEnablingMap",
                       "stack")
-        expected_map_length = self.stack.subCmdLengthOnIndex(item_to_split,
-                                                             self.cmd_list)
+        frame = self.stack[item_to_split]
+        expected_map_length = frame.subCmdLength(self.cmd_list)
         raisIfInvalidMap(map1,
                          expected_map_length,
                          "splitDataAndSetEnablingMap")
@@ -937,7 +1102,7 @@ class EngineV3(object):
 
         # current index must be enabled in new map1 (really ?)
         if (map1 is not None and
-           not map1[self.stack.subCmdIndexOnIndex(item_to_split)]):
+           not map1[frame.subCmdIndex()]):
             raise ExecutionException("(engine) mergeDataAndSetEnablingMap, the"
                                      " current sub command can not be disabled"
                                      " in the map1")
@@ -950,11 +1115,11 @@ class EngineV3(object):
 
         # set new map
         if state:  # is a split occured ?
-            self.stack.setEnableMapOnIndex(item_to_split, map2)
-            self.stack.pathOnIndex(item_to_split)[-1] = new_map_to_index
-            self.stack.setEnableMapOnIndex(item_to_split+1, map1)
+            self.stack[item_to_split].enabling_map = map2
+            self.stack[item_to_split].path[-1] = new_map_to_index
+            self.stack[item_to_split+1].enabling_map = map1
         else:
-            self.stack.setEnableMapOnIndex(item_to_split, map1)
+            self.stack[item_to_split].enabling_map = map1
 
         return state
 
@@ -964,19 +1129,20 @@ class EngineV3(object):
                   item_to_split=-1,
                   split_at_data_index=0,
                   reset_enabling_map=False):
+        self.staticPlanEnabled = False
         # is empty stack ?
         self.stack.raiseIfEmpty("splitData")
         isAValidIndex(self.stack, item_to_split, "splitData", "stack")
 
         # is it a pre ? (?)
-        if self.stack.typeOnIndex(item_to_split) != PREPROCESS_INSTRUCTION:
+        if self.stack[item_to_split].type != PREPROCESS_INSTRUCTION:
             raise ExecutionException("(engine) splitData, can't split the "
                                      "data of a PRO/POST process because it "
                                      "will not change anything on the "
                                      "execution")
 
         # split point exist ?
-        topdata = self.stack.dataOnIndex(item_to_split)
+        topdata = self.stack[item_to_split].data
         isAValidIndex(topdata,
                       split_at_data_index,
                       "splitData",
@@ -994,40 +1160,44 @@ class EngineV3(object):
         top = self.stack[item_to_split]
         del self.stack[item_to_split]
 
-        path = top[1][:]
+        path = top.path[:]
         if reset_enabling_map:
             enable_map = None
             path[-1] = 0
         else:
-            enable_map = top[3]
+            enable_map = top.enabling_map
             path[-1] = 0
 
         # push the two new items
-        self.stack.insert(item_to_split, (top[0][0:split_at_data_index],
-                                          top[1],
-                                          top[2],
-                                          enable_map,))
-        self.stack.insert(item_to_split, (top[0][split_at_data_index:],
-                                          path,
-                                          top[2],
-                                          enable_map,))
+        self.stack.insert(item_to_split,
+                          StackFrame(top.data[0:split_at_data_index],
+                                     top.path,
+                                     top.type,
+                                     enable_map))
+        self.stack.insert(item_to_split,
+                          StackFrame(top.data[split_at_data_index:],
+                                     path,
+                                     top.type,
+                                     enable_map))
 
         return True
 
 # ##  DATA meth (data of the top item on the stack) # ##
 
     def flushData(self):
+        self.staticPlanEnabled = False
         self.stack.raiseIfEmpty("flushData")
         # remove everything, the engine is able to manage an empty data bunch
-        del self.stack.dataOnTop()[:]
+        del self.stack.top().data[:]
 
     def appendData(self, newdata):
         self.stack.raiseIfEmpty("addData")
-        self.stack.dataOnTop().append(newdata)
+        self._consumeInjection("appendData")
+        self.stack.top().data.append(newdata)
 
     def addData(self, newdata, offset=-1, forbide_insertion_at_zero=True):
         self.stack.raiseIfEmpty("addData")
-        data = self.stack.dataOnTop()
+        data = self.stack.top().data
 
         if forbide_insertion_at_zero and offset == 0:
             raise ExecutionException("(engine) addData, can't insert a data at"
@@ -1037,11 +1207,13 @@ class EngineV3(object):
                                      "forbide_insertion_at_zero, set it to "
                                      "False")
 
+        self._consumeInjection("addData")
         data.insert(offset, newdata)
 
     def removeData(self, offset=0, reset_sub_cmd_index_if_offset_zero=True):
+        self.staticPlanEnabled = False
         self.stack.raiseIfEmpty("removeData")
-        data = self.stack.dataOnTop()
+        data = self.stack.top().data
         isAValidIndex(data, offset, "removeData", "data on top")
 
         # remove the data
@@ -1065,33 +1237,36 @@ class EngineV3(object):
                                              "this databunch, can not remove "
                                              "the data at zero index")
             else:
-                self.stack[-1][1][-1] = 0
+                self.stack.top().path[-1] = 0
 
     def setData(self, newdata, offset=0):
         self.stack.raiseIfEmpty("setData")
-        data = self.stack.dataOnTop()
+        data = self.stack.top().data
         isAValidIndex(data, offset, "removeData", "data on top")
         data[offset] = newdata
 
     def getData(self, offset=0):
         self.stack.raiseIfEmpty("getData")
-        data = self.stack.dataOnTop()
+        data = self.stack.top().data
         isAValidIndex(data, offset, "getData", "data on top")
         return data[offset]
 
     def hasNextData(self):
         self.stack.raiseIfEmpty("hasNextData")
-        # 1 and not zero, because there are the current data and the next one
-        return len(self.stack.dataOnTop()) > 1
+        # 2 and not 1, because there are the current data and the next one.
+        # At most the next data is pulled from a lazy bunch
+        return self.stack.top().data.hasData(2)
 
     def getRemainingDataCount(self):
+        "count the data of a lazy bunch, the whole source is consumed"
         self.stack.raiseIfEmpty("getRemainingDataCount")
         # -1 because we don't care about the current data
-        return len(self.stack.dataOnTop())-1
+        return len(self.stack.top().data)-1
 
     def getDataCount(self):
+        "count the data of a lazy bunch, the whole source is consumed"
         self.stack.raiseIfEmpty("getDataCount")
-        return len(self.stack.dataOnTop())
+        return len(self.stack.top().data)
 
 # ##  VARIOUS meth # ##
 
@@ -1103,27 +1278,144 @@ class EngineV3(object):
 
 # ##  ENGINE core meth # ##
 
+    def setDeadline(self, deadline):
+        "the execution is interrupted once the timer goes past the deadline"
+        self.deadline = deadline
+
+    def getDeadline(self):
+        return self.deadline
+
     def execute(self):
         self.raiseIfInMethodExecution("execute")
+        self._raiseIfTimeout()
 
+        # a static pipeline is executed with a straight line plan, the stack
+        # machine takes over the remaining stack if a dynamic api is used
+        if self.staticPlanEnabled:
+            plan = self._buildStaticPlan()
+            if plan is not None:
+                self._executeStaticPlan(plan)
+
+        self._executeStackMachine()
+
+    def _buildStaticPlan(self):
+        # a command is static if it holds only one enabled sub command, the
+        # enabling maps and the pending index operations are never used
+        if self.topPreIndexOpp is not None or self.topProcessToPre:
+            return None
+
+        for frame in self.stack:
+            if frame.enabling_map is not None:
+                return None
+
+        plan = []
+        for index in range(0, len(self.cmd_list)):
+            cmd = self.cmd_list[index]
+            if len(cmd) != 1 or cmd.dymamic_count > 0:
+                return None
+
+            subcmd, use_args, enabled = cmd[0]
+            if not enabled:
+                return None
+
+            if use_args:
+                args = self.args_list[index]
+                mapped_args = self.mapped_args_list[index]
+            else:
+                args = None
+                mapped_args = EMPTY_MAPPED_ARGS
+
+            plan.append((cmd, subcmd, args, mapped_args,))
+
+        return plan
+
+    def _executeStaticPlan(self, plan):
+        stack = self.stack
+        last_level = len(plan) - 1
+
+        while len(stack) > 0:
+            top = stack[-1]
+            data = top.data
+
+            # if empty data, this databunch is out, no more thing to do
+            if not data.hasData():
+                stack.pop()
+                continue
+
+            path = top.path
+            level = len(path) - 1
+            cmd, subcmd, args, mapped_args = plan[level]
+            ins_type = top.type
+            path[-1] = 0
+
+            r = self._executeInstruction(top,
+                                         subcmd,
+                                         ins_type,
+                                         args,
+                                         mapped_args)
+
+            # a dynamic api has been used by the sub command, finish this
+            # step with the stack machine rules then let it continue
+            if not self.staticPlanEnabled:
+                to_stack = self._manageResult(top, ins_type, r)
+                self._raiseIfStopped()
+                self._manageStack(top, cmd, ins_type, to_stack)
+                return
+
+            # the result is kept before the stop check, like the stack
+            # machine does
+            if ins_type == PREPROCESS_INSTRUCTION:
+                if level == last_level:
+                    to_stack = StackFrame(r, path[:], PROCESS_INSTRUCTION)
+                else:
+                    to_stack = StackFrame(r,
+                                          path + [0],
+                                          PREPROCESS_INSTRUCTION)
+            elif ins_type == PROCESS_INSTRUCTION:
+                to_stack = StackFrame(r, path[:], POSTPROCESS_INSTRUCTION)
+            elif level > 0:
+                to_stack = StackFrame(r, path[:-1], POSTPROCESS_INSTRUCTION)
+            else:
+                to_stack = None
+                if self.results is not None:
+                    self._collectResult(r)
+
+                if len(stack) == 1:
+                    self._setLastResult(r)
+
+            self._raiseIfStopped()
+
+            # next data of the current bunch or remove the bunch
+            if data.hasData(2):
+                data.advance()
+            else:
+                stack.pop()
+
+            if to_stack is not None:
+                stack.append(to_stack)
+
+    def _executeStackMachine(self):
         # consume stack
-        while self.stack.size() > 0:  # while there is some item into the stack
-            cmd = self.stack.getCmdOnTop(self.cmd_list)
-            sub_cmd_index = self.stack.subCmdIndexOnTop() % len(cmd)
-            enabling_map = self.stack.enablingMapOnTop()
-            data = self.stack.dataOnTop()
+        while len(self.stack) > 0:  # while there is some item into the stack
+            top = self.stack[-1]
+            path = top.path
+            cmd = self.cmd_list[len(path)-1]
+            sub_cmd_index = path[-1] % len(cmd)
+            enabling_map = top.enabling_map
+            data = top.data
 
             # ##  COMPUTE THE FIRST AVAILABLE INDEX # ##
             sub_cmd_index %= len(cmd)
             before_current_index = (sub_cmd_index + len(cmd) - 1) % len(cmd)
-            while len(data) > 0:
+            has_data = data.hasData()
+            while has_data:
                 if ((enabling_map is not None and
                    not enabling_map[sub_cmd_index]) or
                    cmd.isdisabledCmd(sub_cmd_index)):
                     # we test every cmd available in this databunch,
                     # they are all disabled
                     if sub_cmd_index == before_current_index:
-                        data = ()
+                        has_data = False
                         # will go to the else statement of the current loop
                         continue
 
@@ -1132,179 +1424,258 @@ class EngineV3(object):
                     # do we reach the end of the available index for this
                     # data ?
                     if sub_cmd_index >= len(cmd):
-                        del data[0]
+                        data.advance()
                         sub_cmd_index = 0
+                        has_data = data.hasData()
 
                     continue  # need to test the next index
                 break  # we have an enabled index with at least one data
 
-            # len(self.stack.dataOnTop()) == 0: # if empty data, this
+            # len(top.data) == 0: # if empty data, this
             # databunch is out, no more thing to do
             else:
                 self.stack.pop()
                 continue
 
             # ##  EXTRACT DATA FROM STACK # ##
-            top = self.stack.top()
             subcmd, use_args, enabled = cmd[sub_cmd_index]
-            ins_type = self.stack.typeOnTop()
-            top[1][-1] = sub_cmd_index  # set current index in databunch
-
-            # ##  EXECUTE command # ##
-            # prepare the var to push on the stack, if the var keep the
-            # none value, nothing will be stacked
-            to_stack = None
+            ins_type = top.type
+            path[-1] = sub_cmd_index  # set current index in databunch
 
             if use_args:
-                index_on_top = self.stack.cmdIndexOnTop()
+                index_on_top = len(path) - 1
                 args = self.args_list[index_on_top]
                 mapped_args = self.mapped_args_list[index_on_top]
             else:
                 args = None
                 mapped_args = EMPTY_MAPPED_ARGS
 
-            # #  PRE PROCESS
-            if ins_type == PREPROCESS_INSTRUCTION:  # pre
-                r = self._executeMethod(cmd,
-                                        subcmd.preProcess,
-                                        top,
-                                        args,
-                                        mapped_args[0])
-                subcmd.pre_count += 1
-
-                new_path = top[1][:]  # copy the path
-                if self.topPreIndexOpp is not None:
-                    if self.topPreIndexOpp < 0:
-                        # little hack to get the index 0 on the current data
-                        # on the next execution
-                        top[1][-1] = len(cmd) - 1
-                        top[0].insert(0, None)
-                    else:
-                        top[1][-1] += self.topPreIndexOpp
-
-                    self.topPreIndexOpp = None
-
-                # manage result
-                # no child, next step will be a process
-                if len(top[1]) == len(self.cmd_list):
-                    to_stack = (r, new_path, PROCESS_INSTRUCTION, )
-                else:
-                    # there are some child, next step will be another
-                    # preprocess
-                    # build first index to execute, it's not always 0
-                    # new_cmd = self.cmd_list[len(top[1])]  # the -1 is not
-                    # missing, we want the next cmd, not the current
-                    # next_data, new_index =
-                    # self._computeTheNextChildToExecute(new_cmd,
-                    # len(new_cmd)-1, None)
-
-                    # the first cmd has no subcmd enabled, impossible to
-                    # start the engine
-                    # if new_index == -1:
-                    #     raise ExecutionException("(engine) execute, no
-                    #       enabled subcmd on the cmd "+str(len(top[1])))
-
-                    # then add the first index of the next command
-                    new_path.append(0)
-                    to_stack = (r, new_path, PREPROCESS_INSTRUCTION, )
-
-            # #  PROCESS # #
-            elif ins_type == PROCESS_INSTRUCTION:  # pro
-                r = self._executeMethod(cmd,
-                                        subcmd.process,
+            # ##  EXECUTE command # ##
+            r = self._executeInstruction(top,
+                                         subcmd,
+                                         ins_type,
+                                         args,
+                                         mapped_args)
+
+            # prepare the var to push on the stack, if the var keep the
+            # none value, nothing will be stacked
+            to_stack = self._manageResult(top, ins_type, r)
+            self._raiseIfStopped()
+            self._manageStack(top, cmd, ins_type, to_stack)
+
+    def _executeInstruction(self, top, subcmd, ins_type, args, mapped_args):
+        data = top.data
+        cmd = self.cmd_list[len(top.path)-1]
+        counters = cmd.counters[top.path[-1]]
+
+        # #  PRE PROCESS
+        if ins_type == PREPROCESS_INSTRUCTION:  # pre
+            r = self._executeMethod(subcmd.preProcess,
+                                    top,
+                                    args,
+                                    mapped_args[0])
+            counters[PREPROCESS_INSTRUCTION] += 1
+            return r
+
+        # #  PROCESS # #
+        if ins_type == PROCESS_INSTRUCTION:  # pro
+            if subcmd.parallel and self.poolSize > 1:
+                bunch = self._getParallelBunch(data)
+                if bunch is not None:
+                    r = self._executeParallelMethod(subcmd,
+                                                    bunch,
+                                                    data,
+                                                    mapped_args[1])
+                    counters[PROCESS_INSTRUCTION] += len(r)
+                    return _mergeOutputs(r)
+
+            bunch = self._getBunch(subcmd.process, data)
+            if bunch is None:
+                r = self._executeMethod(subcmd.process,
                                         top,
                                         None,
                                         mapped_args[1])
-                subcmd.pro_count += 1
-                # manage result
-                to_stack = (r, top[1][:], POSTPROCESS_INSTRUCTION,)
-
-                if self.topProcessToPre:
-                    self.topProcessToPre = False
-                    top[1].append(0)
-
-            # #  POST PROCESS # #
-            elif ins_type == POSTPROCESS_INSTRUCTION:  # post
-                r = self._executeMethod(cmd,
-                                        subcmd.postProcess,
+                counters[PROCESS_INSTRUCTION] += 1
+                return r
+
+            r = self._executeBunchMethod(subcmd.process,
+                                         bunch,
+                                         data,
+                                         mapped_args[1])
+            counters[PROCESS_INSTRUCTION] += len(r)
+            return _mergeOutputs(r)
+
+        # #  POST PROCESS # #
+        if ins_type == POSTPROCESS_INSTRUCTION:  # post
+            bunch = self._getBunch(subcmd.postProcess, data)
+            if bunch is None:
+                r = self._executeMethod(subcmd.postProcess,
                                         top,
                                         None,
                                         mapped_args[2])
-                subcmd.post_count += 1
-
-                # manage result
-                if len(top[1]) > 1:  # not on the root node
-                    # just remove one item in the path to get the next
-                    # postprocess to execute
-                    to_stack = (r, top[1][:-1], POSTPROCESS_INSTRUCTION,)
-                # so this is the last post for this data
+                counters[POSTPROCESS_INSTRUCTION] += 1
+                return r
+
+            r = self._executeBunchMethod(subcmd.postProcess,
+                                         bunch,
+                                         data,
+                                         mapped_args[2])
+            counters[POSTPROCESS_INSTRUCTION] += len(r)
+
+            # the last output is the one of the last data, keep it as result
+            # if this is the end of the execution
+            if len(top.path) > 1:
+                return _mergeOutputs(r)
+
+            return r[-1]
+
+        raise ExecutionException("(engine) execute, unknwon process "
+                                 "command '"+str(ins_type)+"'")
+
+    def _manageResult(self, top, ins_type, r):
+        path = top.path
+
+        # #  PRE PROCESS
+        if ins_type == PREPROCESS_INSTRUCTION:
+            new_path = path[:]  # copy the path
+            if self.topPreIndexOpp is not None:
+                if self.topPreIndexOpp < 0:
+                    # little hack to get the index 0 on the current data
+                    # on the next execution
+                    path[-1] = len(self.cmd_list[len(path)-1]) - 1
+                    top.data.insert(0, None)
                 else:
-                    # and there is no more data to process
-                    if self.stack.size() == 1:
-                        if isinstance(r, MultiOutput):
-                            self.lastResult = r
-                        else:
-                            if len(r) > 0 and r[0] is EMPTY_DATA_TOKEN:
-                                self.lastResult = ()
-                            else:
-                                self.lastResult = r
-            else:
-                raise ExecutionException("(engine) execute, unknwon process "
-                                         "command '"+str(ins_type)+"'")
-
-            if self.selfkillreason is not None:
-                reason, abnormal = self.selfkillreason
-                raise EngineInterruptionException("(engine) stopExecution, "
-                                                  "execution stop, reason: " +
-                                                  reason,
-                                                  abnormal)
-
-            if subcmd.pre_count > DEFAULT_EXECUTION_LIMIT:
-                raise ExecutionException("(engine) execute, this subcommand "
-                                         "reach the execution limit count for "
-                                         "preprocess")
-            elif subcmd.pro_count > DEFAULT_EXECUTION_LIMIT:
-                raise ExecutionException("(engine) execute, this subcommand "
-                                         "reach the execution limit count for "
-                                         "process")
-            elif subcmd.post_count > DEFAULT_EXECUTION_LIMIT:
-                raise ExecutionException("(engine) execute, this subcommand "
-                                         "reach the execution limit count for "
-                                         "postprocess")
-
-            # ##  MANAGE STACK, need to repush the current item ? # ##
-            self.stack.pop()
-
-            # process or postprocess ?
-            if (ins_type == PROCESS_INSTRUCTION or
-               ins_type == POSTPROCESS_INSTRUCTION):
-                if len(top[0]) > 1:  # still data to execute ?
-                    # remove the last used data and push on the stack
-                    self.stack.push(top[0][1:], top[1], top[2])
-            # ins_type == 0 # preprocess, can't be anything else, a test has
-            # already occured sooner in the engine function
-            else:
-                next_data, new_index = \
-                    self._computeTheNextChildToExecute(cmd, top[1][-1], top[3])
-                # something to do ? (if new_index == -1, there is no
-                # more enabled cmd for this data bunch)
-                if (((not next_data and len(top[0]) > 0) or
-                    len(top[0]) > 1) and
-                   new_index >= 0):
-                    # if we need to use the next data,
-                    # we need to remove the old one
-                    if next_data:
-                        del top[0][0]  # remove the used data
-
-                    # select the next child id
-                    top[1][-1] = new_index
-
-                    # push on the stack again
-                    self.stack.push(top[0], top[1], top[2], top[3])
-
-            # ##  STACK THE RESULT of the current process if needed # ##
-            if to_stack is not None:
-                self.stack.push(*to_stack)
+                    path[-1] += self.topPreIndexOpp
+
+                self.topPreIndexOpp = None
+
+            # manage result
+            # no child, next step will be a process
+            if len(path) == len(self.cmd_list):
+                return (r, new_path, PROCESS_INSTRUCTION, )
+
+            # there are some child, next step will be another
+            # preprocess
+            # build first index to execute, it's not always 0
+            # new_cmd = self.cmd_list[len(path)]  # the -1 is not
+            # missing, we want the next cmd, not the current
+            # next_data, new_index =
+            # self._computeTheNextChildToExecute(new_cmd,
+            # len(new_cmd)-1, None)
+
+            # the first cmd has no subcmd enabled, impossible to
+            # start the engine
+            # if new_index == -1:
+            #     raise ExecutionException("(engine) execute, no
+            #       enabled subcmd on the cmd "+str(len(path)))
+
+            # then add the first index of the next command
+            new_path.append(0)
+            return (r, new_path, PREPROCESS_INSTRUCTION, )
+
+        # #  PROCESS # #
+        if ins_type == PROCESS_INSTRUCTION:
+            # manage result
+            to_stack = (r, path[:], POSTPROCESS_INSTRUCTION,)
+
+            if self.topProcessToPre:
+                self.topProcessToPre = False
+                path.append(0)
+
+            return to_stack
+
+        # #  POST PROCESS # #
+        if len(path) > 1:  # not on the root node
+            # just remove one item in the path to get the next
+            # postprocess to execute
+            return (r, path[:-1], POSTPROCESS_INSTRUCTION,)
+
+        if self.results is not None:
+            self._collectResult(r)
+
+        # so this is the last post for this data
+        # and there is no more data to process
+        if self.stack.size() == 1:
+            self._setLastResult(r)
+
+        return None
+
+    def _setLastResult(self, r):
+        if isinstance(r, DataBunch):
+            # the result of the execution is not lazy
+            r = MultiOutput(r)
+
+        if isinstance(r, MultiOutput):
+            self.lastResult = r
+        elif len(r) > 0 and r[0] is EMPTY_DATA_TOKEN:
+            self.lastResult = ()
+        else:
+            self.lastResult = r
+
+    def _collectResult(self, r):
+        # called for every data of the root post process
+        if len(r) > 0 and r[0] is EMPTY_DATA_TOKEN:
+            return
+
+        self.results.extend(r)
+
+    def _raiseIfStopped(self):
+        if self.selfkillreason is not None:
+            reason, abnormal = self.selfkillreason
+            raise EngineInterruptionException("(engine) stopExecution, "
+                                              "execution stop, reason: " +
+                                              reason,
+                                              abnormal)
+
+        if self.deadline is not None:
+            self._raiseIfTimeout()
+
+    def _raiseIfTimeout(self):
+        if self.deadline is not None and timer() > self.deadline:
+            raise ExecutionTimeoutException("(engine) execute, the execution "
+                                            "time limit has been exceeded")
+
+    def _manageStack(self, top, cmd, ins_type, to_stack):
+        data = top.data
+
+        # ##  MANAGE STACK, need to repush the current item ? # ##
+        self.stack.pop()
+
+        # process or postprocess ?
+        if (ins_type == PROCESS_INSTRUCTION or
+           ins_type == POSTPROCESS_INSTRUCTION):
+            if data.hasData(2):  # still data to execute ?
+                # remove the last used data and push on the stack
+                data.advance()
+                top.enabling_map = None
+                self.stack.append(top)
+        # ins_type == 0 # preprocess, can't be anything else, a test has
+        # already occured sooner in the engine function
+        else:
+            path = top.path
+            next_data, new_index = \
+                self._computeTheNextChildToExecute(cmd,
+                                                   path[-1],
+                                                   top.enabling_map)
+            # something to do ? (if new_index == -1, there is no
+            # more enabled cmd for this data bunch)
+            if (((not next_data and data.hasData()) or
+                data.hasData(2)) and
+               new_index >= 0):
+                # if we need to use the next data,
+                # we need to remove the old one
+                if next_data:
+                    data.advance()  # remove the used data
+
+                # select the next child id
+                path[-1] = new_index
+
+                # push on the stack again
+                self.stack.append(top)
+
+        # ##  STACK THE RESULT of the current process if needed # ##
+        if to_stack is not None:
+            self.stack.append(StackFrame(*to_stack))
 
     def _computeTheNextChildToExecute(self,
                                       cmd,
@@ -1330,15 +1701,199 @@ class EngineV3(object):
             if starting_index == current_sub_cmd_index:
                 return execute_on_next_data, -1
 
+    def _getBunch(self, subcmd, data):
+        # a bunch is only useful if there is more than one data, the data of
+        # a lazy bunch are processed one by one to keep the stream lazy
+        if (not hasattr(subcmd, "bunchProcess") or data.isLazy() or
+           not data.hasData(2)):
+            return None
+
+        bunch = data.peek(BUNCH_SIZE_LIMIT)
+
+        # the empty data token has to be managed data by data
+        for item in bunch:
+            if item is EMPTY_DATA_TOKEN:
+                return None
+
+        return bunch
+
+    def _executeBunchMethod(self,
+                            subcmd,
+                            bunch,
+                            data,
+                            mapped_args=EMPTY_MAPPED_ARGS):
+        bunch_method = subcmd.bunchProcess
+
+        # bind the bunch method to the instance of the Command if the
+        # decorated method is a method of this Command
+        owner = getattr(subcmd, "__self__", None)
+        if owner is not None and getattr(bunch_method, "__self__",
+                                         None) is None:
+            bunch_method = types.MethodType(bunch_method, owner)
+
+        # the data are checked by the checker of the single data method,
+        # the bunch method receives the list of the checked arguments
+        top = self.stack[-1]
+        checker_start = timer()
+        data_list, lock = self._checkBunchArgs(subcmd, bunch, mapped_args)
+        bunch_size = len(bunch)
+
+        lock_start = timer()
+        with lock:
+            call_start = timer()
+            self._isInProcess = True
+            try:
+                result = bunch_method(data_list)
+            finally:
+                call_end = timer()
+                self._isInProcess = False
+
+        if self.profiler is not None:
+            self.profiler.record(len(top.path) - 1,
+                                 top.path[-1],
+                                 top.type,
+                                 bunch_method,
+                                 lock_start - checker_start,
+                                 call_start - lock_start,
+                                 call_end - call_start)
+
+        # every data of the bunch is consumed, only keep the last one on the
+        # stack to let the execute loop remove it
+        data.advance(bunch_size - 1)
+
+        # manage None output
+        if result is None:
+            return [self._manageNoneOutput(subcmd)] * bunch_size
+
+        if (not hasattr(result, "__iter__") or isinstance(result, MultiOutput)
+           or len(result) != bunch_size):
+            excmsg = ("(engine) _executeBunchMethod, a bunch method must "
+                      "return one output per data, expected '%s' outputs, "
+                      "got '%s'")
+            excmsg %= (str(bunch_size), str(result),)
+            raise ExecutionException(excmsg)
+
+        outputs = []
+        for output in result:
+            if output is None:
+                outputs.append(self._manageNoneOutput(subcmd))
+            elif isinstance(output, MultiOutput):
+                outputs.append(output)
+            elif isLazyOutput(output):
+                outputs.append(self._pullLazyOutput(bunch_method,
+                                                    output,
+                                                    lock,
+                                                    top.path,
+                                                    top.type))
+            else:
+                outputs.append([output])
+
+        return outputs
+
+    def _getParallelBunch(self, data):
+        if not data.hasData(2):
+            return None
+
+        # only look a few data ahead in a lazy bunch
+        if data.isLazy():
+            return data.peek(self.poolSize)
+
+        return data.peek(BUNCH_SIZE_LIMIT)
+
+    def _executeParallelMethod(self,
+                               cmd,
+                               bunch,
+                               data,
+                               mapped_args=EMPTY_MAPPED_ARGS):
+        subcmd = cmd.process
+        top = self.stack[-1]
+        checker_start = timer()
+
+        # the arguments are checked in the engine thread, the checkers and
+        # the accessors are allowed to use the engine
+        calls = []
+        for item in bunch:
+            if item is EMPTY_DATA_TOKEN:
+                item = ()
+
+            method_data, lock = self._checkArgs(subcmd, item, mapped_args)
+            calls.append((subcmd, method_data, lock,))
+
+        # the engine api can not be safely used from the workers, the stack
+        # does not move until every worker has finished
+        call_start = timer()
+        self._isInProcess = True
+        try:
+            result = mapInPool(self.poolSize, calls, cmd.process_pool)
+        finally:
+            self._isInProcess = False
+
+        if self.profiler is not None:
+            self.profiler.record(len(top.path) - 1,
+                                 top.path[-1],
+                                 top.type,
+                                 subcmd,
+                                 call_start - checker_start,
+                                 0.0,
+                                 timer() - call_start)
+
+        # every data of the bunch is consumed, only keep the last one on the
+        # stack to let the execute loop remove it
+        data.advance(len(bunch) - 1)
+
+        # outputs are merged in the order of the data
+        outputs = []
+        for call, output in zip(calls, result):
+            if output is None:
+                outputs.append(self._manageNoneOutput(subcmd))
+            elif isinstance(output, MultiOutput):
+                outputs.append(output)
+            elif isLazyOutput(output):
+                outputs.append(self._pullLazyOutput(subcmd,
+                                                    output,
+                                                    call[2],
+                                                    top.path,
+                                                    top.type))
+            else:
+                outputs.append([output])
+
+        return outputs
+
+    def _manageNoneOutput(self, subcmd):
+        if hasattr(subcmd, "allowToReturnNone") and subcmd.allowToReturnNone:
+            return [[None]]
+
+        return [EMPTY_DATA_TOKEN]
+
     def _executeMethod(self,
-                       cmd,
                        subcmd,
                        stack_state,
                        args=None,
                        mapped_args=EMPTY_MAPPED_ARGS):
-        next_data = stack_state[0][0]
+        args = self._prepareArgs(args, stack_state.data[0])
+        r, lock = self._callMethod(subcmd, args, mapped_args)
 
-        # prepare data
+        # manage None output
+        if r is None:
+            return self._manageNoneOutput(subcmd)
+
+        # r must be a multi output
+        if isinstance(r, MultiOutput):
+            return r
+
+        # an iterator is a lazy multi output, its data will be pulled only
+        # when the next steps need them
+        if isLazyOutput(r):
+            source = self._pullLazyOutput(subcmd,
+                                          r,
+                                          lock,
+                                          stack_state.path,
+                                          stack_state.type)
+            return DataBunch(source=source)
+
+        return [r]
+
+    def _prepareArgs(self, args, next_data):
         if args is not None:
             args = args[:]
             if next_data != EMPTY_DATA_TOKEN:
@@ -1348,55 +1903,124 @@ class EngineV3(object):
                 else:  # case where the previous process return only one args
                     args.append(next_data)
 
-        elif next_data != EMPTY_DATA_TOKEN:
-            args = next_data
-        else:
-            args = ()
+            return args
 
-        # execute checker
-        if hasattr(subcmd, "checker"):
-            # TODO use mapped_args in checker
+        if next_data != EMPTY_DATA_TOKEN:
+            return next_data
 
-            data = subcmd.checker.checkArgs(args, mapped_args, self)
+        return ()
 
-            # find lockable object
-            lockable_list = []
-            for k, v in data.items():
-                if not isinstance(v, EnvironmentParameter):
-                    continue
+    def _callMethod(self, subcmd, args, mapped_args):
+        "return the output of the call and the lock of its parameters"
 
-                if not v.isLockEnable():
-                    continue
+        if self.profiler is not None:
+            return self._callProfiledMethod(subcmd, args, mapped_args)
 
-                lockable_list.append(v)
+        data, lock = self._checkArgs(subcmd, args, mapped_args)
 
-            lock = ParametersLocker(lockable_list)
+        # execute Xprocess (X for pre/pro/post)
+        with lock:
+            self._isInProcess = True
+            try:
+                return subcmd(**data), lock
+            finally:
+                self._isInProcess = False
 
-        else:
-            data = {}
-            lock = FAKELOCK
+    def _callProfiledMethod(self, subcmd, args, mapped_args):
+        top = self.stack[-1]
+        checker_start = timer()
+        data, lock = self._checkArgs(subcmd, args, mapped_args)
+        lock_start = timer()
 
-        # execute Xprocess (X for pre/pro/post)
         with lock:
+            call_start = timer()
             self._isInProcess = True
             try:
-                r = subcmd(**data)
+                return subcmd(**data), lock
             finally:
+                call_end = timer()
                 self._isInProcess = False
+                self.profiler.record(len(top.path) - 1,
+                                     top.path[-1],
+                                     top.type,
+                                     subcmd,
+                                     lock_start - checker_start,
+                                     call_start - lock_start,
+                                     call_end - call_start)
+
+    def _pullLazyOutput(self, subcmd, source, lock, path, ins_type):
+        """
+        generator pulling the data of an iterator returned by subcmd in the
+        context of its call: the parameters are locked, the engine api can
+        be used, the pull is profiled and the deadline is checked for each
+        data.  path and ins_type are the ones of the call, the stack has
+        moved when the data are pulled.
+        """
 
-        # manage None output
-        if r is None:
-            if (hasattr(subcmd, "allowToReturnNone") and
-               subcmd.allowToReturnNone):
-                return [[None]]
-            else:
-                return [EMPTY_DATA_TOKEN]
+        while True:
+            if self.deadline is not None:
+                self._raiseIfTimeout()
+
+            lock_start = timer()
+            with lock:
+                call_start = timer()
+                in_process = self._isInProcess
+                self._isInProcess = True
+                try:
+                    data = next(source)
+                except StopIteration:
+                    return
+                finally:
+                    self._isInProcess = in_process
+
+                    # the time of the pulls is added to the call of subcmd
+                    if self.profiler is not None:
+                        self.profiler.record(len(path) - 1,
+                                             path[-1],
+                                             ins_type,
+                                             subcmd,
+                                             0.0,
+                                             call_start - lock_start,
+                                             timer() - call_start,
+                                             count=0)
+
+            yield data
+
+    def _checkArgs(self, subcmd, args, mapped_args):
+        # execute checker
+        if hasattr(subcmd, "checker"):
+            # TODO use mapped_args in checker
 
-        # r must be a multi output
-        if isinstance(r, MultiOutput):
-            return r
+            data = subcmd.checker.checkArgs(args, mapped_args, self)
+            lock = ParametersLocker(_getLockableParameters(data))
 
-        return [r]
+        else:
+            data = {}
+            lock = FAKELOCK
+
+        return data, lock
+
+    def _checkBunchArgs(self, subcmd, bunch, mapped_args):
+        """
+        check every data of the bunch with the checker of subcmd, return the
+        list of the checked arguments and one lock for the parameters of the
+        whole bunch
+        """
+
+        if not hasattr(subcmd, "checker"):
+            return [{} for args in bunch], FAKELOCK
+
+        data_list = []
+        lockable_dict = {}
+        for args in bunch:
+            data = subcmd.checker.checkArgs(args, mapped_args, self)
+            data_list.append(data)
+
+            # a parameter used by several data must only be locked once
+            for param in _getLockableParameters(data):
+                lockable_dict[id(param)] = param
+
+        return data_list, ParametersLocker(list(lockable_dict.values()))
 
     def stopExecution(self,
                       reason=None,
@@ -1418,6 +2042,13 @@ class EngineV3(object):
         else:
             self.selfkillreason = (reason, abnormal,)
 
+    def requestStop(self, reason=None, abnormal=False):
+        "ask the engine to stop after the running process, from any thread"
+        if reason is None:
+            reason = "unknown"
+
+        self.selfkillreason = (reason, abnormal,)
+
     def raiseIfInMethodExecution(self, meth_name=None):
         if meth_name is None:
             meth_name = ""
@@ -1454,22 +2085,28 @@ class EngineV3(object):
             top = self.stack.top()
 
             # the index of the current command in execution
-            info["cmdIndex"] = self.stack.cmdIndexOnTop()
+            info["cmdIndex"] = self.stack.top().cmdIndex()
 
             # the object instance of the current command in execution
-            info["cmd"] = self.stack.getCmdOnTop(self.cmd_list)
+            info["cmd"] = self.stack.top().getCmd(self.cmd_list)
 
             # the index of the current sub command in execution
-            info["subCmdIndex"] = self.stack.subCmdIndexOnTop()
+            info["subCmdIndex"] = self.stack.top().subCmdIndex()
 
             # the object instance of the current sub command in execution
-            info["subCmd"] = self.cmd_list[len(top[1])-1][top[1][-1]]
+            info["subCmd"] = self.cmd_list[len(top.path)-1][top.path[-1]]
 
             # the data of the current execution
-            info["data"] = self.stack.dataOnTop()
+            info["data"] = self.stack.top().data
 
             # the process type of the current execution
-            info["process_type"] = self.stack.typeOnTop()
+            info["process_type"] = self.stack.top().type
+
+        # the statistics of every pre/pro/post process already called
+        if self.profiler is None:
+            info["profile"] = None
+        else:
+            info["profile"] = self.profiler.getEntries()
 
         return info
 
@@ -1478,12 +2115,13 @@ class EngineV3(object):
             print("empty stack")  # noqa
 
         for i in range(self.stack.size()-1, -1, -1):
-            cmd_enabled = self.stack[i][3]
+            frame = self.stack[i]
+            cmd_enabled = frame.enabling_map
             if cmd_enabled is None:
                 cmd_enabled = "(no mapping)"
 
-            print("# ["+str(i)+"] data="+str(self.stack[i][0])+", path=" +  # noqa
-                  str(self.stack[i][1])+", action="+str(self.stack[i][2]) +
+            print("# ["+str(i)+"] data="+str(frame.data)+", path=" +  # noqa
+                  str(frame.path)+", action="+str(frame.type) +
                   ", cmd enabled="+str(cmd_enabled))
 
     def printCmdList(self):
@@ -1507,7 +2145,7 @@ class EngineV3(object):
             if self.stack.isEmpty():
                 print("no item on the stack, and so no path available")  # noqa
 
-            path = self.stack.pathOnTop()
+            path = self.stack.top().path
 
         for i in range(0, len(path)):
             if i >= len(self.cmd_list):
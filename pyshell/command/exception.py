@@ -60,3 +60,8 @@ class EngineInterruptionException(PyshellException):
 
     def __str__(self):
         return str(self.value)
+
+
+class ExecutionTimeoutException(EngineInterruptionException):
+    def __init__(self, value):
+        EngineInterruptionException.__init__(self, value, abnormal=True)
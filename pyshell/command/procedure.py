@@ -16,6 +16,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
 from abc import ABCMeta, abstractmethod
 
 from pyshell.arg.accessor.default import DefaultAccessor
@@ -24,6 +25,8 @@ from pyshell.arg.checker.list import ListArgChecker
 from pyshell.arg.decorator import shellMethod
 from pyshell.command.command import UniCommand
 from pyshell.command.exception import EngineInterruptionException
+from pyshell.command.scriptcache import loadProgram
+from pyshell.command.scriptcache import storeProgram
 from pyshell.system.parameter.variable import VariableParameter
 from pyshell.utils.constants import ENABLE_ON_POST_PROCESS
 from pyshell.utils.constants import ENABLE_ON_PRE_PROCESS
@@ -31,6 +34,7 @@ from pyshell.utils.constants import ENABLE_ON_PROCESS
 from pyshell.utils.exception import ERROR
 from pyshell.utils.exception import PyshellException
 from pyshell.utils.executing import execute
+from pyshell.utils.parsing import Parser
 from pyshell.utils.setargs import setArgs
 
 
@@ -51,14 +55,38 @@ class AbstractLevelHandler(object):
         pass
 
 
+def compileFile(file_path):
+    """
+    parse every line of a procedure file, return a tuple of lines, each
+    line is a tuple (string, parsed commands, run in background).  The
+    variables stay unresolved, they are identified by the spotted indexes
+    of the parsed commands and solved at each execution.
+    """
+
+    program = []
+    with open(file_path) as f:
+        for line in f:
+            parser = Parser(line)
+            parser.parse()
+            program.append((line,
+                            tuple(parser),
+                            parser.isToRunInBackground(),))
+
+    return tuple(program)
+
+
 class FileProcedure(UniCommand):
     def __init__(self,
                  file_path,
                  execute_on=ENABLE_ON_PRE_PROCESS,
-                 granularity=float("inf")):
+                 granularity=float("inf"),
+                 use_disk_cache=False):
         # TODO (issue #126) check file_path
         self._file_path = file_path
 
+        # store the compiled file in a cache directory next to the file
+        self._use_disk_cache = use_disk_cache
+
         # TODO (issue #126) check granularity
         self._granularity = granularity
 
@@ -75,6 +103,10 @@ class FileProcedure(UniCommand):
         self.interrupted = False
         self.interruptReason = None
 
+        # compiled file, with the modification time and the size of the
+        # file at compilation time
+        self._program = None
+
     @shellMethod(
         args=ListArgChecker(DefaultChecker.getArg()),
         parameters=DefaultAccessor.getContainer())
@@ -113,20 +145,22 @@ class FileProcedure(UniCommand):
         self.interruptReason = None
         execution_name = "execute '%s' (line: " % self._file_path
 
-        with open(self._file_path) as f:
-            for cmd in f:
-                self._raiseIfInterrupted()
+        for line, commands, run_in_background in self.getProgram():
+            self._raiseIfInterrupted()
+
+            parser = Parser(line)
+            parser.load(commands, run_in_background)
 
-                last_exception, engine = execute(
-                    cmd,
-                    parameter_container,
-                    execution_name+str(index)+")")
+            last_exception, engine = execute(
+                parser,
+                parameter_container,
+                execution_name+str(index)+")")
 
-                self._setResult(last_exception,
-                                engine,
-                                parameter_container)
+            self._setResult(last_exception,
+                            engine,
+                            parameter_container)
 
-                index += 1
+            index += 1
 
         # return the result of last command in the procedure
         if engine is None:
@@ -134,6 +168,29 @@ class FileProcedure(UniCommand):
 
         return engine.getLastResult()
 
+    def getProgram(self):
+        "return the compiled file, compile it again if the file has changed"
+        stat = os.stat(self._file_path)
+        program = self._program
+
+        if (program is not None and
+           program[0] == stat.st_mtime and
+           program[1] == stat.st_size):
+            return program[2]
+
+        lines = None
+        if self._use_disk_cache:
+            lines = loadProgram(self._file_path, stat)
+
+        if lines is None:
+            lines = compileFile(self._file_path)
+
+            if self._use_disk_cache:
+                storeProgram(self._file_path, stat, lines)
+
+        self._program = (stat.st_mtime, stat.st_size, lines,)
+        return lines
+
     def _raiseIfInterrupted(self):
         if self.interrupted:
             exc_msg = "this process has been interrupted"
@@ -145,18 +202,12 @@ class FileProcedure(UniCommand):
 
     def _setResult(self, last_exception, engine, parameter_container):
         variable_manager = parameter_container.getVariableManager()
+        result_param = variable_manager.getParameter(string_path="?",
+                                                     perfect_match=True,
+                                                     local_param=True,
+                                                     explore_other_scope=False)
 
-        if variable_manager.hasParameter(string_path="?",
-                                         raise_if_ambiguous=True,
-                                         perfect_match=True,
-                                         local_param=True,
-                                         explore_other_scope=False):
-            result_param = variable_manager.getParameter(
-                string_path="?",
-                perfect_match=True,
-                local_param=True,
-                explore_other_scope=False)
-        else:
+        if result_param is None:
             result_param = VariableParameter(())
             variable_manager.setParameter("?", result_param, local_param=True)
 
@@ -0,0 +1,131 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2012  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import time
+
+# the most precise clock available
+timer = getattr(time, "perf_counter", time.time)
+
+PROCESS_TYPE_NAMES = ("pre", "pro", "post",)
+
+
+class ProfileEntry(object):
+    "statistics of one pre/pro/post process of a sub command"
+
+    __slots__ = ("cmd_index",
+                 "sub_cmd_index",
+                 "process_type",
+                 "name",
+                 "count",
+                 "total_time",
+                 "max_time",
+                 "checker_time",
+                 "lock_time",
+                 "call_time",)
+
+    def __init__(self, cmd_index, sub_cmd_index, process_type, name):
+        self.cmd_index = cmd_index
+        self.sub_cmd_index = sub_cmd_index
+        self.process_type = process_type
+        self.name = name
+        self.count = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.checker_time = 0.0
+        self.lock_time = 0.0
+        self.call_time = 0.0
+
+    def record(self, checker_time, lock_time, call_time, count=1):
+        duration = checker_time + lock_time + call_time
+        self.count += count
+        self.total_time += duration
+        self.checker_time += checker_time
+        self.lock_time += lock_time
+        self.call_time += call_time
+
+        if duration > self.max_time:
+            self.max_time = duration
+
+    def getProcessTypeName(self):
+        return PROCESS_TYPE_NAMES[self.process_type]
+
+
+class ExecutionProfiler(object):
+    """
+    collect the call count and the time spent in every pre/pro/post process
+    of an execution.  The time of a call is split in three parts: the
+    argument checking, the wait on the parameter locks and the call of the
+    method itself.
+    """
+
+    def __init__(self):
+        self.entries = {}
+
+    def record(self,
+               cmd_index,
+               sub_cmd_index,
+               process_type,
+               method,
+               checker_time,
+               lock_time,
+               call_time,
+               count=1):
+        key = (cmd_index, sub_cmd_index, process_type,)
+        entry = self.entries.get(key)
+
+        if entry is None:
+            name = getattr(method, "__name__", None)
+            if name is None:
+                name = type(method).__name__
+
+            entry = ProfileEntry(cmd_index, sub_cmd_index, process_type, name)
+            self.entries[key] = entry
+
+        entry.record(checker_time, lock_time, call_time, count)
+
+    def getEntries(self):
+        return [self.entries[key] for key in sorted(self.entries.keys())]
+
+    def reset(self):
+        self.entries = {}
+
+    def buildTable(self):
+        "return the statistics as a list of line, the first one is a header"
+
+        table = [("command",
+                  "process",
+                  "calls",
+                  "total (ms)",
+                  "max (ms)",
+                  "checker (ms)",
+                  "lock (ms)",
+                  "method (ms)",)]
+
+        for entry in self.getEntries():
+            table.append(("%d.%d %s" % (entry.cmd_index,
+                                        entry.sub_cmd_index,
+                                        entry.name,),
+                          entry.getProcessTypeName(),
+                          str(entry.count),
+                          "%.3f" % (entry.total_time * 1000.0),
+                          "%.3f" % (entry.max_time * 1000.0),
+                          "%.3f" % (entry.checker_time * 1000.0),
+                          "%.3f" % (entry.lock_time * 1000.0),
+                          "%.3f" % (entry.call_time * 1000.0),))
+
+        return table
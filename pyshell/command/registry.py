@@ -0,0 +1,58 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2012  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from tries import multiLevelTries
+
+
+class CommandRegistry(multiLevelTries):
+    """
+    multiLevelTries used to store the registered commands, every change on
+    the tree increments a generation number.  It allows the caches built
+    on top of the registry to detect they are outdated.
+    """
+
+    def __init__(self, *args, **kwargs):
+        multiLevelTries.__init__(self, *args, **kwargs)
+        self.generation = 0
+
+    def getGeneration(self):
+        return self.generation
+
+    def insert(self, *args, **kwargs):
+        try:
+            return multiLevelTries.insert(self, *args, **kwargs)
+        finally:
+            self.generation += 1
+
+    def update(self, *args, **kwargs):
+        try:
+            return multiLevelTries.update(self, *args, **kwargs)
+        finally:
+            self.generation += 1
+
+    def remove(self, *args, **kwargs):
+        try:
+            return multiLevelTries.remove(self, *args, **kwargs)
+        finally:
+            self.generation += 1
+
+    def setStopTraversal(self, *args, **kwargs):
+        try:
+            return multiLevelTries.setStopTraversal(self, *args, **kwargs)
+        finally:
+            self.generation += 1
@@ -0,0 +1,101 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2017  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+from tempfile import NamedTemporaryFile
+
+from pyshell.__version__ import __version__
+from pyshell.utils.constants import SCRIPT_CACHE_DIRECTORY_NAME
+from pyshell.utils.constants import SCRIPT_CACHE_FORMAT
+
+# a compiled procedure file is stored as json in a cache directory next to
+# the file, with the absolute path, the modification time and the size of
+# the file, and the version of pyshell.  Any corrupted, outdated or
+# unreadable entry is ignored, the file is then compiled again.
+
+
+def getCachePath(file_path):
+    directory, file_name = os.path.split(os.path.abspath(file_path))
+    return os.path.join(directory,
+                        SCRIPT_CACHE_DIRECTORY_NAME,
+                        file_name + ".json")
+
+
+def _buildHeader(file_path, stat):
+    return {"format": SCRIPT_CACHE_FORMAT,
+            "version": __version__,
+            "path": os.path.abspath(file_path),
+            "mtime": stat.st_mtime,
+            "size": stat.st_size}
+
+
+def loadProgram(file_path, stat):
+    "return the cached program of the file, or None if not available"
+
+    try:
+        with open(getCachePath(file_path)) as cache_file:
+            content = json.load(cache_file)
+
+        for key, value in _buildHeader(file_path, stat).items():
+            if content[key] != value:
+                return None
+
+        program = []
+        for line, commands, run_in_background in content["program"]:
+            commands = tuple((tuple(tokens),
+                              tuple(arg_spotted),
+                              tuple(param_spotted),)
+                             for tokens, arg_spotted, param_spotted
+                             in commands)
+            program.append((line, commands, bool(run_in_background),))
+
+        return tuple(program)
+    except Exception:
+        return None
+
+
+def storeProgram(file_path, stat, program):
+    "write the program in the cache, fail silently"
+
+    cache_path = getCachePath(file_path)
+    directory = os.path.dirname(cache_path)
+    content = _buildHeader(file_path, stat)
+    content["program"] = program
+    temporary_path = None
+
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        # write a temporary file then rename it, a concurrent reader never
+        # sees a partial entry
+        with NamedTemporaryFile(mode="w",
+                                dir=directory,
+                                suffix=".tmp",
+                                delete=False) as cache_file:
+            temporary_path = cache_file.name
+            json.dump(content, cache_file)
+
+        os.rename(temporary_path, cache_path)
+    except Exception:
+        try:
+            if temporary_path is not None and os.path.exists(temporary_path):
+                os.remove(temporary_path)
+        except OSError:
+            pass
@@ -16,12 +16,312 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from itertools import chain
+
 from pyshell.command.exception import ExecutionException
 
+# the consumed part of a buffer is only released if it is bigger than this
+# size, to avoid useless copies on small data bunches
+COMPACT_THRESHOLD = 64
+
+
+class DataBunch(object):
+    """
+    list-like holder of the data of a stack item.
+
+    The data already consumed by the engine are not removed from the buffer,
+    a cursor is moved forward instead.  Consuming the next data of a bunch
+    costs O(1) whatever the size of the bunch.  The consumed prefix of the
+    buffer is released once it represents the half of the buffer.
+
+    A bunch can also be fed by an iterator (lazy source), the data are then
+    pulled from the iterator only when the engine needs them.  Any operation
+    that needs the whole bunch (len, slice, negative index, equality, ...)
+    consumes the remaining part of the iterator.
+    """
+
+    __slots__ = ("_buffer", "_cursor", "_source",)
+
+    def __init__(self, buffer=None, source=None):
+        if buffer is None:
+            buffer = []
+        elif not isinstance(buffer, list):
+            buffer = list(buffer)
+
+        self._buffer = buffer
+        self._cursor = 0
+        self._source = source
+
+    def isLazy(self):
+        return self._source is not None
+
+    def hasData(self, count=1):
+        if self._source is not None:
+            self._fill(count)
+
+        return len(self._buffer) - self._cursor >= count
+
+    def peek(self, count):
+        if self._source is not None:
+            self._fill(count)
+
+        return self._buffer[self._cursor:self._cursor + count]
+
+    def _fill(self, count):
+        # pull data from the lazy source until count data are available
+        buffer = self._buffer
+        missing = count - (len(buffer) - self._cursor)
+        while missing > 0 and self._source is not None:
+            try:
+                buffer.append(next(self._source))
+            except StopIteration:
+                self._source = None
+                return
+
+            missing -= 1
+
+    def _fillAll(self):
+        if self._source is not None:
+            source = self._source
+            self._source = None
+            self._buffer.extend(source)
+
+    def advance(self, count=1):
+        if self._source is not None:
+            self._fill(count)
+
+        self._cursor = min(self._cursor + count, len(self._buffer))
+
+        if (self._cursor > COMPACT_THRESHOLD and
+           self._cursor * 2 > len(self._buffer)):
+            self._compact()
+
+    def _compact(self):
+        if self._cursor > 0:
+            del self._buffer[:self._cursor]
+            self._cursor = 0
+
+    def _absoluteIndex(self, index):
+        if index < 0:
+            self._fillAll()
+        elif self._source is not None:
+            self._fill(index + 1)
+
+        length = len(self._buffer) - self._cursor
+        if index < 0:
+            index += length
+
+        if index < 0 or index >= length:
+            raise IndexError("DataBunch index out of range")
+
+        return self._cursor + index
+
+    def __len__(self):
+        self._fillAll()
+        return len(self._buffer) - self._cursor
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            self._fillAll()
+            return self._buffer[self._cursor:][index]
+
+        return self._buffer[self._absoluteIndex(index)]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self._fillAll()
+            self._compact()
+            self._buffer[index] = value
+            return
+
+        self._buffer[self._absoluteIndex(index)] = value
+
+    def __delitem__(self, index):
+        if index == slice(None, None, None):
+            # everything is removed, the lazy source does not need to be
+            # consumed, it can be infinite
+            self._source = None
+            self._buffer = []
+            self._cursor = 0
+            return
+
+        if isinstance(index, slice):
+            self._fillAll()
+            self._compact()
+            del self._buffer[index]
+            return
+
+        index = self._absoluteIndex(index)
+        if index == self._cursor:
+            self.advance()
+        else:
+            del self._buffer[index]
+
+    def __iter__(self):
+        index = self._cursor
+        while True:
+            if index >= len(self._buffer):
+                if self._source is None:
+                    return
+
+                self._fill(index - self._cursor + 1)
+                if index >= len(self._buffer):
+                    return
+
+            yield self._buffer[index]
+            index += 1
+
+    def __contains__(self, value):
+        self._fillAll()
+        return value in self._buffer[self._cursor:]
+
+    def __eq__(self, other):
+        if isinstance(other, DataBunch):
+            other._fillAll()
+            other = other._buffer[other._cursor:]
+        elif not isinstance(other, (list, tuple,)):
+            return False
+
+        self._fillAll()
+        return self._buffer[self._cursor:] == list(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        if self._source is None:
+            return repr(self._buffer[self._cursor:])
+
+        # do not consume the lazy source to print the bunch
+        buffered = [repr(data) for data in self._buffer[self._cursor:]]
+        buffered.append("...")
+        return "[" + ", ".join(buffered) + "]"
+
+    def append(self, value):
+        if self._source is None:
+            self._buffer.append(value)
+        else:
+            # the new data will come after the data of the source
+            self._source = chain(self._source, (value,))
+
+    def extend(self, values):
+        if self._source is None:
+            self._buffer.extend(values)
+        else:
+            self._source = chain(self._source, values)
+
+    def insert(self, index, value):
+        if index < 0:
+            self._fillAll()
+        elif self._source is not None:
+            self._fill(index)
+
+        length = len(self._buffer) - self._cursor
+        if index < 0:
+            index = max(index + length, 0)
+        else:
+            index = min(index, length)
+
+        # reuse the slot of the last consumed data if possible
+        if index == 0 and self._cursor > 0:
+            self._cursor -= 1
+            self._buffer[self._cursor] = value
+        else:
+            self._buffer.insert(self._cursor + index, value)
+
+
+class StackFrame(object):
+    """
+    item of the engine stack, a data bunch, the path of the command that
+    will process it, the instruction type (pre/pro/post) and an optional
+    enabling map.
+
+    The frame can still be read like the tuple it used to be:
+    (data, path, type, enabling_map)
+    """
+
+    __slots__ = ("data", "path", "type", "enabling_map",)
+
+    def __init__(self, data, path, instruction_type, enabling_map=None):
+        if isinstance(data, list):
+            data = DataBunch(data)
+
+        self.data = data
+        self.path = path
+        self.type = instruction_type
+        self.enabling_map = enabling_map
+
+    def cmdIndex(self):
+        return len(self.path) - 1
+
+    def cmdLength(self):
+        return len(self.path)
+
+    def subCmdIndex(self):
+        return self.path[-1]
+
+    def getCmd(self, cmd_list):
+        return cmd_list[len(self.path) - 1]
+
+    def subCmdLength(self, cmd_list):
+        return len(cmd_list[len(self.path) - 1])
+
+    def _asTuple(self):
+        return (self.data, self.path, self.type, self.enabling_map,)
+
+    def __len__(self):
+        return 4
+
+    def __getitem__(self, index):
+        return self._asTuple()[index]
+
+    def __iter__(self):
+        return iter(self._asTuple())
+
+    def __eq__(self, other):
+        if isinstance(other, StackFrame):
+            other = other._asTuple()
+        elif not isinstance(other, tuple):
+            return False
+
+        return self._asTuple() == other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self._asTuple())
+
+
+def _toStackFrame(item):
+    if isinstance(item, StackFrame):
+        return item
+
+    return StackFrame(*item)
+
 
 class EngineStack(list):
     def push(self, data, cmd_path, instruction_type, cmd_map=None):
-        self.append((data, cmd_path, instruction_type, cmd_map,))
+        list.append(self,
+                    StackFrame(data, cmd_path, instruction_type, cmd_map))
+
+    def append(self, item):
+        list.append(self, _toStackFrame(item))
+
+    def insert(self, index, item):
+        list.insert(self, index, _toStackFrame(item))
+
+    def __setitem__(self, index, item):
+        if isinstance(index, slice):
+            item = [_toStackFrame(i) for i in item]
+        else:
+            item = _toStackFrame(item)
+
+        list.__setitem__(self, index, item)
 
     def raiseIfEmpty(self, meth_name=None):
         if len(self) == 0:
@@ -44,99 +344,80 @@ class EngineStack(list):
 
     # ##
     def data(self, index):
-        return self[index][0]
+        return self[index].data
 
     def path(self, index):
-        return self[index][1]
+        return self[index].path
 
     def type(self, index):
-        return self[index][2]
+        return self[index].type
 
     def enablingMap(self, index):
-        return self[index][3]
+        return self[index].enabling_map
 
     def cmdIndex(self, index):
-        return len(self[index][1]) - 1
+        return len(self[index].path) - 1
 
     def cmdLength(self, index):
-        return len(self[index][1])
+        return len(self[index].path)
 
     def item(self, index):
         return self[index]
 
     def getCmd(self, index, cmd_list):
-        return cmd_list[len(self[index][1])-1]
+        return cmd_list[len(self[index].path)-1]
 
     def subCmdLength(self, index, cmd_list):
-        return len(cmd_list[len(self[index][1])-1])
+        return len(cmd_list[len(self[index].path)-1])
 
     def subCmdIndex(self, index):
-        return self[index][1][-1]
+        return self[index].path[-1]
 
     def setEnableMap(self, index, new_map):
-        current = self[index]
-        self[index] = (current[0], current[1], current[2], new_map,)
+        self[index].enabling_map = new_map
 
     def setPath(self, index, path):
-        current = self[index]
-        self[index] = (current[0], path, current[2], current[3],)
+        self[index].path = path
 
     def setType(self, index, new_type):
-        current = self[index]
-        self[index] = (current[0], current[1], new_type, current[3],)
+        self[index].type = new_type
 
     # ## MISC meth ## #
 
     def top(self):
         return self[-1]
 
+    def depth(self, depth):
+        return self[len(self) - 1 - depth]
+
     def getIndexBasedrange(self):
         return range(0, len(self), 1)
 
-    # #########
-    def __getattr__(self, name):
-        if name.endswith("OnTop"):
-            index = -1
-            sub = None
-            name = name[:-5]
-        elif name.endswith("OnIndex"):
-            index = None
-            sub = None
-            name = name[:-7]
-        elif name.endswith("OnDepth"):
-            index = None
-            sub = len(self)-1
-            name = name[:-7]
-        else:
-            # return getattr(self,name)
-            return object.__getattribute__(self, name)
-
-        if name not in ["data", "path", "type", "enablingMap", "cmdIndex",
-                        "cmdLength", "item", "getCmd", "subCmdLength",
-                        "subCmdIndex", "setEnableMap", "setPath", "setType"]:
-            raise ExecutionException("(EngineStack) __getattr__, try to get an"
-                                     " unallowed or unexistant meth")
-
-        meth_to_call = object.__getattribute__(self, name)
-
-        def meth(*args):
-            if index is None:
-                if len(args) > 0:
-                    lindex = int(args[0])
-                    start_index = 1
-                else:
-                    # if index is not define, no need to do compute
-                    # anything else
-                    return meth_to_call(*args)
-            else:
-                start_index = 0
-                lindex = index
 
-            if sub is not None:
-                lindex = sub - lindex
+# every accessor above takes the index of the frame as first argument, the
+# following loop adds three variants of each of them on the class:
+#   xxxOnIndex(index, ...), same as xxx
+#   xxxOnTop(...), apply on the frame at the top of the stack
+#   xxxOnDepth(depth, ...), apply on the frame at depth from the top
+_FRAME_ACCESSORS = ("data", "path", "type", "enablingMap", "cmdIndex",
+                    "cmdLength", "item", "getCmd", "subCmdLength",
+                    "subCmdIndex", "setEnableMap", "setPath", "setType",)
+
+
+def _buildOnTop(meth):
+    def onTop(self, *args):
+        return meth(self, -1, *args)
+    return onTop
+
+
+def _buildOnDepth(meth):
+    def onDepth(self, depth, *args):
+        return meth(self, len(self) - 1 - depth, *args)
+    return onDepth
 
-            nargs = [lindex]
-            nargs.extend(args[start_index:])
-            return meth_to_call(*nargs)
 
-        return meth
+for _name in _FRAME_ACCESSORS:
+    _meth = EngineStack.__dict__[_name]
+    setattr(EngineStack, _name+"OnIndex", _meth)
+    setattr(EngineStack, _name+"OnTop", _buildOnTop(_meth))
+    setattr(EngineStack, _name+"OnDepth", _buildOnDepth(_meth))
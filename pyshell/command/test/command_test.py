@@ -18,12 +18,20 @@
 
 import pytest
 
+from pyshell.arg.accessor.default import DefaultAccessor
+from pyshell.arg.decorator import shellMethod
 from pyshell.command.command import Command
+from pyshell.command.command import CommandState
 from pyshell.command.command import MultiCommand
 from pyshell.command.command import UniCommand
+from pyshell.command.decorator import bunchProcessing
 from pyshell.command.exception import CommandException
 
 
+def noneFun():
+    pass
+
+
 class TestCommand(object):
 
     # init an empty one and check the args
@@ -267,3 +275,91 @@ class TestCommand(object):
                 assert a
                 assert not e
             index += 1
+
+    def test_defaultDataByData(self):
+        # the default methods keep the data by data path
+        c = Command()
+        assert not hasattr(c.preProcess, "bunchProcess")
+        assert not hasattr(c.process, "bunchProcess")
+        assert not hasattr(c.postProcess, "bunchProcess")
+
+    def test_bunchProcessingNotCallable(self):
+        with pytest.raises(CommandException):
+            bunchProcessing(42)
+
+    def test_addProcessParallel(self):
+        mc = MultiCommand()
+        mc.addProcess(noneFun, noneFun, noneFun)
+        mc.addProcess(None, noneFun, None, parallel=True)
+        mc.addProcess(None, noneFun, None, parallel=True, process_pool=True)
+
+        assert not mc[0][0].parallel
+        assert mc[1][0].parallel and not mc[1][0].process_pool
+        assert mc[2][0].parallel and mc[2][0].process_pool
+
+        cloned = mc.clone()
+        assert cloned[1][0].parallel and not cloned[1][0].process_pool
+        assert cloned[2][0].parallel and cloned[2][0].process_pool
+
+    def test_addProcessParallelWithoutProcess(self):
+        mc = MultiCommand()
+        with pytest.raises(CommandException):
+            mc.addProcess(noneFun, None, noneFun, parallel=True)
+
+    def test_addProcessPoolWithoutParallel(self):
+        mc = MultiCommand()
+        with pytest.raises(CommandException):
+            mc.addProcess(None, noneFun, None, process_pool=True)
+
+    def test_addProcessParallelWithEngine(self):
+        @shellMethod(engine=DefaultAccessor.getEngine())
+        def engineFun(engine):
+            pass
+
+        @shellMethod(parameters=DefaultAccessor.getContainer())
+        def containerFun(parameters):
+            pass
+
+        mc = MultiCommand()
+        with pytest.raises(CommandException):
+            mc.addProcess(None, engineFun, None, parallel=True)
+
+        mc.addProcess(None, engineFun, None)
+        mc.addProcess(None, containerFun, None, parallel=True)
+
+    def test_uniCommandParallel(self):
+        uc = UniCommand(process=noneFun, parallel=True)
+        assert uc[0][0].parallel
+        assert uc.clone()[0][0].parallel
+
+    def test_commandState(self):
+        mc = MultiCommand()
+        mc.addProcess(noneFun, noneFun, noneFun)
+        mc.addProcess(noneFun, noneFun, noneFun)
+        mc.disableCmd(1)
+        mc.addDynamicCommand(Command())
+
+        state = CommandState(mc)
+        assert state.getCommand() is mc
+        assert len(state) == 2
+        assert state.dymamic_count == 0
+        assert not state.isdisabledCmd(1)
+        assert state[0][0] is mc[0][0]
+        assert state.getPreCount(1) == 0
+
+        # the execution state never updates the registered command
+        state.disableCmd(0)
+        state.addDynamicCommand(Command())
+        state.counters[2][1] += 1
+        assert not mc.isdisabledCmd(0)
+        assert len(mc) == 3
+        assert state.getProCount(2) == 1
+
+        state.reset()
+        assert len(state) == 2
+        assert state.counters == [[0, 0, 0], [0, 0, 0]]
+        assert not state.isdisabledCmd(0)
+
+    def test_commandStateInvalid(self):
+        with pytest.raises(CommandException):
+            CommandState(Command())
@@ -51,6 +51,13 @@ class TestsplitAndMerge(object):
                           [[], [], []],
                           [[{}, {}, {}], [{}, {}, {}], [{}, {}, {}]])
 
+        # the engine works on the execution states of the commands, each
+        # position gets its own state but the engine methods must still
+        # update every position of a state used twice
+        self.mc = self.e.cmd_list[0]
+        self.mc2 = self.e.cmd_list[1]
+        self.e.cmd_list[2] = self.mc2
+
     # _willThisCmdBeCompletlyDisabled(self,
     #    cmdID, startSkipRange, rangeLength=1)
     def test_willThisCmdBeCompletlyDisabled(self):
@@ -59,6 +66,7 @@ class TestsplitAndMerge(object):
             mc.addProcess(noneFun, noneFun, noneFun)
 
         self.e = EngineV3([mc], [[]], [[{}, {}, {}]])
+        mc = self.e.cmd_list[0]
 
         # must return False
         # empty before range, at least on item true in the after range
@@ -135,6 +143,7 @@ class TestsplitAndMerge(object):
             mc.addProcess(noneFun, noneFun, noneFun)
 
         self.e = EngineV3([mc], [[]], [[{}, {}, {}]])
+        mc = self.e.cmd_list[0]
 
         # must return False
         # empty before range, at least on item true in the after range
@@ -16,21 +16,34 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import threading
+import time
+
 import pytest
 
+from pyshell.arg.accessor.default import DefaultAccessor
 from pyshell.arg.checker.default import DefaultChecker
 from pyshell.arg.checker.integer import IntegerArgChecker
+from pyshell.arg.checker.list import ListArgChecker
 from pyshell.arg.decorator import shellMethod
+from pyshell.arg.exception import ArgException
+from pyshell.command.command import Command
+from pyshell.command.command import CommandState
 from pyshell.command.command import MultiCommand
 from pyshell.command.command import MultiOutput
 from pyshell.command.command import UniCommand
-from pyshell.command.engine import DEFAULT_EXECUTION_LIMIT
+from pyshell.command.decorator import bunchProcessing
+from pyshell.command.engine import DEFAULT_INJECTION_LIMIT
 from pyshell.command.engine import EngineV3
 from pyshell.command.engine import POSTPROCESS_INSTRUCTION
 from pyshell.command.engine import PREPROCESS_INSTRUCTION
 from pyshell.command.engine import PROCESS_INSTRUCTION
+from pyshell.command.exception import EngineInterruptionException
 from pyshell.command.exception import ExecutionException
 from pyshell.command.exception import ExecutionInitException
+from pyshell.command.exception import ExecutionTimeoutException
+from pyshell.command.profiler import timer
+from pyshell.command.stackEngine import DataBunch
 from pyshell.control import ControlCenter
 
 # TODO pour l'instant dans les tests, on ne tiens pas compte de
@@ -60,6 +73,11 @@ def noneFun():
     pass
 
 
+@shellMethod(arg=DefaultChecker.getInteger())
+def doubleFun(arg):
+    return arg * 2
+
+
 class TestEngineCore(object):
 
     def setUp(self):
@@ -83,13 +101,22 @@ class TestEngineCore(object):
         with pytest.raises(ExecutionInitException):
             EngineV3([mc, 42], [[], []], [[{}, {}, {}], [{}, {}, {}]])
 
-        mc.dymamic_count = 42
+        mc.addDynamicCommand(Command())
         e = EngineV3([mc], [[]], [[{}, {}, {}]])
-        assert e.cmd_list[0] is mc
-        assert mc.dymamic_count == 0  # check the call on reset
+        assert e.cmd_list[0].getCommand() is mc
+        assert isinstance(e.cmd_list[0], CommandState)
 
-        # because the reset with the dynamic at 42 will remove every command...
-        mc.addProcess(noneFun, noneFun, noneFun)
+        # the registered command is never updated by the engine, the dynamic
+        # commands are not part of the execution state
+        assert mc.dymamic_count == 1
+        assert len(mc) == 2
+        assert e.cmd_list[0].dymamic_count == 0
+        assert len(e.cmd_list[0]) == 1
+
+        # the same command gets an execution state at each position
+        e = EngineV3([mc, mc], [[], []], [[{}, {}, {}], [{}, {}, {}]])
+        assert e.cmd_list[0] is not e.cmd_list[1]
+        assert e.cmd_list[0].getCommand() is e.cmd_list[1].getCommand()
 
         # empty dict
         assert e.env is None
@@ -628,7 +655,7 @@ class TestEngineCore(object):
     def checkStack(self, stack, cmd_list):
         for data, path, typ, enablingMap in stack:
             # check data
-            assert isinstance(data, list)
+            assert isinstance(data, DataBunch)
             assert len(data) > 0
 
             # check path
@@ -654,7 +681,7 @@ class TestEngineCore(object):
             c, u, e = cmd[path[-1]]
             assert e and (enablingMap is None or enablingMap[path[-1]])
 
-    def test_limitReaching(self):
+    def test_noExecutionLimit(self):
         @shellMethod(arg1=IntegerArgChecker())
         def pre(arg1=0):
             self.pre_count += 1
@@ -671,35 +698,819 @@ class TestEngineCore(object):
             # needed to the next post method in case of encapsulation
             return arg3
 
-        # simple test
-        self.valueToTest = 25
         self.pre_count = self.pro_count = self.post_count = 0
         uc = UniCommand(pre, pro, post)
+        item_count = 5000
 
         # set a large amount of data for the pre, then the pro, then the post
         engine = EngineV3([uc], [[]], [[{}, {}, {}]])
-        engine.stack[0] = ([5] * (DEFAULT_EXECUTION_LIMIT + 1), [0], 0, None)
+        engine.stack[0] = ([5] * item_count, [0], 0, None)
+        engine.execute()
+        assert engine.cmd_list[0].getPreCount() == item_count
+        assert engine.cmd_list[0].getProCount() == item_count
+        assert engine.cmd_list[0].getPostCount() == item_count
+
+        engine = EngineV3([uc], [[]], [[{}, {}, {}]])
+        engine.stack[0] = ([5] * item_count, [0], 1, None)
+        engine.execute()
+        assert engine.cmd_list[0].getPreCount() == 0
+        assert engine.cmd_list[0].getProCount() == item_count
+        assert engine.cmd_list[0].getPostCount() == item_count
+
+        engine = EngineV3([uc], [[]], [[{}, {}, {}]])
+        engine.stack[0] = ([5] * item_count, [0], 2, None)
+        engine.execute()
+        assert engine.cmd_list[0].getPreCount() == 0
+        assert engine.cmd_list[0].getProCount() == 0
+        assert engine.cmd_list[0].getPostCount() == item_count
+
+    def test_injectionLimit(self):
+        @shellMethod(arg=DefaultChecker.getArg())
+        def loopingPro(arg):
+            # every data produce a new data, this never ends
+            engine.appendData(arg)
+            return arg
+
+        uc = UniCommand(process=loopingPro)
+        engine = EngineV3([uc], [[]], [[{}, {}, {}]])
+        engine.setInjectionLimit(10)
+        assert engine.getInjectionLimit() == 10
+        engine.stack[0] = ([5], [0], 1, None)
         with pytest.raises(ExecutionException):
             engine.execute()
-        assert uc[0][0].pre_count == 256
-        assert uc[0][0].pro_count == 255
-        assert uc[0][0].post_count == 255
+        assert engine.injectionCount == 10
+        assert engine.cmd_list[0].getProCount() == 10
+
+    def test_injectionLimitDisabled(self):
+        @shellMethod(arg=DefaultChecker.getArg())
+        def pro(arg):
+            if arg > 0:
+                engine.appendData(arg - 1)
+            return arg
 
+        uc = UniCommand(process=pro)
         engine = EngineV3([uc], [[]], [[{}, {}, {}]])
-        engine.stack[0] = ([5] * (DEFAULT_EXECUTION_LIMIT + 1), [0], 1, None)
+        assert engine.getInjectionLimit() == DEFAULT_INJECTION_LIMIT
+        engine.setInjectionLimit(0)
+        engine.stack[0] = ([1000], [0], 1, None)
+        engine.execute()
+        assert engine.injectionCount == 1000
+
+    def test_injectionLimitInvalid(self):
+        mc = MultiCommand()
+        mc.addProcess(noneFun, noneFun, noneFun)
+        engine = EngineV3([mc], [[]], [[{}, {}, {}]])
+
+        with pytest.raises(ExecutionException):
+            engine.setInjectionLimit(-1)
+
         with pytest.raises(ExecutionException):
+            engine.setInjectionLimit("plop")
+
+    def test_bunchProcessing(self):
+        def proBunch(data_list):
+            args = [data["arg"] for data in data_list]
+            self.bunch_calls.append(args)
+            return [a * 2 for a in args]
+
+        @bunchProcessing(proBunch)
+        @shellMethod(arg=DefaultChecker.getInteger())
+        def pro(arg):
+            self.item_calls.append(arg)
+            return arg * 2
+
+        def postBunch(data_list):
+            args = [data["arg"] for data in data_list]
+            self.bunch_calls.append(args)
+            return [a + 1 for a in args]
+
+        @bunchProcessing(postBunch)
+        @shellMethod(arg=DefaultChecker.getInteger())
+        def post(arg):
+            self.item_calls.append(arg)
+            return arg + 1
+
+        self.bunch_calls = []
+        self.item_calls = []
+        uc = UniCommand(process=pro, post_process=post)
+        engine = EngineV3([uc], [[]], [[{}, {}, {}]])
+        engine.stack[0] = ([1, 2, 3], [0], PROCESS_INSTRUCTION, None)
+        engine.execute()
+
+        assert self.bunch_calls == [[1, 2, 3], [2, 4, 6]]
+        assert self.item_calls == []
+        assert engine.cmd_list[0].getProCount() == 3
+        assert engine.cmd_list[0].getPostCount() == 3
+        # same last result as a data by data execution
+        assert engine.getLastResult() == [7]
+
+        # a single data is still processed by the data method
+        self.bunch_calls = []
+        engine = EngineV3([uc], [[]], [[{}, {}, {}]])
+        engine.stack[0] = ([5], [0], PROCESS_INSTRUCTION, None)
+        engine.execute()
+        assert self.bunch_calls == []
+        assert self.item_calls == [5, 10]
+        assert engine.getLastResult() == [11]
+
+    def test_bunchProcessingCheckedOnce(self):
+        checked = []
+
+        class CountingChecker(IntegerArgChecker):
+            def getValue(self, value, arg_number=None, arg_name_to_bind=None):
+                checked.append(value)
+                return IntegerArgChecker.getValue(self,
+                                                  value,
+                                                  arg_number,
+                                                  arg_name_to_bind)
+
+        def proBunch(data_list):
+            return [data["arg"] * data["factor"] for data in data_list]
+
+        @bunchProcessing(proBunch)
+        @shellMethod(arg=CountingChecker(), factor=IntegerArgChecker())
+        def pro(arg, factor=1):
+            return arg * factor
+
+        uc = UniCommand(process=pro)
+        engine = EngineV3([uc], [[]], [[{}, {"factor": [3]}, {}]])
+        engine.stack[0] = (["1", "2", "3"], [0], PROCESS_INSTRUCTION, None)
+        engine.execute()
+
+        # each data is checked once by the checker of the data method, the
+        # mapped args are applied to every data of the bunch
+        assert checked == ["1", "2", "3"]
+        assert engine.cmd_list[0].getProCount() == 3
+        assert engine.getLastResult() == [[9]]
+
+    def test_bunchProcessingInvalidData(self):
+        def proBunch(data_list):
+            self.bunch_calls.append(data_list)
+            return [data["arg"] for data in data_list]
+
+        @bunchProcessing(proBunch)
+        @shellMethod(arg=DefaultChecker.getInteger())
+        def pro(arg):
+            return arg
+
+        self.bunch_calls = []
+        uc = UniCommand(process=pro)
+        engine = EngineV3([uc], [[]], [[{}, {}, {}]])
+        engine.stack[0] = ([1, "plop", 3], [0], PROCESS_INSTRUCTION, None)
+
+        with pytest.raises(ArgException):
+            engine.execute()
+        assert self.bunch_calls == []
+
+    def test_bunchProcessingMultiOutput(self):
+        def proBunch(data_list):
+            args = [data["arg"] for data in data_list]
+            return [MultiOutput([[a], [a]]) for a in args[:-1]] + [None]
+
+        @bunchProcessing(proBunch)
+        @shellMethod(arg=DefaultChecker.getArg())
+        def pro(arg):
+            return arg
+
+        @shellMethod(arg=ListArgChecker(DefaultChecker.getArg()))
+        def post(arg):
+            self.item_calls.append(arg)
+            return arg
+
+        self.item_calls = []
+        uc = UniCommand(process=pro, post_process=post)
+        engine = EngineV3([uc], [[]], [[{}, {}, {}]])
+        engine.stack[0] = ([1, 2, 3], [0], PROCESS_INSTRUCTION, None)
+        engine.execute()
+
+        # the None output of the last data is an empty data
+        assert self.item_calls == [[1], [1], [2], [2], []]
+
+    def test_bunchProcessingWrongOutput(self):
+        def proBunch(data_list):
+            return data_list[:-1]
+
+        @bunchProcessing(proBunch)
+        @shellMethod(arg=DefaultChecker.getArg())
+        def pro(arg):
+            return arg
+
+        uc = UniCommand(process=pro)
+        engine = EngineV3([uc], [[]], [[{}, {}, {}]])
+        engine.stack[0] = ([1, 2, 3], [0], PROCESS_INSTRUCTION, None)
+        with pytest.raises(ExecutionException):
+            engine.execute()
+
+    def test_bunchProcessingCommand(self):
+        class BunchCommand(Command):
+            def __init__(self):
+                self.calls = []
+
+            def processBunch(self, data_list):
+                args = [data["args"] for data in data_list]
+                self.calls.append(args)
+                return args
+
+            @bunchProcessing(processBunch)
+            @shellMethod(args=ListArgChecker(DefaultChecker.getArg()))
+            def process(self, args):
+                self.calls.append(args)
+                return args
+
+        mc = MultiCommand()
+        cmd = BunchCommand()
+        mc.addStaticCommand(cmd)
+        engine = EngineV3([mc], [[]], [[{}, {}, {}]])
+        engine.stack[0] = ([1, 2, 3], [0], PROCESS_INSTRUCTION, None)
+        engine.execute()
+
+        assert cmd.calls == [[[1], [2], [3]]]
+        assert engine.getLastResult() == [[3]]
+
+    def _defaultProcessOrder(self, static_plan):
+        calls = []
+
+        class PrintCommand(Command):
+            def postBunch(self, data_list):
+                args = [data["args"] for data in data_list]
+                calls.append(("print", args))
+                return args
+
+            @bunchProcessing(postBunch)
+            @shellMethod(args=ListArgChecker(DefaultChecker.getArg()))
+            def postProcess(self, args):
+                calls.append(("print", [args]))
+                return args
+
+        @shellMethod(arg=ListArgChecker(DefaultChecker.getArg()))
+        def gen(arg):
+            return MultiOutput([[i] for i in range(0, 3)])
+
+        @shellMethod(arg=ListArgChecker(DefaultChecker.getArg()))
+        def postA(arg):
+            calls.append(("postA", arg))
+            return arg
+
+        # the last command uses the default preProcess and process, only
+        # its postProcess declares a bunch variant
+        mc = MultiCommand()
+        mc.addStaticCommand(PrintCommand())
+        engine = EngineV3([UniCommand(gen),
+                           UniCommand(post_process=postA),
+                           mc],
+                          [[], [], []],
+                          [[{}, {}, {}], [{}, {}, {}], [{}, {}, {}]])
+        engine.setStaticPlanEnabled(static_plan)
+        engine.execute()
+
+        return calls, engine.getLastResult()
+
+    def _checkDefaultProcessOrder(self, static_plan):
+        calls, last_result = self._defaultProcessOrder(static_plan)
+
+        # every data goes through the whole pipeline before the next one
+        assert calls == [("print", [[0]]), ("postA", [0]),
+                         ("print", [[1]]), ("postA", [1]),
+                         ("print", [[2]]), ("postA", [2])]
+        assert last_result == [[2]]
+
+    def test_defaultProcessOrder(self):
+        self._checkDefaultProcessOrder(True)
+
+    def test_defaultProcessOrderStackMachine(self):
+        self._checkDefaultProcessOrder(False)
+
+    def _staticPipeline(self, dynamic_on=None):
+        calls = []
+
+        def build(name, multi):
+            @shellMethod(arg=ListArgChecker(DefaultChecker.getArg()))
+            def pre(arg):
+                calls.append(("pre", name, arg))
+                if dynamic_on is not None and dynamic_on == (name, arg):
+                    # no effect on this pipeline, but this is a dynamic api
+                    self.engine.disableEnablingMapOnDataBunch()
+
+                if multi:
+                    return MultiOutput([arg + [i] for i in range(0, 3)])
+                return arg + [name]
+
+            @shellMethod(arg=ListArgChecker(DefaultChecker.getArg()))
+            def pro(arg):
+                calls.append(("pro", name, arg))
+                return arg
+
+            @shellMethod(arg=ListArgChecker(DefaultChecker.getArg()))
+            def post(arg):
+                calls.append(("post", name, arg))
+                return arg + [name]
+
+            return UniCommand(pre, pro, post)
+
+        cmd_list = [build("a", True), build("b", True), build("c", False)]
+        self.engine = EngineV3(cmd_list,
+                               [[], [], []],
+                               [[{}, {}, {}], [{}, {}, {}], [{}, {}, {}]])
+        return self.engine, calls
+
+    def test_staticPlan(self):
+        engine, static_calls = self._staticPipeline()
+        assert engine.isStaticPlanEnabled()
+        assert engine._buildStaticPlan() is not None
+        engine.execute()
+        static_result = engine.getLastResult()
+        assert engine.isStaticPlanEnabled()
+
+        engine, calls = self._staticPipeline()
+        engine.setStaticPlanEnabled(False)
+        engine.execute()
+
+        assert len(calls) == 1 + 3 + 9 + 9 + 9 * 3
+        assert static_calls == calls
+        assert static_result == engine.getLastResult()
+
+    def test_staticPlanFallback(self):
+        engine, dynamic_calls = self._staticPipeline(("b", [1]))
+        engine.execute()
+        assert not engine.isStaticPlanEnabled()
+
+        engine, calls = self._staticPipeline()
+        engine.setStaticPlanEnabled(False)
+        engine.execute()
+
+        assert dynamic_calls == calls
+
+    def test_staticPlanNotStatic(self):
+        mc = MultiCommand()
+        mc.addProcess(noneFun, noneFun, noneFun)
+        engine = EngineV3([mc], [[]], [[{}, {}, {}]])
+        assert engine._buildStaticPlan() is not None
+
+        # more than one sub command
+        mc.addProcess(noneFun, noneFun, noneFun)
+        engine = EngineV3([mc], [[]], [[{}, {}, {}]])
+        assert engine._buildStaticPlan() is None
+
+        # disabled sub command
+        mc = MultiCommand()
+        mc.addProcess(noneFun, noneFun, noneFun)
+        engine = EngineV3([mc], [[]], [[{}, {}, {}]])
+        engine.cmd_list[0].disableCmd(0)
+        assert engine._buildStaticPlan() is None
+
+        # enabling map on the stack
+        mc = MultiCommand()
+        mc.addProcess(noneFun, noneFun, noneFun)
+        engine = EngineV3([mc], [[]], [[{}, {}, {}]])
+        engine.stack.setEnableMapOnIndex(-1, [True])
+        assert engine._buildStaticPlan() is None
+
+    def _stopInLastPost(self, static_plan):
+        @shellMethod(arg=ListArgChecker(DefaultChecker.getArg()))
+        def pre(arg):
+            return MultiOutput([arg + [i] for i in range(0, 3)])
+
+        @shellMethod(arg=ListArgChecker(DefaultChecker.getArg()))
+        def post(arg):
+            if arg == [4]:
+                engine.stopExecution("last data", after_this_process=True)
+
+            return arg
+
+        engine = EngineV3([UniCommand(pre, post_process=post),
+                           UniCommand(process=doubleFun)],
+                          [[], []],
+                          [[{}, {}, {}], [{}, {}, {}]])
+        engine.setStaticPlanEnabled(static_plan)
+        with pytest.raises(EngineInterruptionException):
+            engine.execute()
+
+        return engine.getLastResult()
+
+    def test_staticPlanStopInLastPost(self):
+        # the result of the stopping post process is kept by both paths
+        assert self._stopInLastPost(True) == [[4]]
+        assert self._stopInLastPost(False) == [[4]]
+
+    def test_lazyOutput(self):
+        pulled = []
+        seen = []
+
+        @shellMethod()
+        def pre():
+            def source():
+                for i in range(0, 1000000000):
+                    pulled.append(i)
+                    yield [i]
+
+            return source()
+
+        @shellMethod(arg=ListArgChecker(DefaultChecker.getArg()))
+        def post(arg):
+            seen.append((arg[0], len(pulled),))
+            if arg[0] == 9:
+                engine.stopExecution("enough data")
+
+            return arg
+
+        uc = UniCommand(pre, post_process=post)
+        engine = EngineV3([uc], [[]], [[{}, {}, {}]])
+        with pytest.raises(EngineInterruptionException):
+            engine.execute()
+
+        # the data are pulled one by one, with one data of look ahead
+        assert seen == [(i, i + 2,) for i in range(0, 10)]
+
+    def test_sameCommandTwice(self):
+        @shellMethod(arg=ListArgChecker(DefaultChecker.getArg()))
+        def identity(arg):
+            return arg
+
+        mc = MultiCommand()
+        mc.addProcess(identity, identity, identity)
+        mc.addProcess(identity, identity, identity)
+
+        engine = EngineV3([mc, mc, mc],
+                          [[], [], []],
+                          [[{}, {}, {}], [{}, {}, {}], [{}, {}, {}]])
+        engine.stack[0] = ([[1]], [0], PREPROCESS_INSTRUCTION, None)
+
+        # the second sub command is only disabled at the middle position
+        engine.cmd_list[1].disableCmd(1)
+        engine.execute()
+
+        first, middle, last = engine.cmd_list
+        assert not first.isdisabledCmd(1)
+        assert middle.isdisabledCmd(1)
+        assert not last.isdisabledCmd(1)
+
+        # every position counts its own calls
+        assert first.counters == [[1, 0, 2], [1, 0, 2]]
+        assert middle.counters == [[2, 0, 4], [0, 0, 0]]
+        assert last.counters == [[2, 2, 2], [2, 2, 2]]
+
+    def test_requestStop(self):
+        seen = []
+
+        @shellMethod(arg=ListArgChecker(DefaultChecker.getArg()))
+        def post(arg):
+            seen.append(arg[0])
+            return arg
+
+        uc = UniCommand(process=post)
+        engine = EngineV3([uc], [[]], [[{}, {}, {}]])
+        engine.stack[0] = ([[1], [2], [3]], [0], PROCESS_INSTRUCTION, None)
+        engine.requestStop("from outside")
+
+        # the stop request is checked after each process
+        with pytest.raises(EngineInterruptionException):
+            engine.execute()
+        assert seen == [1]
+
+    def test_deadline(self):
+        seen = []
+
+        @shellMethod(arg=ListArgChecker(DefaultChecker.getArg()))
+        def slow(arg):
+            seen.append(arg[0])
+            time.sleep(0.05)
+            return arg
+
+        uc = UniCommand(process=slow)
+        engine = EngineV3([uc], [[]], [[{}, {}, {}]])
+        engine.stack[0] = ([[1], [2], [3]], [0], PROCESS_INSTRUCTION, None)
+        engine.setDeadline(timer() + 0.01)
+        assert engine.getDeadline() is not None
+
+        # the deadline is checked between two dispatches, the running
+        # process is never interrupted
+        with pytest.raises(ExecutionTimeoutException) as excinfo:
+            engine.execute()
+        assert excinfo.value.abnormal
+        assert seen == [1]
+
+    def test_deadlineAlreadyReached(self):
+        engine = EngineV3([UniCommand(process=lambda x: x)], [[]], [[{}]])
+        engine.setDeadline(timer() - 1)
+
+        with pytest.raises(ExecutionTimeoutException):
+            engine.execute()
+
+    def test_noDeadline(self):
+        @shellMethod(arg=ListArgChecker(DefaultChecker.getArg()))
+        def pro(arg):
+            return arg
+
+        engine = EngineV3([UniCommand(process=pro)], [[]], [[{}, {}, {}]])
+        engine.stack[0] = ([[1], [2]], [0], PROCESS_INSTRUCTION, None)
+        engine.setDeadline(None)
+        engine.execute()
+        assert engine.getLastResult() == [[2]]
+
+    def test_lazyOutputResult(self):
+        @shellMethod(arg=ListArgChecker(DefaultChecker.getArg()))
+        def pro(arg):
+            return iter(arg)
+
+        uc = UniCommand(process=pro)
+        engine = EngineV3([uc], [[]], [[{}, {}, {}]])
+        engine.stack[0] = ([[1, 2, 3]], [0], PROCESS_INSTRUCTION, None)
+        engine.execute()
+
+        # each item of the iterator is a data for the post process
+        assert engine.cmd_list[0].getPostCount() == 3
+        assert engine.getLastResult() == [[3]]
+
+    def _collectResults(self, static_plan):
+        @shellMethod(arg=ListArgChecker(DefaultChecker.getArg()))
+        def pro(arg):
+            return iter(arg)
+
+        uc = UniCommand(process=pro)
+        engine = EngineV3([uc], [[]], [[{}, {}, {}]])
+        engine.setStaticPlanEnabled(static_plan)
+        engine.stack[0] = ([[1, 2, 3]], [0], PROCESS_INSTRUCTION, None)
+        assert not engine.isResultCollectingEnabled()
+        assert engine.getResults() is None
+
+        engine.setResultCollectingEnabled(True)
+        engine.execute()
+
+        # lastResult only holds the outputs of the last data
+        assert engine.getResults() == [[1], [2], [3]]
+        assert engine.getLastResult() == [[3]]
+
+        engine.setResultCollectingEnabled(False)
+        assert engine.getResults() is None
+
+    def test_collectResults(self):
+        self._collectResults(static_plan=True)
+
+    def test_collectResultsStackMachine(self):
+        self._collectResults(static_plan=False)
+
+    def test_lazyOutputContext(self):
+        states = []
+
+        @shellMethod(arg=ListArgChecker(DefaultChecker.getArg()),
+                     engine=DefaultAccessor.getEngine())
+        def pro(arg, engine):
+            def generate():
+                for item in arg:
+                    # the generator is pulled as a part of the process
+                    states.append(engine._isInProcess)
+                    if item == 2:
+                        engine.stopExecution("enough")
+                    yield item
+
+            return generate()
+
+        uc = UniCommand(process=pro)
+        engine = EngineV3([uc], [[]], [[{}, {}, {}]])
+        engine.stack[0] = ([[1, 2, 3]], [0], PROCESS_INSTRUCTION, None)
+
+        with pytest.raises(EngineInterruptionException) as excinfo:
             engine.execute()
-        assert uc[0][0].pre_count == 0
-        assert uc[0][0].pro_count == 256
-        assert uc[0][0].post_count == 255
+        assert "enough" in str(excinfo.value)
+        assert states == [True, True]
+        assert not engine._isInProcess
+
+    def test_lazyOutputDeadline(self):
+        seen = []
 
+        @shellMethod(arg=ListArgChecker(DefaultChecker.getArg()))
+        def pro(arg):
+            def generate():
+                for item in arg:
+                    seen.append(item)
+                    time.sleep(0.05)
+                    yield item
+
+            return generate()
+
+        uc = UniCommand(process=pro)
         engine = EngineV3([uc], [[]], [[{}, {}, {}]])
-        engine.stack[0] = ([5] * (DEFAULT_EXECUTION_LIMIT + 1), [0], 2, None)
+        engine.stack[0] = ([[1, 2, 3]], [0], PROCESS_INSTRUCTION, None)
+        engine.setDeadline(timer() + 0.01)
+
+        with pytest.raises(ExecutionTimeoutException):
+            engine.execute()
+        assert seen == [1]
+
+    def test_lazyOutputProfiling(self):
+        @shellMethod(arg=ListArgChecker(DefaultChecker.getArg()))
+        def pro(arg):
+            def generate():
+                for item in arg:
+                    time.sleep(0.01)
+                    yield item
+
+            return generate()
+
+        uc = UniCommand(process=pro)
+        engine = EngineV3([uc], [[]], [[{}, {}, {}]])
+        engine.stack[0] = ([[1, 2, 3]], [0], PROCESS_INSTRUCTION, None)
+        engine.setProfilingEnabled(True)
+        engine.execute()
+
+        # the pulls are added to the time of the single call
+        entries = engine.getProfiler().getEntries()
+        pro_entry = [e for e in entries if e.getProcessTypeName() == "pro"][0]
+        assert pro_entry.count == 1
+        assert pro_entry.call_time >= 0.03
+
+    def test_profilingDisabled(self):
+        mc = MultiCommand()
+        mc.addProcess(noneFun, noneFun, noneFun)
+        engine = EngineV3([mc], [[]], [[{}, {}, {}]])
+
+        assert not engine.isProfilingEnabled()
+        assert engine.getProfiler() is None
+        engine.execute()
+        assert engine.getExecutionSnapshot()["profile"] is None
+
+    def test_profiling(self):
+        @shellMethod(arg=ListArgChecker(DefaultChecker.getArg()))
+        def pre(arg):
+            return MultiOutput([arg + [i] for i in range(0, 3)])
+
+        uc1 = UniCommand(pre)
+        uc2 = UniCommand(process=pre)
+        engine = EngineV3([uc1, uc2], [[], []], [[{}, {}, {}], [{}, {}, {}]])
+        engine.setProfilingEnabled(True)
+        assert engine.isProfilingEnabled()
+        engine.execute()
+
+        entries = engine.getProfiler().getEntries()
+        keys = [(e.cmd_index,
+                 e.sub_cmd_index,
+                 e.getProcessTypeName(),
+                 e.count,) for e in entries]
+        # only the process of the last command is executed
+        assert keys == [(0, 0, "pre", 1,),
+                        (0, 0, "post", 9,),
+                        (1, 0, "pre", 3,),
+                        (1, 0, "pro", 3,),
+                        (1, 0, "post", 9,)]
+
+        for entry in entries:
+            assert entry.total_time >= entry.call_time
+            assert entry.max_time <= entry.total_time
+
+        assert engine.getExecutionSnapshot()["profile"] == entries
+
+        engine.setProfilingEnabled(False)
+        assert engine.getProfiler() is None
+
+    def _parallelPipeline(self, pool_size, process_pool=False):
+        threads = set()
+
+        @shellMethod(arg=DefaultChecker.getInteger())
+        def slowFun(arg):
+            threads.add(threading.current_thread().ident)
+            # the first data are the slowest, the results must stay ordered
+            time.sleep((10 - arg) * 0.002)
+            return arg * 2
+
+        pro = doubleFun if process_pool else slowFun
+        uc = UniCommand(process=pro,
+                        parallel=True,
+                        process_pool=process_pool)
+        self.engine = EngineV3([uc], [[]], [[{}, {}, {}]])
+        self.engine.setPoolSize(pool_size)
+        self.engine.stack[0] = (list(range(0, 10)), [0], PROCESS_INSTRUCTION,
+                                None)
+        self.engine.execute()
+
+        assert self.engine.cmd_list[0].getProCount() == 10
+        assert self.engine.cmd_list[0].getPostCount() == 10
+        return threads
+
+    def test_parallelProcess(self):
+        threads = self._parallelPipeline(4)
+        assert len(threads) > 1
+        assert threading.current_thread().ident not in threads
+        assert self.engine.getLastResult() == [[18]]
+
+    def test_parallelProcessOrder(self):
+        @shellMethod(arg=ListArgChecker(DefaultChecker.getArg()))
+        def post(arg):
+            outputs.append(arg[0])
+            return arg
+
+        @shellMethod(arg=DefaultChecker.getInteger())
+        def pro(arg):
+            time.sleep((10 - arg) * 0.002)
+            return MultiOutput([arg, -arg])
+
+        outputs = []
+        uc = UniCommand(process=pro, post_process=post, parallel=True)
+        engine = EngineV3([uc], [[]], [[{}, {}, {}]])
+        engine.stack[0] = (list(range(0, 10)), [0], PROCESS_INSTRUCTION,
+                           None)
+        engine.execute()
+
+        expected = []
+        for i in range(0, 10):
+            expected.extend((i, -i,))
+        assert outputs == expected
+
+    def test_parallelProcessOwnPre(self):
+        threads = set()
+
+        @shellMethod()
+        def pre():
+            return MultiOutput(list(range(0, 10)))
+
+        @shellMethod(arg=DefaultChecker.getInteger())
+        def pro(arg):
+            threads.add(threading.current_thread().ident)
+            time.sleep(0.002)
+            return arg * 2
+
+        # the data of a previous command reach a process data by data, the
+        # bunch built by the pre process of the parallel command is
+        # dispatched at once
+        uc = UniCommand(pre, pro, parallel=True)
+        engine = EngineV3([uc], [[]], [[{}, {}, {}]])
+        engine.setPoolSize(4)
+        engine.execute()
+
+        assert len(threads) > 1
+        assert engine.cmd_list[0].getPreCount() == 1
+        assert engine.cmd_list[0].getProCount() == 10
+        assert engine.getLastResult() == [[18]]
+
+    def test_parallelProcessLazy(self):
+        @shellMethod(arg=ListArgChecker(DefaultChecker.getArg()))
+        def pre(arg):
+            return iter(range(0, 10))
+
+        uc1 = UniCommand(pre)
+        uc2 = UniCommand(process=doubleFun, parallel=True)
+        engine = EngineV3([uc1, uc2], [[], []], [[{}, {}, {}], [{}, {}, {}]])
+        engine.setPoolSize(3)
+        engine.execute()
+
+        assert engine.cmd_list[1].getProCount() == 10
+        assert engine.getLastResult() == [[18]]
+
+    def test_parallelProcessSingleWorker(self):
+        threads = self._parallelPipeline(1)
+        assert threads == set([threading.current_thread().ident])
+        assert self.engine.getLastResult() == [[18]]
+
+    def test_parallelProcessPool(self):
+        self._parallelPipeline(2, process_pool=True)
+        assert self.engine.getLastResult() == [[18]]
+
+    def test_parallelProcessPoolNotPicklable(self):
+        # a local function can not be sent to another process
+        @shellMethod(arg=DefaultChecker.getInteger())
+        def localFun(arg):
+            return arg
+
+        uc = UniCommand(process=localFun, parallel=True, process_pool=True)
+        engine = EngineV3([uc], [[]], [[{}, {}, {}]])
+        engine.stack[0] = ([1, 2, 3], [0], PROCESS_INSTRUCTION, None)
+
         with pytest.raises(ExecutionException):
             engine.execute()
-        assert uc[0][0].pre_count == 0
-        assert uc[0][0].pro_count == 0
-        assert uc[0][0].post_count == 256
+
+    def test_parallelProcessNested(self):
+        # every worker of the shared pool executes another parallel
+        # pipeline, the nested one must not wait for a worker of the pool
+        @shellMethod(arg=DefaultChecker.getInteger())
+        def nestedFun(arg):
+            uc = UniCommand(process=doubleFun, parallel=True)
+            engine = EngineV3([uc], [[]], [[{}, {}, {}]])
+            engine.setPoolSize(2)
+            engine.stack[0] = ([arg, arg + 1], [0], PROCESS_INSTRUCTION, None)
+            engine.execute()
+            return engine.getLastResult()[0][0]
+
+        uc = UniCommand(process=nestedFun, parallel=True)
+        engine = EngineV3([uc], [[]], [[{}, {}, {}]])
+        engine.setPoolSize(2)
+        engine.stack[0] = (list(range(0, 4)), [0], PROCESS_INSTRUCTION, None)
+        engine.execute()
+
+        assert engine.cmd_list[0].getProCount() == 4
+        assert engine.getLastResult() == [[8]]
+
+    def test_poolSize(self):
+        mc = MultiCommand()
+        mc.addProcess(noneFun, noneFun, noneFun)
+        engine = EngineV3([mc], [[]], [[{}, {}, {}]])
+
+        engine.setPoolSize(3)
+        assert engine.getPoolSize() == 3
+
+        with pytest.raises(ExecutionException):
+            engine.setPoolSize(0)
+
+        with pytest.raises(ExecutionException):
+            engine.setPoolSize("plop")
 
     # getEnv
     def test_getEnv(self):
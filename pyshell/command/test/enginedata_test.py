@@ -16,12 +16,21 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from itertools import count
+
 import pytest
 
+from pyshell.arg.accessor.default import DefaultAccessor
+from pyshell.arg.checker.default import DefaultChecker
+from pyshell.arg.checker.list import ListArgChecker
+from pyshell.arg.decorator import shellMethod
 from pyshell.command.command import MultiCommand
+from pyshell.command.command import UniCommand
 from pyshell.command.engine import EMPTY_DATA_TOKEN
 from pyshell.command.engine import EngineV3
+from pyshell.command.engine import PREPROCESS_INSTRUCTION
 from pyshell.command.exception import ExecutionException
+from pyshell.command.stackEngine import DataBunch
 
 
 def noneFun():
@@ -139,6 +148,42 @@ class TestData(object):
         with pytest.raises(ExecutionException):
             e.setData(33)
 
+    def test_flushDataInfiniteSource(self):
+        e = EngineV3([self.mc], [[]], [[{}, {}, {}]])
+        e.stack[0] = (DataBunch(source=count()), [0], PREPROCESS_INSTRUCTION,
+                      None)
+        e.flushData()
+        assert len(e.stack[0][0]) == 0
+
+    def test_flushDataHead(self):
+        seen = []
+
+        @shellMethod(arg=ListArgChecker(DefaultChecker.getArg()))
+        def pre(arg):
+            return count()
+
+        # a head like command, it stops an infinite stream
+        @shellMethod(arg=ListArgChecker(DefaultChecker.getArg()),
+                     engine=DefaultAccessor.getEngine())
+        def head(arg, engine):
+            seen.append(arg)
+            if len(seen) == 3:
+                engine.flushData()
+            return arg
+
+        e = EngineV3([UniCommand(pre), UniCommand(head)],
+                     [[], []],
+                     [[{}, {}, {}], [{}, {}, {}]])
+        e.execute()
+        assert seen == [[0], [1], [2]]
+
+    def test_hasNextDataInfiniteSource(self):
+        e = EngineV3([self.mc], [[]], [[{}, {}, {}]])
+        e.stack[0] = (DataBunch(source=count()), [0], PREPROCESS_INSTRUCTION,
+                      None)
+        assert e.hasNextData()
+        assert e.stack[0][0].isLazy()
+
     def test_hasNextData(self):
         e = EngineV3([self.mc], [[]], [[{}, {}, {}]])
 
@@ -16,9 +16,13 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from itertools import count
+
 import pytest
 
 from pyshell.command.exception import ExecutionException
+from pyshell.command.stackEngine import COMPACT_THRESHOLD
+from pyshell.command.stackEngine import DataBunch
 from pyshell.command.stackEngine import EngineStack
 
 
@@ -197,5 +201,139 @@ class TestEngineStack(object):
                     assert map_t[i]
 
     def test_methMapper(self):
-        with pytest.raises(ExecutionException):
-            self.stack.__getattr__("totoOnIndex")
+        with pytest.raises(AttributeError):
+            self.stack.totoOnIndex
+
+        assert self.stack.dataOnIndex == self.stack.data
+
+    def test_pushConvertList(self):
+        self.stack.push(["a", "b"], [0], 0)
+        self.stack.append((["c"], [0], 0, None,))
+        self.stack.insert(0, (["d"], [0], 0, None,))
+        self.stack[1] = (["e"], [0], 0, None,)
+
+        for item in self.stack:
+            assert isinstance(item[0], DataBunch)
+
+        assert self.stack[0][0] == ["d"]
+        assert self.stack[1][0] == ["e"]
+        assert self.stack[2][0] == ["c"]
+
+
+class TestDataBunch(object):
+
+    def setup_method(self, method):
+        self.bunch = DataBunch(["a", "b", "c", "d"])
+
+    def test_advance(self):
+        self.bunch.advance()
+        assert len(self.bunch) == 3
+        assert self.bunch[0] == "b"
+        assert self.bunch[-1] == "d"
+        assert self.bunch == ["b", "c", "d"]
+        assert list(self.bunch) == ["b", "c", "d"]
+        self.bunch.advance(10)
+        assert len(self.bunch) == 0
+        assert self.bunch == []
+
+    def test_index(self):
+        self.bunch.advance()
+        with pytest.raises(IndexError):
+            self.bunch[3]
+        with pytest.raises(IndexError):
+            self.bunch[-4]
+
+        self.bunch[1] = "z"
+        assert self.bunch == ["b", "z", "d"]
+        assert self.bunch[0:2] == ["b", "z"]
+        assert self.bunch[1:] == ["z", "d"]
+        assert "z" in self.bunch
+        assert "a" not in self.bunch
+
+    def test_delete(self):
+        self.bunch.advance()
+        del self.bunch[0]
+        assert self.bunch == ["c", "d"]
+        del self.bunch[-1]
+        assert self.bunch == ["c"]
+        self.bunch.append("e")
+        del self.bunch[:]
+        assert len(self.bunch) == 0
+
+    def test_insert(self):
+        self.bunch.advance(2)
+        self.bunch.insert(0, "y")
+        assert self.bunch == ["y", "c", "d"]
+        self.bunch.insert(-1, "x")
+        assert self.bunch == ["y", "c", "x", "d"]
+        self.bunch.insert(100, "w")
+        assert self.bunch == ["y", "c", "x", "d", "w"]
+        self.bunch.extend(("v", "u",))
+        assert self.bunch == ["y", "c", "x", "d", "w", "v", "u"]
+
+    def test_compact(self):
+        size = COMPACT_THRESHOLD * 4
+        bunch = DataBunch(list(range(0, size)))
+
+        for i in range(0, size - 1):
+            assert bunch[0] == i
+            bunch.advance()
+
+        assert len(bunch) == 1
+        assert bunch[0] == size - 1
+        assert len(bunch._buffer) < size
+
+    def test_lazy(self):
+        pulled = []
+
+        def source():
+            for i in range(0, 10):
+                pulled.append(i)
+                yield i
+
+        bunch = DataBunch(source=source())
+        assert bunch.isLazy()
+        assert pulled == []
+        assert bunch.hasData()
+        assert pulled == [0]
+        assert bunch[0] == 0
+        assert bunch.hasData(2)
+        assert pulled == [0, 1]
+        assert bunch.peek(3) == [0, 1, 2]
+        bunch.advance()
+        assert bunch[0] == 1
+        assert repr(bunch) == "[1, 2, ...]"
+        assert pulled == [0, 1, 2]
+
+        bunch.insert(1, "x")
+        bunch.append("y")
+        assert pulled == [0, 1, 2]
+
+        assert len(bunch) == 11
+        assert not bunch.isLazy()
+        assert bunch == [1, "x", 2, 3, 4, 5, 6, 7, 8, 9, "y"]
+
+    def test_lazyIter(self):
+        bunch = DataBunch(source=iter(range(0, 5)))
+        bunch.advance(2)
+        assert list(bunch) == [2, 3, 4]
+        assert not bunch.hasData(4)
+        assert not bunch.isLazy()
+
+    def test_lazyInfiniteDelete(self):
+        bunch = DataBunch(source=count())
+        assert bunch.hasData(3)
+        bunch.advance()
+
+        # the infinite source is dropped without being consumed
+        del bunch[:]
+        assert not bunch.isLazy()
+        assert not bunch.hasData()
+        assert len(bunch) == 0
+
+    def test_lazyEmpty(self):
+        bunch = DataBunch(source=iter(()))
+        assert not bunch.hasData()
+        assert len(bunch) == 0
+        with pytest.raises(IndexError):
+            bunch[0]
@@ -24,6 +24,7 @@ from pyshell.command.exception import EngineInterruptionException
 import pyshell.command.procedure as procedure_module
 from pyshell.command.procedure import AbstractLevelHandler
 from pyshell.command.procedure import FileProcedure
+from pyshell.command.procedure import compileFile
 from pyshell.system.manager.parent import ParentManager
 from pyshell.system.parameter.variable import VariableParameter
 from pyshell.utils.constants import ENABLE_ON_POST_PROCESS
@@ -463,3 +464,61 @@ class TestProcedure(object):
 
         with pytest.raises(EngineInterruptionException):
             fp.execute(parameter_container=FakeContainer(), args=None)
+
+    def test_compileFile(self):
+        program = compileFile(getScriptPath('several_actions_script'))
+
+        assert len(program) == 4
+        line, commands, run_in_background = program[0]
+        assert line == "echo 1\n"
+        assert commands == ((("echo", "1",), (), (),),)
+        assert not run_in_background
+
+    def test_executeParsedLines(self, monkeypatch):
+        fp = FileProcedure(file_path=getScriptPath('several_actions_script'))
+        self.parsers = []
+
+        def fakeExecute(string,
+                        parameter_container,
+                        process_name=None,
+                        process_arg=None):
+            self.parsers.append(string)
+            return None, None
+
+        monkeypatch.setattr(procedure_module, 'execute', fakeExecute)
+        fp.execute(parameter_container=FakeContainer(), args=None)
+
+        assert len(self.parsers) == 4
+        for index in range(0, 4):
+            assert self.parsers[index].isParsed()
+            assert self.parsers[index] == [(("echo", str(index+1),),
+                                            (),
+                                            (),)]
+
+    def test_programIsReused(self, monkeypatch, tmpdir):
+        script = tmpdir.join("script")
+        script.write("echo 1\necho $a\n")
+        fp = FileProcedure(file_path=str(script))
+        self.compiled = 0
+
+        def fakeCompileFile(file_path):
+            self.compiled += 1
+            return compileFile(file_path)
+
+        monkeypatch.setattr(procedure_module, 'compileFile', fakeCompileFile)
+
+        program = fp.getProgram()
+        assert program[1][1] == ((("echo", "$a",), (1,), (),),)
+        assert fp.getProgram() is program
+        assert self.compiled == 1
+
+    def test_programIsCompiledAgainIfFileChanged(self, tmpdir):
+        script = tmpdir.join("script")
+        script.write("echo 1\n")
+        fp = FileProcedure(file_path=str(script))
+        assert len(fp.getProgram()) == 1
+
+        script.write("echo 1\necho 2\n")
+        stat = os.stat(str(script))
+        os.utime(str(script), (stat.st_atime, stat.st_mtime + 10,))
+        assert len(fp.getProgram()) == 2
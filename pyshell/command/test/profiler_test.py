@@ -0,0 +1,86 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2012  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from pyshell.command.profiler import ExecutionProfiler
+from pyshell.command.profiler import ProfileEntry
+
+
+def fakeMethod():
+    pass
+
+
+class TestProfileEntry(object):
+    def test_record(self):
+        e = ProfileEntry(1, 2, 0, "plop")
+        assert e.count == 0
+        assert e.getProcessTypeName() == "pre"
+
+        e.record(1.0, 2.0, 3.0)
+        e.record(0.5, 0.5, 0.5)
+
+        assert e.count == 2
+        assert e.total_time == 7.5
+        assert e.max_time == 6.0
+        assert e.checker_time == 1.5
+        assert e.lock_time == 2.5
+        assert e.call_time == 3.5
+
+
+class TestExecutionProfiler(object):
+    def setup_method(self, method):
+        self.profiler = ExecutionProfiler()
+
+    def test_empty(self):
+        assert self.profiler.getEntries() == []
+        assert len(self.profiler.buildTable()) == 1
+
+    def test_record(self):
+        self.profiler.record(1, 0, 2, fakeMethod, 0.0, 0.0, 1.0)
+        self.profiler.record(0, 0, 1, fakeMethod, 0.0, 0.0, 1.0)
+        self.profiler.record(1, 0, 2, fakeMethod, 0.0, 0.0, 1.0)
+
+        entries = self.profiler.getEntries()
+        assert len(entries) == 2
+        assert entries[0].process_type == 1
+        assert entries[0].count == 1
+        assert entries[1].process_type == 2
+        assert entries[1].count == 2
+        assert entries[1].name == "fakeMethod"
+
+    def test_recordWithoutName(self):
+        self.profiler.record(0, 0, 1, object(), 0.0, 0.0, 1.0)
+        assert self.profiler.getEntries()[0].name == "object"
+
+    def test_reset(self):
+        self.profiler.record(0, 0, 1, fakeMethod, 0.0, 0.0, 1.0)
+        self.profiler.reset()
+        assert self.profiler.getEntries() == []
+
+    def test_buildTable(self):
+        self.profiler.record(0, 1, 1, fakeMethod, 0.001, 0.002, 0.003)
+        table = self.profiler.buildTable()
+
+        assert len(table) == 2
+        assert table[1] == ("0.1 fakeMethod",
+                            "pro",
+                            "1",
+                            "6.000",
+                            "6.000",
+                            "1.000",
+                            "2.000",
+                            "3.000",)
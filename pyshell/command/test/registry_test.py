@@ -0,0 +1,60 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2012  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from tries.exception import triesException
+
+from pyshell.command.registry import CommandRegistry
+
+
+class TestCommandRegistry(object):
+
+    def setup_method(self, method):
+        self.registry = CommandRegistry()
+
+    def test_init(self):
+        assert self.registry.getGeneration() == 0
+
+    def test_insert(self):
+        self.registry.insert(("aa", "bb",), "value")
+        assert self.registry.getGeneration() == 1
+        assert self.registry.search(("aa", "bb",)).getValue() == "value"
+
+    def test_update(self):
+        self.registry.insert(("aa",), "value")
+        self.registry.update(("aa",), "other")
+        assert self.registry.getGeneration() == 2
+        assert self.registry.search(("aa",)).getValue() == "other"
+
+    def test_remove(self):
+        self.registry.insert(("aa",), "value")
+        self.registry.remove(("aa",))
+        assert self.registry.getGeneration() == 2
+
+    def test_setStopTraversal(self):
+        self.registry.insert(("aa",), "value")
+        self.registry.setStopTraversal(("aa",), True)
+        assert self.registry.getGeneration() == 2
+        assert self.registry.isStopTraversal(("aa",))
+
+    def test_failedInsert(self):
+        self.registry.insert(("aa",), "value")
+        with pytest.raises(triesException):
+            self.registry.insert(("aa",), "value")
+        assert self.registry.getGeneration() == 2
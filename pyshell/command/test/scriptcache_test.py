@@ -0,0 +1,123 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2017  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+
+import pyshell.command.procedure as procedure_module
+from pyshell.command.procedure import FileProcedure
+from pyshell.command.procedure import compileFile
+from pyshell.command.scriptcache import getCachePath
+from pyshell.command.scriptcache import loadProgram
+from pyshell.command.scriptcache import storeProgram
+from pyshell.utils.constants import SCRIPT_CACHE_DIRECTORY_NAME
+
+
+class TestScriptCache(object):
+
+    def _createScript(self, tmpdir, content="echo 1\necho $a -b | c &\n"):
+        script = tmpdir.join("script.pys")
+        script.write(content)
+        path = str(script)
+        return path, os.stat(path)
+
+    def test_getCachePath(self, tmpdir):
+        path, stat = self._createScript(tmpdir)
+        assert getCachePath(path) == os.path.join(str(tmpdir),
+                                                  SCRIPT_CACHE_DIRECTORY_NAME,
+                                                  "script.pys.json")
+
+    def test_storeThenLoad(self, tmpdir):
+        path, stat = self._createScript(tmpdir)
+        program = compileFile(path)
+
+        storeProgram(path, stat, program)
+        assert os.path.exists(getCachePath(path))
+        assert loadProgram(path, stat) == program
+
+        # no temporary file left
+        files = os.listdir(os.path.dirname(getCachePath(path)))
+        assert files == ["script.pys.json"]
+
+    def test_loadWithoutCache(self, tmpdir):
+        path, stat = self._createScript(tmpdir)
+        assert loadProgram(path, stat) is None
+
+    def test_loadOutdated(self, tmpdir):
+        path, stat = self._createScript(tmpdir)
+        storeProgram(path, stat, compileFile(path))
+
+        path, stat = self._createScript(tmpdir, "echo 2\n")
+        os.utime(path, (stat.st_atime, stat.st_mtime + 10,))
+        assert loadProgram(path, os.stat(path)) is None
+
+    def test_loadOtherVersion(self, tmpdir):
+        path, stat = self._createScript(tmpdir)
+        storeProgram(path, stat, compileFile(path))
+
+        with open(getCachePath(path)) as cache_file:
+            content = json.load(cache_file)
+        content["version"] = "0.0.0"
+        with open(getCachePath(path), "w") as cache_file:
+            json.dump(content, cache_file)
+
+        assert loadProgram(path, stat) is None
+
+    def test_loadCorrupted(self, tmpdir):
+        path, stat = self._createScript(tmpdir)
+        storeProgram(path, stat, compileFile(path))
+
+        with open(getCachePath(path), "w") as cache_file:
+            cache_file.write("{\"format\": 1, \"prog")
+
+        assert loadProgram(path, stat) is None
+
+    def test_loadInvalidProgram(self, tmpdir):
+        path, stat = self._createScript(tmpdir)
+        storeProgram(path, stat, ((1, 2,),))
+
+        assert loadProgram(path, stat) is None
+
+    def test_storeInUnwritableDirectory(self, tmpdir):
+        path, stat = self._createScript(tmpdir)
+        tmpdir.join(SCRIPT_CACHE_DIRECTORY_NAME).write("not a directory")
+
+        storeProgram(path, stat, compileFile(path))
+        assert loadProgram(path, stat) is None
+
+    def test_fileProcedureUsesCache(self, monkeypatch, tmpdir):
+        path, stat = self._createScript(tmpdir)
+        self.compiled = 0
+
+        def fakeCompileFile(file_path):
+            self.compiled += 1
+            return compileFile(file_path)
+
+        monkeypatch.setattr(procedure_module, 'compileFile', fakeCompileFile)
+
+        program = FileProcedure(path, use_disk_cache=True).getProgram()
+        assert self.compiled == 1
+
+        assert FileProcedure(path, use_disk_cache=True).getProgram() == program
+        assert self.compiled == 1
+
+    def test_fileProcedureWithoutCache(self, tmpdir):
+        path, stat = self._createScript(tmpdir)
+        FileProcedure(path).getProgram()
+
+        assert not os.path.exists(getCachePath(path))
@@ -0,0 +1,94 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2012  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import pyshell
+from pyshell.command.workerpool import closeWorkerPools
+from pyshell.command.workerpool import getWorkerPool
+
+# an exit function registered before the import of the module is executed
+# after the one of the module
+EXIT_SCRIPT = """
+import atexit
+import sys
+
+def check():
+    from pyshell.command import workerpool
+    sys.stdout.write("open" if workerpool._pools else "closed")
+
+atexit.register(check)
+
+from pyshell.command.workerpool import getWorkerPool
+getWorkerPool(2).map(abs, [-1, -2])
+getWorkerPool(2, True).map(abs, [-1, -2])
+"""
+
+
+class TestWorkerPool(object):
+    def teardown_method(self, method):
+        closeWorkerPools()
+
+    def test_sharedPool(self):
+        pool = getWorkerPool(2)
+        assert getWorkerPool(2) is pool
+        assert getWorkerPool(3) is not pool
+        assert getWorkerPool(2, True) is not pool
+
+    def test_closeWorkerPools(self):
+        pool = getWorkerPool(2)
+        assert pool.map(abs, [-1, -2]) == [1, 2]
+
+        closeWorkerPools()
+
+        # the pool is terminated, the next call gets a new one
+        with pytest.raises(ValueError):
+            pool.map(abs, [-1, -2])
+
+        new_pool = getWorkerPool(2)
+        assert new_pool is not pool
+        assert new_pool.map(abs, [-1, -2]) == [1, 2]
+
+    def test_exit(self):
+        # the pools are closed at exit, the interpreter does not wait for
+        # the workers
+        path = os.path.dirname(os.path.dirname(pyshell.__file__))
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join([path,
+                                             env.get("PYTHONPATH", "")])
+        proc = subprocess.Popen([sys.executable, "-c", EXIT_SCRIPT],
+                                env=env,
+                                stdout=subprocess.PIPE)
+
+        limit = time.time() + 30
+        while proc.poll() is None and time.time() < limit:
+            time.sleep(0.05)
+
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+            pytest.fail("the interpreter did not exit")
+
+        assert proc.returncode == 0
+        assert proc.stdout.read().decode() == "closed"
+        proc.stdout.close()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2012  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import atexit
+import pickle
+import threading
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
+
+from pyshell.command.exception import ExecutionException
+
+# the pools are shared between the executions and created on first use,
+# one pool per kind and per size
+_pools = {}
+_poolsLock = threading.Lock()
+
+# set in the threads and the processes executing a call of a pool
+_workerScope = threading.local()
+
+
+def getWorkerPool(size, use_processes=False):
+    key = (use_processes, size,)
+
+    with _poolsLock:
+        pool = _pools.get(key)
+        if pool is None:
+            if use_processes:
+                pool = Pool(size)
+            else:
+                pool = ThreadPool(size)
+
+            _pools[key] = pool
+
+    return pool
+
+
+def closeWorkerPools():
+    with _poolsLock:
+        for pool in _pools.values():
+            pool.terminate()
+
+        _pools.clear()
+
+
+# a worker still alive at exit could keep the interpreter waiting
+atexit.register(closeWorkerPools)
+
+
+def isInPoolWorker():
+    return getattr(_workerScope, "inWorker", False)
+
+
+def _callInWorker(method, data):
+    previous = isInPoolWorker()
+    _workerScope.inWorker = True
+    try:
+        return method(**data)
+    finally:
+        _workerScope.inWorker = previous
+
+
+def _callLocked(call):
+    method, data, lock = call
+    with lock:
+        return _callInWorker(method, data)
+
+
+def _callUnlocked(call):
+    method, data = call
+    return _callInWorker(method, data)
+
+
+def mapInPool(size, calls, use_processes=False):
+    """
+    execute every (method, data, lock) call in a pool of size workers and
+    return the results in the order of the calls.  In a process pool, the
+    parameter locks are useless, the workers own a copy of the parameters.
+
+    A call made from a pool worker, e.g. a parallel process executing
+    another command line, is executed serially in the worker: a nested map
+    on the shared pools could wait forever for a worker.
+    """
+
+    if isInPoolWorker():
+        return [_callLocked(call) for call in calls]
+
+    pool = getWorkerPool(size, use_processes)
+
+    if not use_processes:
+        return pool.map(_callLocked, calls)
+
+    calls = [(method, data,) for method, data, lock in calls]
+
+    # a not picklable call would fail deep inside the pool, check it here to
+    # get a meaningful error
+    try:
+        pickle.dumps(calls)
+    except Exception as ex:
+        excmsg = ("(engine) mapInPool, a process executed in a process pool "
+                  "must be a picklable function with picklable arguments: "
+                  "%s")
+        excmsg %= str(ex)
+        raise ExecutionException(excmsg)
+
+    return pool.map(_callUnlocked, calls)
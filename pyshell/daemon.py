@@ -0,0 +1,158 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2015  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# The daemon keeps one warm CommandExecuter and serves the command lines
+# sent over a UNIX domain socket.  The protocol is line based, the client
+# sends one command line by line, the daemon answers with one json object
+# by line:
+#
+#   {"status": 0, "output": ["line", ...], "result": [...], "error": null}
+#
+# Every connection is served in its own thread, so it gets its own thread
+# local parameter scope, flushed when the connection is closed.  The client
+# side is in pyshell.daemonclient, it does not need to load the shell.
+
+import json
+import os
+import socket
+import stat
+
+from pyshell.utils.constants import DAEMON_ENCODING
+from pyshell.utils.constants import DAEMON_PROCESS_NAME
+from pyshell.utils.constants import DAEMON_STATUS_FAILURE
+from pyshell.utils.constants import DAEMON_STATUS_SUCCESS
+from pyshell.utils.exception import CORE_ERROR
+from pyshell.utils.exception import DefaultPyshellException
+from pyshell.utils.executing import execute
+from pyshell.utils.printing import Printer
+from pyshell.utils.setargs import setArgs
+
+try:
+    import socketserver
+except ImportError:
+    import SocketServer as socketserver
+
+
+def _toSerializable(value):
+    if value is None or isinstance(value, (bool, int, float,)):
+        return value
+
+    if isinstance(value, (list, tuple,)):
+        return [_toSerializable(item) for item in value]
+
+    return str(value)
+
+
+def executeLine(line, parameter_container):
+    "execute a command line and return the answer to send to the client"
+    printer = Printer.getInstance()
+    printer.startCapture()
+
+    try:
+        ex, engine = execute(line, parameter_container, DAEMON_PROCESS_NAME)
+    except Exception as exception:
+        ex, engine = exception, None
+    finally:
+        output = printer.stopCapture()
+
+    result = None
+    if engine is not None:
+        result = _toSerializable(engine.getLastResult())
+
+    if ex is None:
+        return {"status": DAEMON_STATUS_SUCCESS,
+                "output": output,
+                "result": result,
+                "error": None}
+
+    return {"status": DAEMON_STATUS_FAILURE,
+            "output": output,
+            "result": result,
+            "error": str(ex)}
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        params = self.server.params
+
+        # initialize the thread local variables of this connection
+        setArgs(params, ())
+
+        try:
+            while True:
+                line = self.rfile.readline()
+                if len(line) == 0:
+                    break
+
+                line = line.decode(DAEMON_ENCODING).rstrip("\r\n")
+                answer = json.dumps(executeLine(line, params))
+                self.wfile.write((answer + "\n").encode(DAEMON_ENCODING))
+                self.wfile.flush()
+        finally:
+            params.flush()
+
+
+class CommandDaemon(socketserver.ThreadingMixIn,
+                    socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, params):
+        self.socketPath = socket_path
+        self.params = params
+        _removeStaleSocket(socket_path)
+
+        # only the owner of the daemon is allowed to send commands
+        umask = os.umask(0o077)
+        try:
+            socketserver.UnixStreamServer.__init__(self,
+                                                   socket_path,
+                                                   DaemonRequestHandler)
+        finally:
+            os.umask(umask)
+
+    def server_close(self):
+        socketserver.UnixStreamServer.server_close(self)
+
+        try:
+            os.remove(self.socketPath)
+        except OSError:
+            pass
+
+
+def _removeStaleSocket(socket_path):
+    try:
+        mode = os.stat(socket_path).st_mode
+    except OSError:
+        return
+
+    if not stat.S_ISSOCK(mode):
+        excmsg = "(CommandDaemon) __init__, '%s' exists and is not a socket"
+        raise DefaultPyshellException(excmsg % socket_path, CORE_ERROR)
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+    except socket.error:
+        # nobody is listening, the socket was left by a dead daemon
+        os.remove(socket_path)
+        return
+    finally:
+        client.close()
+
+    excmsg = "(CommandDaemon) __init__, a daemon is already listening on '%s'"
+    raise DefaultPyshellException(excmsg % socket_path, CORE_ERROR)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2015  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Client side of the daemon (see pyshell.daemon), the shell is not loaded
+# to send the commands, a client process starts fast.
+
+import json
+import socket
+import sys
+
+from pyshell.utils.constants import DAEMON_ENCODING
+from pyshell.utils.constants import DAEMON_STATUS_SUCCESS
+from pyshell.utils.exception import CORE_ERROR
+from pyshell.utils.exception import DefaultPyshellException
+
+
+class DaemonClient(object):
+    def __init__(self, socket_path):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(socket_path)
+        self.rfile = self.socket.makefile("rb")
+
+    def execute(self, line):
+        "send a command line to the daemon and return its answer"
+        if "\n" in line or "\r" in line:
+            raise DefaultPyshellException("(DaemonClient) execute, a command "
+                                          "line can not contain a new line",
+                                          CORE_ERROR)
+
+        self.socket.sendall((line + "\n").encode(DAEMON_ENCODING))
+        answer = self.rfile.readline()
+
+        if len(answer) == 0:
+            raise DefaultPyshellException("(DaemonClient) execute, the "
+                                          "daemon closed the connection",
+                                          CORE_ERROR)
+
+        return json.loads(answer.decode(DAEMON_ENCODING))
+
+    def close(self):
+        self.rfile.close()
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+
+def runClient(socket_path, lines, out=None):
+    "send the lines to the daemon, print the output, return the exit status"
+    if out is None:
+        out = sys.stdout
+
+    status = DAEMON_STATUS_SUCCESS
+    with DaemonClient(socket_path) as client:
+        for line in lines:
+            line = line.rstrip("\r\n")
+            if len(line) == 0:
+                continue
+
+            answer = client.execute(line)
+            for output in answer["output"]:
+                out.write(output + "\n")
+
+            if answer["status"] != DAEMON_STATUS_SUCCESS:
+                status = answer["status"]
+
+    out.flush()
+    return status
@@ -22,12 +22,14 @@ import sys
 from contextlib import contextmanager
 
 from tries import multiLevelTries
-from tries.exception import pathNotExistsTriesException
 
 from pyshell.addons import std
 from pyshell.addons import system
 from pyshell.command.procedure import FileProcedure
 from pyshell.control import ControlCenter
+from pyshell.daemon import CommandDaemon
+from pyshell.utils.completion import CompletionEngine
+from pyshell.utils.constants import CONTEXT_EXECUTION_DAEMON
 from pyshell.utils.constants import CONTEXT_EXECUTION_KEY
 from pyshell.utils.constants import CONTEXT_EXECUTION_SHELL
 from pyshell.utils.constants import DEBUG_ENVIRONMENT_NAME
@@ -41,7 +43,6 @@ from pyshell.utils.constants import ENVIRONMENT_USE_HISTORY_KEY
 from pyshell.utils.exception import ListOfException
 from pyshell.utils.executing import execute
 from pyshell.utils.misc import getTerminalSize
-from pyshell.utils.parsing import Parser
 from pyshell.utils.printing import Printer
 from pyshell.utils.printing import error
 from pyshell.utils.printing import printException
@@ -66,6 +67,7 @@ class CommandExecuter():
     def __init__(self, param_directory_path=None, outside_args=None):
         self.params = ControlCenter()
         self.promptWaitingValuable = SimpleValuable(False)
+        self.completion = CompletionEngine()
         self._initPrinter()
         atexit.register(self._atExit)
 
@@ -225,6 +227,27 @@ class CommandExecuter():
             # of the sofware
             execute(cmd, self.params, "__shell__")
 
+    def daemonLoop(self, socket_path):
+        context = self.params.getContextManager()
+        exec_type = context.getParameter(CONTEXT_EXECUTION_KEY,
+                                         perfect_match=True)
+        if exec_type is not None:
+            exec_type.setSelectedValue(CONTEXT_EXECUTION_DAEMON)
+
+        daemon = None
+        with self.exceptionManager("fail to start the daemon"):
+            daemon = CommandDaemon(socket_path, self.params)
+
+        if daemon is None:
+            return
+
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            warning("\n   daemon interrupted")
+        finally:
+            daemon.server_close()
+
     def printAsynchronousOnShellV2(self, message):
         prompt = self._getPrompt()
         # this is needed because after an input,
@@ -251,8 +274,6 @@ class CommandExecuter():
         sys.stdout.flush()
 
     def complete(self, suffix, index):
-        parser = Parser(readline.get_line_buffer())
-        parser.parse()
         env = self.params.getEnvironmentManager()
         ltries_param = env.getParameter(ENVIRONMENT_LEVEL_TRIES_KEY,
                                         perfect_match=True)
@@ -263,72 +284,10 @@ class CommandExecuter():
             ltries = ltries_param.getValue()
 
         try:
-            # # special case, empty line # #
-                # only print root tokens
-            if len(parser) == 0:
-                fullline = ()
-                dic = ltries.buildDictionnary(fullline, True, True, False)
-
-                toret = {}
-                for k in dic.keys():
-                    toret[k[0]] = None
-
-                toret = toret.keys()[:]
-                toret.append(None)
-                return toret[index]
-
-            fullline = parser[-1][0]
-
-            # # manage ambiguity # #
-            advanced_result = ltries.advancedSearch(fullline, False)
-            if advanced_result.isAmbiguous():
-                token_index = len(advanced_result.existingPath) - 1
-
-                if token_index != (len(fullline)-1):
-                    return None   # ambiguity on an inner level
-
-                tries = advanced_result.existingPath[token_index][1].localTries
-                keylist = tries.getKeyList(fullline[token_index])
-
-                keys = []
-                for key in keylist:
-                    tmp = list(fullline[:])
-                    tmp.append(key)
-                    keys.append(tmp)
-            else:
-                try:
-                    dic = ltries.buildDictionnary(fullline, True, True, False)
-                except pathNotExistsTriesException:
-                    return None
-
-                keys = dic.keys()
-
-            # build final result
-            final_keys = []
-            for k in keys:
-
-                # special case to complete the last token if needed
-                if len(k) >= len(fullline) and \
-                   len(k[len(fullline)-1]) > len(fullline[-1]):
-                    toappend = k[len(fullline)-1]
-
-                    if len(k) > len(fullline):
-                        toappend += " "
-
-                    final_keys.append(toappend)
-                    break
-
-                # normal case, the last token on the line is complete,
-                # only add its child tokens
-                final_keys.append(" ".join(k[len(fullline):]))
-
-            # if no other choice than the current value, return the
-            # current value
-            if "" in final_keys and len(final_keys) == 1:
-                return (fullline[-1], None,)[index]
-
-            final_keys.append(None)
-            return final_keys[index]
+            return self.completion.complete(readline.get_line_buffer(),
+                                            readline.get_endidx(),
+                                            ltries,
+                                            index)
 
         except Exception as ex:
             context = self.params.getContextManager()
@@ -364,5 +323,7 @@ class CommandExecuter():
 
         with self.exceptionManager("An error occured during the script "
                                    "execution: "):
-            afile = FileProcedure(filename, granularity=granularity)
+            afile = FileProcedure(filename,
+                                  granularity=granularity,
+                                  use_disk_cache=True)
             afile.execute(args=(), parameter_container=self.params)
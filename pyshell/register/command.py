@@ -58,9 +58,15 @@ def registerAnInstanciatedCommand(key_list, cmd, profile=None):
     return cmd
 
 
-def registerCommand(key_list, pre=None, pro=None, post=None, profile=None):
+def registerCommand(key_list,
+                    pre=None,
+                    pro=None,
+                    post=None,
+                    profile=None,
+                    parallel=False,
+                    process_pool=False):
     loader_profile = _localGetAndInitCallerModule(profile)
-    cmd = UniCommand(pre, pro, post)
+    cmd = UniCommand(pre, pro, post, parallel, process_pool)
     loader_profile.addCmd(key_list, cmd)
     return cmd
 
@@ -59,7 +59,9 @@ class FileLoader(AbstractLoader):
         if path is None or not os.path.exists(path):
             return
 
-        afile = FileProcedure(file_path=path, granularity=-1)
+        afile = FileProcedure(file_path=path,
+                              granularity=-1,
+                              use_disk_cache=True)
         afile.execute(parameter_container=parameter_container, args=())
 
     @classmethod
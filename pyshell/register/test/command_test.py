@@ -399,6 +399,19 @@ class TestRegisterCommand(object):
         assert co.process is proPro
         assert co.postProcess is postPro
 
+    # registerCommand with a parallel process
+    def test_registerCommandParallel(self):
+        self.preTest()
+        c = registerCommand(key_list=("plip",),
+                            pro=proPro,
+                            parallel=True,
+                            process_pool=True)
+        self.postTest(DEFAULT_PROFILE_NAME)
+
+        co, a, e = c[0]
+        assert co.parallel
+        assert co.process_pool
+
     # registerCommand with valid args and registerSetTempPrefix,
     # with profile None
     def test_registerCommand9(self):
@@ -17,7 +17,6 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from abc import ABCMeta, abstractmethod
-from threading import Lock
 
 from tries import multiLevelTries
 
@@ -25,6 +24,8 @@ from pyshell.system.parameter.abstract import Parameter
 from pyshell.utils.abstract.flushable import Flushable
 from pyshell.utils.exception import ParameterException
 from pyshell.utils.string65 import isString
+from pyshell.utils.synchronized import ReadWriteLock
+from pyshell.utils.synchronized import sharedSynchronous
 from pyshell.utils.synchronized import synchronous
 
 
@@ -65,6 +66,14 @@ def isAValidStringPath(string_path):
     return True, tuple(final_path)
 
 
+def _isCanonicalStringPath(string_path):
+    # a canonical path is already equal to the join of its valid path
+    return (isString(string_path) and
+            ".." not in string_path and
+            string_path[:1] != "." and
+            string_path[-1:] != ".")
+
+
 def _buildExistingPathFromError(wrong_path, advanced_result):
     path_to_return = list(advanced_result.getFoundCompletePath())
     path_to_return.extend(wrong_path[advanced_result.getTokenFoundCount():])
@@ -219,9 +228,15 @@ class AbstractParameterManager(Flushable):
     __metaclass__ = ABCMeta
 
     def __init__(self, parent=None):
-        self._internalLock = Lock()
+        # the lookups are shared between the threads, the updates are
+        # exclusive
+        self._internalLock = ReadWriteLock()
         self.mltries = multiLevelTries()
 
+        # hold the nodes with a canonical name, a perfect match on such a
+        # name does not need to explore the mltries
+        self.nodeByName = {}
+
         # hold the nodes for the current thread
         self.threadLocalVar = {}
 
@@ -301,6 +316,35 @@ class AbstractParameterManager(Flushable):
 
         return advanced_result
 
+    def _getNode(self,
+                 meth_name,
+                 string_path,
+                 raise_if_ambiguous=True,
+                 perfect_match=False):
+        if perfect_match and _isCanonicalStringPath(string_path):
+            return self.nodeByName.get(string_path)
+
+        advanced_result = self._getAdvanceResult(meth_name,
+                                                 string_path,
+                                                 False,
+                                                 raise_if_ambiguous,
+                                                 perfect_match)
+
+        if advanced_result.isValueFound():
+            return advanced_result.getValue()
+
+        return None
+
+    def _insertNode(self, parameter_node):
+        self.mltries.insert(parameter_node.mltries_key, parameter_node)
+
+        if _isCanonicalStringPath(parameter_node.string_key):
+            self.nodeByName[parameter_node.string_key] = parameter_node
+
+    def _removeNode(self, parameter_node):
+        self.mltries.remove(parameter_node.mltries_key)
+        self.nodeByName.pop(parameter_node.string_key, None)
+
     @abstractmethod
     def getAllowedType(self):
         pass
@@ -341,17 +385,14 @@ class AbstractParameterManager(Flushable):
             raise ParameterException(excmsg)
 
         # check safety and existing
-        advanced_result = self._getAdvanceResult("setParameter",
-                                                 string_path,
-                                                 False,
-                                                 False,
-                                                 True)
-        creation_mode = not advanced_result.isValueFound()
+        parameter_node = self._getNode("setParameter",
+                                       string_path,
+                                       False,
+                                       True)
+        creation_mode = parameter_node is None
 
         if creation_mode:
             parameter_node = ParameterTriesNode(string_path)
-        else:
-            parameter_node = advanced_result.getValue()
 
         if local_param:
             key = self.parent.getCurrentId()
@@ -384,26 +425,57 @@ class AbstractParameterManager(Flushable):
             self.groupGlobalVar[origin_group].add(parameter_node)
 
         if creation_mode:
-            self.mltries.insert(parameter_node.mltries_key, parameter_node)
+            self._insertNode(parameter_node)
 
         return param
 
-    @synchronous()
+    @sharedSynchronous()
     def getParameter(self,
                      string_path,
                      perfect_match=False,
                      local_param=True,
                      explore_other_scope=True):
+        return self._getParameter(string_path,
+                                  perfect_match,
+                                  local_param,
+                                  explore_other_scope)
+
+    @sharedSynchronous()
+    def getParameters(self,
+                      string_path_list,
+                      perfect_match=False,
+                      local_param=True,
+                      explore_other_scope=True):
+        """
+        get several parameters with a single lock acquisition, return a
+        dictionnary with the string paths as keys and the parameters, or
+        None if not found, as values
+        """
+
+        parameters = {}
+        for string_path in string_path_list:
+            if string_path in parameters:
+                continue
+
+            parameters[string_path] = self._getParameter(string_path,
+                                                         perfect_match,
+                                                         local_param,
+                                                         explore_other_scope)
+
+        return parameters
+
+    def _getParameter(self,
+                      string_path,
+                      perfect_match,
+                      local_param,
+                      explore_other_scope):
 
-        # this call will raise if value not found or ambiguous
-        advanced_result = self._getAdvanceResult("getParameter",
-                                                 string_path,
-                                                 perfect_match=perfect_match,
-                                                 raise_if_not_found=False)
-
-        if advanced_result.isValueFound():
-            parameter_node = advanced_result.getValue()
+        # this call will raise if ambiguous
+        parameter_node = self._getNode("getParameter",
+                                       string_path,
+                                       perfect_match=perfect_match)
 
+        if parameter_node is not None:
             # simple loop to explore the both statment of this condition
             # if needed, without ordering
             for case in range(0, 2):
@@ -425,7 +497,7 @@ class AbstractParameterManager(Flushable):
 
         return None
 
-    @synchronous()
+    @sharedSynchronous()
     def hasParameter(self,
                      string_path,
                      raise_if_ambiguous=True,
@@ -434,15 +506,12 @@ class AbstractParameterManager(Flushable):
                      explore_other_scope=True):
 
         # this call will raise if ambiguous
-        advanced_result = self._getAdvanceResult("hasParameter",
-                                                 string_path,
-                                                 False,
-                                                 raise_if_ambiguous,
-                                                 perfect_match)
-
-        if advanced_result.isValueFound():
-            parameter_node = advanced_result.getValue()
+        parameter_node = self._getNode("hasParameter",
+                                       string_path,
+                                       raise_if_ambiguous,
+                                       perfect_match)
 
+        if parameter_node is not None:
             # simple loop to explore the both statment of this condition if
             # needed, without any order
             for case in range(0, 2):
@@ -515,7 +584,7 @@ class AbstractParameterManager(Flushable):
 
                     # remove from mltries
                     if parameter_node.isRemovable():
-                        self.mltries.remove(parameter_node.mltries_key)
+                        self._removeNode(parameter_node)
 
                     return param
                 else:
@@ -562,7 +631,7 @@ class AbstractParameterManager(Flushable):
                             del self.groupGlobalVar[actual_origin_group]
 
                     if parameter_node.isRemovable():
-                        self.mltries.remove(parameter_node.mltries_key)
+                        self._removeNode(parameter_node)
 
                     return param
 
@@ -583,11 +652,11 @@ class AbstractParameterManager(Flushable):
 
                 if parameter_node.isRemovable():
                     # can not raise, because every path exist
-                    self.mltries.remove(parameter_node.mltries_key)
+                    self._removeNode(parameter_node)
 
             del self.threadLocalVar[key]
 
-    @synchronous()
+    @sharedSynchronous()
     def buildDictionnary(self,
                          string_path,
                          local_param=True,
@@ -634,21 +703,19 @@ class AbstractParameterManager(Flushable):
 
         return to_ret
 
-    @synchronous()
+    @sharedSynchronous()
     def getAssociatedGroup(self, string_path):
-        advanced_result = self._getAdvanceResult("hasParameter",
-                                                 string_path,
-                                                 False,
-                                                 True,
-                                                 True)
+        parameter_node = self._getNode("hasParameter",
+                                       string_path,
+                                       True,
+                                       True)
 
-        if not advanced_result.isValueFound():
+        if parameter_node is None:
             return None
 
-        parameter_node = advanced_result.getValue()
         return parameter_node.getGroupOrigin()
 
-    @synchronous()
+    @sharedSynchronous()
     def getGroupNodes(self, origin_group):
         if origin_group in self.groupGlobalVar:
             return tuple(self.groupGlobalVar[origin_group])
@@ -670,7 +737,7 @@ class AbstractParameterManager(Flushable):
                 group_node_set.remove(node)
 
             if node.isRemovable():
-                self.mltries.remove(node.mltries_key)
+                self._removeNode(node)
 
         if len(group_node_set) == 0:
             del self.groupGlobalVar[origin_group]
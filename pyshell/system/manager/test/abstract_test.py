@@ -26,6 +26,7 @@ from pyshell.system.manager.abstract import AbstractParameterManager
 from pyshell.system.manager.abstract import AbstractParentManager
 from pyshell.system.manager.abstract import ParameterTriesNode
 from pyshell.system.manager.abstract import _buildExistingPathFromError
+from pyshell.system.manager.abstract import _isCanonicalStringPath
 from pyshell.system.manager.abstract import isAValidStringPath
 from pyshell.system.manager.test.fakeparent import FakeParentManager
 from pyshell.system.parameter.abstract import Parameter
@@ -1062,6 +1063,19 @@ class TestParameterManager(object):
                                         explore_other_scope=False)
         assert pget is None
 
+    # getParameters, existing, prefixed, duplicated and unknown paths
+    def test_parameterManager38b(self):
+        param = self.params.setParameter("plop",
+                                         Parameter("titi"),
+                                         local_param=True)
+        pgets = self.params.getParameters(("plop", "plo", "plop", "plip",))
+        assert pgets == {"plop": param, "plo": param, "plip": None}
+
+    # getParameters, ambiguous path
+    def test_parameterManager38c(self):
+        with pytest.raises(ParameterException):
+            self.params.getParameters(("aa.bb.cc", "a",))
+
     ##
 
     # hasParameter, local exists + local_param=True +
@@ -2093,3 +2107,56 @@ class TestParameterManager(object):
 
         l = self.params.getGroupNodes("group A")
         assert len(l) == 1
+
+    # # exact name index # #
+
+    def test_isCanonicalStringPath(self):
+        assert _isCanonicalStringPath("aa.bb.cc")
+        assert _isCanonicalStringPath("aa")
+        assert not _isCanonicalStringPath(".aa.bb")
+        assert not _isCanonicalStringPath("aa.bb.")
+        assert not _isCanonicalStringPath("aa..bb")
+        assert not _isCanonicalStringPath(("aa", "bb",))
+
+    def test_nodeByNameSet(self):
+        assert set(self.params.nodeByName) == set(("aa.bb.cc", "ab.bc.cd",))
+        node = self.params.nodeByName["aa.bb.cc"]
+        assert node.getLocalVar(42).getValue() == "plop"
+
+    def test_nodeByNameUnset(self):
+        self.params.unsetParameter("aa.bb.cc")
+        assert "aa.bb.cc" not in self.params.nodeByName
+        assert self.params.getParameter("aa.bb.cc", perfect_match=True) is None
+
+    def test_nodeByNameFlush(self):
+        self.params.flush()
+        assert len(self.params.nodeByName) == 0
+
+    def test_nodeByNameClearFrozenNode(self):
+        self.params.setParameter("plop",
+                                 Parameter("titi"),
+                                 local_param=False,
+                                 origin_group="group A",
+                                 freeze=True)
+        self.params.unsetParameter("plop", local_param=False)
+        assert "plop" in self.params.nodeByName
+
+        self.params.clearFrozenNode("group A")
+        assert "plop" not in self.params.nodeByName
+
+    def test_nodeByNameNotCanonical(self):
+        p = Parameter("titi")
+        self.params.setParameter(".aa.bb.cc", p)
+        assert ".aa.bb.cc" not in self.params.nodeByName
+
+        # a not canonical path is solved with the mltries
+        assert self.params.getParameter(".aa.bb.cc", perfect_match=True) is p
+        assert self.params.hasParameter("aa..bb.cc", perfect_match=True)
+
+    def test_nodeByNamePerfectMatch(self):
+        assert self.params.hasParameter("aa.bb.cc", perfect_match=True)
+        assert not self.params.hasParameter("aa.bb.c", perfect_match=True)
+        assert self.params.getParameter("aa.bb.c", perfect_match=True) is None
+
+        # prefix are still solved with the mltries
+        assert self.params.getParameter("aa.bb.c").getValue() == "plop"
@@ -0,0 +1,216 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2015  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import threading
+
+import pytest
+
+from tries import multiLevelTries
+
+from pyshell.arg.accessor.default import DefaultAccessor
+from pyshell.arg.checker.default import DefaultChecker
+from pyshell.arg.checker.list import ListArgChecker
+from pyshell.arg.decorator import shellMethod
+from pyshell.command.command import UniCommand
+from pyshell.daemon import CommandDaemon
+from pyshell.daemon import executeLine
+from pyshell.daemonclient import DaemonClient
+from pyshell.daemonclient import runClient
+from pyshell.system.manager.parent import ParentManager
+from pyshell.system.parameter.environment import EnvironmentParameter
+from pyshell.system.parameter.variable import VariableParameter
+from pyshell.system.setting.environment import EnvironmentGlobalSettings
+from pyshell.utils.constants import DAEMON_STATUS_FAILURE
+from pyshell.utils.constants import DAEMON_STATUS_SUCCESS
+from pyshell.utils.constants import ENVIRONMENT_LEVEL_TRIES_KEY
+from pyshell.utils.exception import DefaultPyshellException
+from pyshell.utils.printing import printShell
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+
+@shellMethod(args=ListArgChecker(DefaultChecker.getArg()))
+def say(args):
+    printShell(" ".join(args))
+    return args
+
+
+@shellMethod(value=DefaultChecker.getString(),
+             parameters=DefaultAccessor.getContainer())
+def setLocal(value, parameters):
+    parameters.getVariableManager().setParameter("local",
+                                                 VariableParameter(value),
+                                                 local_param=True)
+
+
+@shellMethod(parameters=DefaultAccessor.getContainer())
+def getLocal(parameters):
+    param = parameters.getVariableManager().getParameter("local")
+    if param is None:
+        return ("unset",)
+
+    return tuple(param.getValue())
+
+
+class TestDaemon(object):
+
+    def setup_method(self, method):
+        self.params = ParentManager()
+
+        mltries = multiLevelTries()
+        mltries.insert(("say",), UniCommand(say))
+        mltries.insert(("local", "set",), UniCommand(setLocal))
+        mltries.insert(("local", "get",), UniCommand(getLocal))
+
+        param = self.params.getEnvironmentManager().setParameter(
+            ENVIRONMENT_LEVEL_TRIES_KEY,
+            EnvironmentParameter(
+                value=mltries,
+                settings=EnvironmentGlobalSettings(
+                    checker=DefaultChecker.getArg())),
+            local_param=False)
+        param.settings.setTransient(True)
+
+        self.daemon = None
+        self.thread = None
+
+    def teardown_method(self, method):
+        if self.daemon is not None:
+            self.daemon.shutdown()
+            self.daemon.server_close()
+            self.thread.join(4)
+
+    def _startDaemon(self, socket_path):
+        self.daemon = CommandDaemon(socket_path, self.params)
+        self.thread = threading.Thread(target=self.daemon.serve_forever,
+                                       args=(0.05,))
+        self.thread.start()
+
+    def test_executeLine(self, capsys):
+        answer = executeLine("say hello world", self.params)
+        out, err = capsys.readouterr()
+
+        assert out == ""
+        assert answer["status"] == DAEMON_STATUS_SUCCESS
+        assert [line.strip() for line in answer["output"]] == ["hello world"]
+        assert answer["result"] == [["hello", "world"]]
+        assert answer["error"] is None
+
+    def test_executeLineFailure(self, capsys):
+        answer = executeLine("plop", self.params)
+        out, err = capsys.readouterr()
+
+        assert out == ""
+        assert answer["status"] == DAEMON_STATUS_FAILURE
+        assert answer["result"] is None
+        assert "plop" in answer["error"]
+        assert len(answer["output"]) == 1
+
+    def test_executeEmptyLine(self):
+        answer = executeLine("", self.params)
+        assert answer == {"status": DAEMON_STATUS_SUCCESS,
+                          "output": [],
+                          "result": None,
+                          "error": None}
+
+    def test_roundTrip(self, tmpdir):
+        socket_path = str(tmpdir.join("daemon.sock"))
+        self._startDaemon(socket_path)
+
+        with DaemonClient(socket_path) as client:
+            answer = client.execute("say a b")
+            assert answer["status"] == DAEMON_STATUS_SUCCESS
+            assert answer["result"] == [["a", "b"]]
+
+            answer = client.execute("plop")
+            assert answer["status"] == DAEMON_STATUS_FAILURE
+
+    def test_isolatedConnections(self, tmpdir):
+        socket_path = str(tmpdir.join("daemon.sock"))
+        self._startDaemon(socket_path)
+
+        with DaemonClient(socket_path) as first:
+            first.execute("local set first")
+            assert first.execute("local get")["result"] == [["first"]]
+
+            with DaemonClient(socket_path) as second:
+                assert second.execute("local get")["result"] == [["unset"]]
+
+        # the local scope is flushed at the end of the connection
+        with DaemonClient(socket_path) as third:
+            assert third.execute("local get")["result"] == [["unset"]]
+
+    def test_newLineRefused(self, tmpdir):
+        socket_path = str(tmpdir.join("daemon.sock"))
+        self._startDaemon(socket_path)
+
+        with DaemonClient(socket_path) as client:
+            with pytest.raises(DefaultPyshellException):
+                client.execute("say a\nsay b")
+
+    def test_runClient(self, tmpdir):
+        socket_path = str(tmpdir.join("daemon.sock"))
+        self._startDaemon(socket_path)
+
+        out = StringIO()
+        assert runClient(socket_path, ["say a\n", "\n", "say b\n"], out) == \
+            DAEMON_STATUS_SUCCESS
+        assert [line.strip() for line in out.getvalue().splitlines()] == \
+            ["a", "b"]
+
+        out = StringIO()
+        assert runClient(socket_path, ["plop", "say a"], out) == \
+            DAEMON_STATUS_FAILURE
+
+    def test_socketRemovedOnClose(self, tmpdir):
+        socket_path = str(tmpdir.join("daemon.sock"))
+        self._startDaemon(socket_path)
+        assert os.path.exists(socket_path)
+
+        self.daemon.shutdown()
+        self.daemon.server_close()
+        self.thread.join(4)
+        self.daemon = None
+        assert not os.path.exists(socket_path)
+
+    def test_alreadyListening(self, tmpdir):
+        socket_path = str(tmpdir.join("daemon.sock"))
+        self._startDaemon(socket_path)
+
+        with pytest.raises(DefaultPyshellException):
+            CommandDaemon(socket_path, self.params)
+
+    def test_staleSocket(self, tmpdir):
+        socket_path = str(tmpdir.join("daemon.sock"))
+        stale = CommandDaemon(socket_path, self.params)
+        stale.socket.close()
+
+        self._startDaemon(socket_path)
+        with DaemonClient(socket_path) as client:
+            assert client.execute("say a")["status"] == DAEMON_STATUS_SUCCESS
+
+    def test_notASocket(self, tmpdir):
+        path = tmpdir.join("file")
+        path.write("plop")
+
+        with pytest.raises(DefaultPyshellException):
+            CommandDaemon(str(path), self.params)
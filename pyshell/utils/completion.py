@@ -0,0 +1,147 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2015  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+
+from tries.exception import pathNotExistsTriesException
+
+from pyshell.utils.parsing import Parser
+
+
+def computeCandidates(line, mltries):
+    "return the list of the possible completions of the line"
+
+    parser = Parser(line)
+    parser.parse()
+
+    # # special case, empty line # #
+    # only print root tokens
+    if len(parser) == 0:
+        dic = mltries.buildDictionnary((), True, True, False)
+
+        candidates = {}
+        for k in dic.keys():
+            candidates[k[0]] = None
+
+        return list(candidates.keys())
+
+    fullline = parser[-1][0]
+
+    # # manage ambiguity # #
+    advanced_result = mltries.advancedSearch(fullline, False)
+    if advanced_result.isAmbiguous():
+        token_index = len(advanced_result.existingPath) - 1
+
+        if token_index != (len(fullline)-1):
+            return []   # ambiguity on an inner level
+
+        tries = advanced_result.existingPath[token_index][1].localTries
+        keylist = tries.getKeyList(fullline[token_index])
+
+        keys = []
+        for key in keylist:
+            tmp = list(fullline[:])
+            tmp.append(key)
+            keys.append(tmp)
+    else:
+        try:
+            dic = mltries.buildDictionnary(fullline, True, True, False)
+        except pathNotExistsTriesException:
+            return []
+
+        keys = dic.keys()
+
+    # build final result
+    final_keys = []
+    for k in keys:
+
+        # special case to complete the last token if needed
+        if len(k) >= len(fullline) and \
+           len(k[len(fullline)-1]) > len(fullline[-1]):
+            toappend = k[len(fullline)-1]
+
+            if len(k) > len(fullline):
+                toappend += " "
+
+            final_keys.append(toappend)
+            break
+
+        # normal case, the last token on the line is complete,
+        # only add its child tokens
+        final_keys.append(" ".join(k[len(fullline):]))
+
+    # if no other choice than the current value, return the
+    # current value
+    if "" in final_keys and len(final_keys) == 1:
+        return [fullline[-1]]
+
+    return final_keys
+
+
+class CompletionEngine(object):
+    """
+    readline calls the completer once per candidate index, the candidates
+    are computed on the first call for a (line, cursor) state then served
+    from the cache.  The cache is invalidated when the command registry
+    changes, registries without generation number are never cached.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.state = None
+        self.candidates = ()
+        self.hits = 0
+        self.misses = 0
+
+    def complete(self, line, cursor, mltries, index):
+        if hasattr(mltries, "getGeneration"):
+            state = (line, cursor, mltries, mltries.getGeneration(),)
+        else:
+            state = None
+
+        with self.lock:
+            if state is not None and state == self.state:
+                self.hits += 1
+                candidates = self.candidates
+            else:
+                self.misses += 1
+                candidates = None
+
+        if candidates is None:
+            candidates = tuple(computeCandidates(line, mltries))
+
+            with self.lock:
+                self.state = state
+                self.candidates = candidates
+
+        if index < len(candidates):
+            return candidates[index]
+
+        return None
+
+    def clear(self):
+        with self.lock:
+            self.state = None
+            self.candidates = ()
+            self.hits = 0
+            self.misses = 0
+
+    def getStatistics(self):
+        "return the hit and the miss counters"
+        with self.lock:
+            return self.hits, self.misses
@@ -45,6 +45,10 @@ ENVIRONMENT_ATTRIBUTE_NAME = "environment"
 ENVIRONMENT_CONFIG_DIRECTORY_KEY = MAIN_CATEGORY+".configDirectory"
 DEFAULT_CONFIG_DIRECTORY = os.path.join(os.path.expanduser("~"), ".pyshell")
 
+# directory holding the compiled scripts, next to the scripts themselves
+SCRIPT_CACHE_DIRECTORY_NAME = "__pyshellcache__"
+SCRIPT_CACHE_FORMAT = 1
+
 ENVIRONMENT_PROMPT_KEY = SHELL_CATEGORY+".prompt"
 ENVIRONMENT_PROMPT_DEFAULT = "pyshell:>"
 
@@ -62,6 +66,26 @@ ENVIRONMENT_HISTORY_FILE_NAME_VALUE = os.path.join("pyshell_history")
 ENVIRONMENT_USE_HISTORY_KEY = SHELL_CATEGORY+".useHistory"
 ENVIRONMENT_USE_HISTORY_VALUE = True
 
+ENVIRONMENT_INJECTION_LIMIT_KEY = MAIN_CATEGORY+".injectionLimit"
+ENVIRONMENT_INJECTION_LIMIT_DEFAULT = 65536
+
+ENVIRONMENT_POOL_SIZE_KEY = MAIN_CATEGORY+".poolSize"
+ENVIRONMENT_POOL_SIZE_DEFAULT = 4
+
+ENVIRONMENT_PARSER_CACHE_SIZE_KEY = MAIN_CATEGORY+".parserCacheSize"
+ENVIRONMENT_PARSER_CACHE_SIZE_DEFAULT = 256
+
+ENVIRONMENT_JOB_POOL_SIZE_KEY = MAIN_CATEGORY+".jobPoolSize"
+ENVIRONMENT_JOB_POOL_SIZE_DEFAULT = 8
+
+# maximal amount of background jobs waiting for a worker
+ENVIRONMENT_JOB_QUEUE_SIZE_KEY = MAIN_CATEGORY+".jobQueueSize"
+ENVIRONMENT_JOB_QUEUE_SIZE_DEFAULT = 256
+
+# time limit of a command line in seconds, 0 means no limit
+ENVIRONMENT_EXECUTION_TIMEOUT_KEY = MAIN_CATEGORY+".executionTimeout"
+ENVIRONMENT_EXECUTION_TIMEOUT_DEFAULT = 0
+
 ENVIRONMENT_ADDON_TO_LOAD_KEY = MAIN_CATEGORY+".addonToLoad"
 ENVIRONMENT_ADDON_TO_LOAD_DEFAULT = ("pyshell.addons.std",
                                      "pyshell.addons.parameter")
@@ -80,6 +104,10 @@ CONTEXT_COLORATION_LIGHT = "light"
 CONTEXT_COLORATION_DARK = "dark"
 CONTEXT_COLORATION_NONE = "none"
 
+CONTEXT_PROFILING_KEY = MAIN_CATEGORY+".profiling"
+CONTEXT_PROFILING_DISABLED = "disabled"
+CONTEXT_PROFILING_ENABLED = "enabled"
+
 # ## VARIABLE ## #
 VARIABLE_ATTRIBUTE_NAME = "variable"
 
@@ -115,3 +143,9 @@ ENABLE_ON_POST_PROCESS = "enable_on_post"
 # ## ADDON ## #
 ADDON_PREFIX = "pyshell.addons."
 ADDON_DIRECTORY = "./pyshell/addons/"
+
+# ## DAEMON ## #
+DAEMON_PROCESS_NAME = "__daemon__"
+DAEMON_ENCODING = "utf-8"
+DAEMON_STATUS_SUCCESS = 0
+DAEMON_STATUS_FAILURE = 1
@@ -17,6 +17,13 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import threading
+from collections import deque
+from collections import namedtuple
+
+try:
+    import asyncio
+except ImportError:
+    asyncio = None
 
 from pyshell.arg.exception import ArgException
 from pyshell.command.engine import EngineV3
@@ -24,26 +31,88 @@ from pyshell.command.exception import CommandException
 from pyshell.command.exception import EngineInterruptionException
 from pyshell.command.exception import ExecutionException
 from pyshell.command.exception import ExecutionInitException
+from pyshell.command.exception import ExecutionTimeoutException
+from pyshell.command.profiler import timer
 from pyshell.system.parameter.variable import VariableParameter
 from pyshell.utils.constants import CONTEXT_EXECUTION_KEY
 from pyshell.utils.constants import CONTEXT_EXECUTION_SHELL
 from pyshell.utils.constants import DEBUG_ENVIRONMENT_NAME
+from pyshell.utils.constants import ENVIRONMENT_EXECUTION_TIMEOUT_KEY
+from pyshell.utils.constants import ENVIRONMENT_JOB_POOL_SIZE_KEY
+from pyshell.utils.constants import ENVIRONMENT_JOB_QUEUE_SIZE_KEY
 from pyshell.utils.constants import ENVIRONMENT_LEVEL_TRIES_KEY
+from pyshell.utils.constants import ENVIRONMENT_PARSER_CACHE_SIZE_KEY
 from pyshell.utils.exception import CORE_ERROR
 from pyshell.utils.exception import CORE_WARNING
 from pyshell.utils.exception import DefaultPyshellException
 from pyshell.utils.exception import ListOfException
+from pyshell.utils.exception import USER_ERROR
+from pyshell.utils.jobs import JobManager
 from pyshell.utils.parsing import Parser
+from pyshell.utils.parsing import ParserCache
+from pyshell.utils.printing import Printer
 from pyshell.utils.printing import printException
 from pyshell.utils.solving import Solver
+from pyshell.utils.solving import SolverCache
 from pyshell.utils.string65 import isString
 
 # execute return engine and last_exception to the calling procedure
 #   engine to retrieve any output
 #   exception, to check granularity and eventually stop the execution
 
+_parser_cache = ParserCache()
+_solver_cache = SolverCache()
+_job_manager = JobManager()
+
+ExecutionResult = namedtuple("ExecutionResult",
+                             ("line", "exception", "engine", "output",))
+
+# deadline of the execution running in the current thread, a nested
+# execution (e.g. the lines of a procedure) can not go past it
+_execution_scope = threading.local()
+
+
+def getParserCache():
+    return _parser_cache
+
+
+def getSolverCache():
+    return _solver_cache
+
+
+def getJobManager():
+    return _job_manager
+
+
+def _getJobManager(parameter_container):
+    env = parameter_container.getEnvironmentManager()
+    parameters = env.getParameters((ENVIRONMENT_JOB_POOL_SIZE_KEY,
+                                    ENVIRONMENT_JOB_QUEUE_SIZE_KEY,),
+                                   perfect_match=True)
+
+    param = parameters[ENVIRONMENT_JOB_POOL_SIZE_KEY]
+    if param is not None and param.getValue() != _job_manager.getSize():
+        _job_manager.setSize(param.getValue())
+
+    param = parameters[ENVIRONMENT_JOB_QUEUE_SIZE_KEY]
+    if param is not None and param.getValue() != _job_manager.getQueueSize():
+        _job_manager.setQueueSize(param.getValue())
+
+    return _job_manager
+
+
+def _getParser(string, parameter_container):
+    env = parameter_container.getEnvironmentManager()
+    if env.hasParameter(ENVIRONMENT_PARSER_CACHE_SIZE_KEY):
+        size = env.getParameter(ENVIRONMENT_PARSER_CACHE_SIZE_KEY,
+                                perfect_match=True).getValue()
+        if size != _parser_cache.getSize():
+            _parser_cache.setSize(size)
+
+    return _parser_cache.getParser(string)
+
 
-def execute(string, parameter_container, process_name=None, process_arg=None):
+def _parse(string, parameter_container, process_arg):
     # add external parameters at the end of the command
     if hasattr(process_arg, "__iter__"):
         string += " " + ' '.join(str(x) for x in process_arg)
@@ -55,46 +124,413 @@ def execute(string, parameter_container, process_name=None, process_arg=None):
                                       type(process_arg)+"'",
                                       CORE_ERROR)
 
-    # # parsing # #
+    return _parseLine(string,
+                      lambda line: _getParser(line, parameter_container))
+
+
+def _parseLine(string, get_parser):
+    """
+    parse a command line or a Parser not yet parsed, get_parser(string)
+    returns the parser of a string line
+    """
+
     parser = None
     try:
-        # parsing
         if isinstance(string, Parser):
             parser = string
 
             if not parser.isParsed():
                 parser.parse()
         else:
-            parser = Parser(string)
-            parser.parse()
-
-        # no command to execute
-        if len(parser) == 0:
-            return None, None
+            parser = get_parser(string)
 
     except Exception as ex:
         printException(ex, "Fail to parse command: ")
         return ex, None
 
+    return None, parser
+
+
+def _submitJob(parser,
+               parameter_container,
+               process_name,
+               profiling,
+               timeout):
+    return _getJobManager(parameter_container).submit(
+        target=_executeJob,
+        command=parser.string,
+        name=process_name,
+        args=(parser, parameter_container, profiling, timeout,))
+
+
+def _setBackgroundJob(parser,
+                      parameter_container,
+                      process_name,
+                      profiling,
+                      timeout):
+    job = _submitJob(parser,
+                     parameter_container,
+                     process_name,
+                     profiling,
+                     timeout)
+    parameter_container.getVariableManager().setParameter(
+        "!",
+        VariableParameter(str(job.getId())),
+        local_param=True)
+
+
+def execute(string,
+            parameter_container,
+            process_name=None,
+            process_arg=None,
+            profiling=False,
+            timeout=None,
+            collect_results=False):
+    """
+    timeout is the time limit of the execution in seconds, 0 means no
+    limit, None means the limit set in the environment.  With
+    collect_results, the engine keeps the outputs of every data, see
+    EngineV3.getResults.
+    """
+
+    ex, parser = _parse(string, parameter_container, process_arg)
+
+    # parsing error or no command to execute
+    if ex is not None or len(parser) == 0:
+        return ex, None
+
     if parser.isToRunInBackground():
-        t = threading.Thread(
-            group=None,
-            target=_execute,
-            name=process_name,
-            args=(),
-            kwargs={'parser': parser,
-                    'parameter_container': parameter_container,
-                    'new_thread': True})
-        t.start()
-        parameter_container.getVariableManager().setParameter(
-            "!",
-            VariableParameter(str(t.ident)),
-            local_param=True)
-
-        # not possible to retrieve exception or engine, it is another thread
+        _setBackgroundJob(parser,
+                          parameter_container,
+                          process_name,
+                          profiling,
+                          timeout)
+
+        # not possible to retrieve exception or engine, it is another thread,
+        # they will be available in the job once finished
         return None, None
     else:
-        return _execute(parser, parameter_container)
+        return _execute(parser,
+                        parameter_container,
+                        profiling=profiling,
+                        timeout=timeout,
+                        collect_results=collect_results)
+
+
+def executeAsync(string,
+                 parameter_container,
+                 loop,
+                 process_name=None,
+                 process_arg=None,
+                 profiling=False,
+                 timeout=None):
+    """
+    asyncio version of execute, return a future of loop resolved with the
+    tuple (exception, engine).  The command line is parsed in the calling
+    thread then executed in the bounded job pool, the event loop is never
+    blocked by the commands.  At most one execution per worker of the pool
+    is in flight, the others wait for a free slot without filling the job
+    queue.  Once as many executions as the job queue size are waiting, a
+    new one is resolved at once with the error.  Cancelling the future
+    kills the job: a waiting or pending job is dropped, a running engine is
+    stopped after its current process.
+    """
+
+    if asyncio is None:
+        raise DefaultPyshellException("(executing) executeAsync, asyncio is "
+                                      "not available with this version of "
+                                      "python",
+                                      CORE_ERROR)
+
+    future = loop.create_future()
+    ex, parser = _parse(string, parameter_container, process_arg)
+
+    # parsing error or no command to execute
+    if ex is not None or len(parser) == 0:
+        future.set_result((ex, None,))
+        return future
+
+    # same behaviour as execute, the background job is not awaited
+    if parser.isToRunInBackground():
+        _setBackgroundJob(parser,
+                          parameter_container,
+                          process_name,
+                          profiling,
+                          timeout)
+        future.set_result((None, None,))
+        return future
+
+    execution = _AsyncExecution(loop,
+                                future,
+                                parser,
+                                parameter_container,
+                                process_name,
+                                profiling,
+                                timeout)
+    manager = _getJobManager(parameter_container)
+
+    try:
+        _async_slots.acquire(manager.getSize(),
+                             manager.getQueueSize(),
+                             execution)
+    except DefaultPyshellException as ex:
+        future.set_result((ex, None,))
+        return future
+
+    future.add_done_callback(execution.onFutureDone)
+    return future
+
+
+class _AsyncSlots(object):
+    """
+    bound the asynchronous executions in flight, an execution beyond the
+    limit waits until a running execution releases its slot.  The amount
+    of waiting executions is bounded too, a new execution is rejected once
+    the waiting list is full.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.limit = 1
+        self.waiting = deque()
+
+    def acquire(self, limit, waiting_limit, execution):
+        with self.lock:
+            self.limit = limit
+            if self.running >= limit:
+                if len(self.waiting) >= waiting_limit:
+                    excmsg = ("(executing) executeAsync, too many waiting "
+                              "executions, %s execution(s) are already "
+                              "waiting for a slot")
+                    excmsg %= str(len(self.waiting))
+                    raise DefaultPyshellException(excmsg, USER_ERROR)
+
+                self.waiting.append(execution)
+                return
+
+            self.running += 1
+
+        self._handOver(execution)
+
+    def release(self):
+        self._handOver(None)
+
+    def discard(self, execution):
+        "remove a waiting execution, e.g. a cancelled one"
+        with self.lock:
+            try:
+                self.waiting.remove(execution)
+            except ValueError:
+                pass  # already started
+
+    def _handOver(self, execution):
+        # the caller owns a slot, it is given to the execution then to the
+        # next waiting executions while they do not keep it.  The loop never
+        # calls itself back, whatever the amount of cancelled executions.
+        while execution is None or not execution.start():
+            with self.lock:
+                execution = None
+                if self.running <= self.limit:
+                    while len(self.waiting) > 0 and execution is None:
+                        execution = self.waiting.popleft()
+                        if execution.isCancelled():
+                            execution = None
+
+                if execution is None:
+                    self.running -= 1
+                    return
+
+
+_async_slots = _AsyncSlots()
+
+
+class _AsyncExecution(object):
+    def __init__(self,
+                 loop,
+                 future,
+                 parser,
+                 parameter_container,
+                 process_name,
+                 profiling,
+                 timeout):
+        self.loop = loop
+        self.future = future
+        self.parser = parser
+        self.parameter_container = parameter_container
+        self.process_name = process_name
+        self.profiling = profiling
+        self.timeout = timeout
+        self.job = None
+
+    def isCancelled(self):
+        return self.future.done()
+
+    def start(self):
+        "submit the job, return False if the slot is not used"
+
+        # cancelled while waiting for a slot
+        if self.future.done():
+            return False
+
+        try:
+            self.job = _submitJob(self.parser,
+                                  self.parameter_container,
+                                  self.process_name,
+                                  self.profiling,
+                                  self.timeout)
+        except DefaultPyshellException as ex:
+            try:
+                self.loop.call_soon_threadsafe(_setFutureResult,
+                                               self.future,
+                                               ex,
+                                               None)
+            except RuntimeError:
+                pass  # the loop is closed, nobody waits for the result
+
+            return False
+
+        self.job.addDoneCallback(self.onJobDone)
+
+        # cancelled while the job was submitted
+        if self.future.cancelled():
+            _job_manager.kill(self.job.getId(), "execution cancelled")
+
+        return True
+
+    def onJobDone(self, job):
+        # the future is resolved before the slot is handed over, the slot
+        # is released even if the loop is already closed
+        try:
+            self.loop.call_soon_threadsafe(_setFutureResult,
+                                           self.future,
+                                           job.getException(),
+                                           job.getEngine())
+        finally:
+            _async_slots.release()
+
+    def onFutureDone(self, future):
+        if not future.cancelled():
+            return
+
+        if self.job is None:
+            _async_slots.discard(self)
+        else:
+            _job_manager.kill(self.job.getId(), "execution cancelled")
+
+
+def _setFutureResult(future, exception, engine):
+    if not future.done():
+        future.set_result((exception, engine,))
+
+
+def executeMany(lines,
+                parameter_container,
+                stop_on_error=False,
+                profiling=False,
+                timeout=None):
+    """
+    execute a list of command lines and return a list of ExecutionResult,
+    the output of each line is captured instead of printed.  The parameters
+    shared by the lines are retrieved once for the whole batch.  With
+    stop_on_error, the lines after the first failing one are not executed.
+    The timeout applies to each line.
+    """
+
+    env = parameter_container.getEnvironmentManager()
+    parameters = env.getParameters((ENVIRONMENT_LEVEL_TRIES_KEY,
+                                    ENVIRONMENT_PARSER_CACHE_SIZE_KEY,
+                                    ENVIRONMENT_EXECUTION_TIMEOUT_KEY,),
+                                   perfect_match=True)
+
+    mltries_param = parameters[ENVIRONMENT_LEVEL_TRIES_KEY]
+    if mltries_param is None:
+        raise DefaultPyshellException("(executing) executeMany, no "
+                                      "levelTries defined",
+                                      CORE_ERROR)
+
+    mltries = mltries_param.getValue()
+
+    if timeout is None:
+        timeout = _getTimeout(parameters)
+
+    size_param = parameters[ENVIRONMENT_PARSER_CACHE_SIZE_KEY]
+    if size_param is not None and size_param.getValue() != \
+       _parser_cache.getSize():
+        _parser_cache.setSize(size_param.getValue())
+
+    # the output of an enclosing capture, e.g. a daemon connection, is
+    # restored at the end of the batch
+    printer = Printer.getInstance()
+    previous_lines = None
+    if printer.isCapturing():
+        previous_lines = printer.stopCapture()
+
+    results = []
+    try:
+        for line in lines:
+            printer.startCapture()
+            try:
+                ex, engine = _executeLine(line,
+                                          parameter_container,
+                                          mltries,
+                                          profiling,
+                                          timeout)
+            finally:
+                output = printer.stopCapture()
+
+            results.append(ExecutionResult(line, ex, engine, output))
+
+            if stop_on_error and ex is not None:
+                break
+    finally:
+        if previous_lines is not None:
+            printer.startCapture(previous_lines)
+
+    return results
+
+
+def _executeLine(line, parameter_container, mltries, profiling, timeout):
+    # the parser cache size is already set by executeMany
+    ex, parser = _parseLine(line, _parser_cache.getParser)
+
+    if ex is not None or len(parser) == 0:
+        return ex, None
+
+    if parser.isToRunInBackground():
+        _setBackgroundJob(parser,
+                          parameter_container,
+                          None,
+                          profiling,
+                          timeout)
+        return None, None
+
+    return _execute(parser,
+                    parameter_container,
+                    profiling=profiling,
+                    mltries=mltries,
+                    timeout=timeout)
+
+
+def _getTimeout(parameters):
+    timeout_param = parameters[ENVIRONMENT_EXECUTION_TIMEOUT_KEY]
+    if timeout_param is None:
+        return 0
+
+    return timeout_param.getValue()
+
+
+def _getDeadline(timeout):
+    enclosing = getattr(_execution_scope, "deadline", None)
+
+    if timeout <= 0:
+        return enclosing
+
+    deadline = timer() + timeout
+    if enclosing is not None and enclosing < deadline:
+        return enclosing
+
+    return deadline
 
 
 def _generateSuffix(parameter_container, command_name_list=None, engine=None):
@@ -127,7 +563,7 @@ def _generateSuffix(parameter_container, command_name_list=None, engine=None):
         if (command_name_list is not None and
            engine is not None and
            not engine.stack.isEmpty()):
-            command_index = engine.stack.cmdIndexOnTop()
+            command_index = engine.stack.top().cmdIndex()
             message += (", command='%s'" %
                         " ".join(command_name_list[command_index]))
 
@@ -137,7 +573,23 @@ def _generateSuffix(parameter_container, command_name_list=None, engine=None):
     return None
 
 
-def _execute(parser, parameter_container, new_thread=False):
+def _executeJob(job, parser, parameter_container, profiling, timeout):
+    return _execute(parser,
+                    parameter_container,
+                    new_thread=True,
+                    profiling=profiling,
+                    job=job,
+                    timeout=timeout)
+
+
+def _execute(parser,
+             parameter_container,
+             new_thread=False,
+             profiling=False,
+             job=None,
+             mltries=None,
+             timeout=None,
+             collect_results=False):
 
     # # solving then execute # #
     ex = None
@@ -145,40 +597,63 @@ def _execute(parser, parameter_container, new_thread=False):
     command_name_list = None
     try:
         # solve command, variable, and dashed parameters
-        env = parameter_container.getEnvironmentManager()
-        mltries_param = env.getParameter(ENVIRONMENT_LEVEL_TRIES_KEY)
+        if mltries is None or timeout is None:
+            env = parameter_container.getEnvironmentManager()
+            parameters = env.getParameters(
+                (ENVIRONMENT_LEVEL_TRIES_KEY,
+                 ENVIRONMENT_EXECUTION_TIMEOUT_KEY,),
+                perfect_match=True)
 
-        if mltries_param is None:
-            raise DefaultPyshellException("Fail to execute the command,"
-                                          " no levelTries defined",
-                                          CORE_ERROR)
+            if timeout is None:
+                timeout = _getTimeout(parameters)
+
+        if mltries is None:
+            mltries_param = parameters[ENVIRONMENT_LEVEL_TRIES_KEY]
+
+            if mltries_param is None:
+                raise DefaultPyshellException("Fail to execute the command,"
+                                              " no levelTries defined",
+                                              CORE_ERROR)
+
+            mltries = mltries_param.getValue()
 
-        mltries = mltries_param.getValue()
         variables = parameter_container.getVariableManager()
         rawCommandList, rawArgList, mappedArgs, command_name_list = \
-            Solver().solve(parser, mltries, variables)
-        # clone command/procedure to manage concurrency state
-        new_raw_command_list = []
+            Solver(_solver_cache).solve(parser, mltries, variables)
+        # the registered commands are shared between the executions, the
+        # engine stores its own execution state for each of them
         for i in range(0, len(rawCommandList)):
-            c = rawCommandList[i].clone()
-
             # check if there is at least one empty command, if yes, raise
-            if len(c) == 0:
+            if len(rawCommandList[i]) == 0:
                 raise DefaultPyshellException("Command '%s' is empty, not "
                                               "possible to execute" %
                                               " ".join(command_name_list[i]),
                                               CORE_WARNING)
 
-            new_raw_command_list.append(c)
-
         # prepare an engine
-        engine = EngineV3(new_raw_command_list,
+        engine = EngineV3(rawCommandList,
                           rawArgList,
                           mappedArgs,
                           parameter_container)
 
+        if profiling:
+            engine.setProfilingEnabled(True)
+
+        if collect_results:
+            engine.setResultCollectingEnabled(True)
+
+        if job is not None:
+            job.setEngine(engine)
+
         # execute
-        engine.execute()
+        deadline = _getDeadline(timeout)
+        engine.setDeadline(deadline)
+        enclosing_deadline = getattr(_execution_scope, "deadline", None)
+        _execution_scope.deadline = deadline
+        try:
+            engine.execute()
+        finally:
+            _execution_scope.deadline = enclosing_deadline
 
     except ExecutionInitException as eie:
         printException(eie,
@@ -204,6 +679,14 @@ def _execute(parser, parameter_container, new_thread=False):
                            command_name_list=command_name_list,
                            engine=engine))
         ex = ce
+    except ExecutionTimeoutException as ete:
+        printException(ete,
+                       prefix="Execution timeout: ",
+                       suffix=_generateSuffix(
+                           parameter_container,
+                           command_name_list=command_name_list,
+                           engine=engine))
+        ex = ete
     except EngineInterruptionException as enie:
         suffix = _generateSuffix(parameter_container,
                                  command_name_list=command_name_list,
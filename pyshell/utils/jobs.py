@@ -0,0 +1,375 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2015  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+import time
+from collections import deque
+
+from pyshell.utils.constants import ENVIRONMENT_JOB_POOL_SIZE_DEFAULT
+from pyshell.utils.constants import ENVIRONMENT_JOB_QUEUE_SIZE_DEFAULT
+from pyshell.utils.exception import CORE_ERROR
+from pyshell.utils.exception import DefaultPyshellException
+from pyshell.utils.exception import USER_ERROR
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    from pyshell.utils.ordereddict import OrderedDict
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_KILLED = "killed"
+
+# finished jobs kept in the job table, the oldest are dropped first
+JOB_HISTORY_SIZE = 128
+
+
+class Job(object):
+    def __init__(self, job_id, command, name=None):
+        self.id = job_id
+        self.command = command
+        self.name = name
+        self.status = JOB_PENDING
+        self.exception = None
+        self.engine = None
+        self.killReason = None
+        self.submitTime = time.time()
+        self.startTime = None
+        self.endTime = None
+        self.lock = threading.Lock()
+        self.event = threading.Event()
+        self.callbacks = []
+
+    def getId(self):
+        return self.id
+
+    def getCommand(self):
+        return self.command
+
+    def getName(self):
+        return self.name
+
+    def getStatus(self):
+        return self.status
+
+    def getException(self):
+        return self.exception
+
+    def getEngine(self):
+        return self.engine
+
+    def getDuration(self):
+        "return the running time of the job in seconds or None if pending"
+        if self.startTime is None:
+            return None
+
+        if self.endTime is None:
+            return time.time() - self.startTime
+
+        return self.endTime - self.startTime
+
+    def isFinished(self):
+        return self.event.is_set()
+
+    def wait(self, timeout=None):
+        "wait the end of the job, return True if the job is finished"
+        self.event.wait(timeout)
+        return self.event.is_set()
+
+    def addDoneCallback(self, callback):
+        "callback(job) is called once the job is finished"
+        with self.lock:
+            if not self.event.is_set():
+                self.callbacks.append(callback)
+                return
+
+        callback(self)
+
+    def setEngine(self, engine):
+        with self.lock:
+            self.engine = engine
+            if self.killReason is not None:
+                engine.requestStop(self.killReason)
+
+    def kill(self, reason):
+        with self.lock:
+            self.killReason = reason
+            if self.engine is not None:
+                self.engine.requestStop(reason)
+
+    def _start(self):
+        self.status = JOB_RUNNING
+        self.startTime = time.time()
+
+    def _finish(self, exception, engine, status=None):
+        self.exception = exception
+        if engine is not None:
+            self.engine = engine
+
+        if status is None:
+            if self.killReason is not None:
+                status = JOB_KILLED
+            elif exception is not None:
+                status = JOB_FAILED
+            else:
+                status = JOB_DONE
+
+        if self.startTime is not None:
+            self.endTime = time.time()
+
+        self.status = status
+
+        # the callbacks are returned to be called outside of the manager
+        # lock, they are allowed to use the manager
+        with self.lock:
+            self.event.set()
+            callbacks = self.callbacks
+            self.callbacks = []
+
+        return callbacks
+
+    def _runCallbacks(self, callbacks):
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception:
+                # a failing callback must not stop the worker, e.g. the
+                # event loop waiting for this job has been closed
+                pass
+
+
+class JobManager(object):
+    """
+    Job table backed by a bounded pool of worker threads.  The workers are
+    started on demand until the pool size is reached, then the submitted
+    jobs wait in a queue for a free worker.  A job submitted while the
+    queue is full is rejected.
+    """
+
+    def __init__(self, size=ENVIRONMENT_JOB_POOL_SIZE_DEFAULT,
+                 history=JOB_HISTORY_SIZE,
+                 queue_size=ENVIRONMENT_JOB_QUEUE_SIZE_DEFAULT):
+        self._checkSize(size, "setSize")
+        self._checkSize(queue_size, "setQueueSize")
+        self.size = size
+        self.queueSize = queue_size
+        self.history = history
+        self.lock = threading.Lock()
+        self.condition = threading.Condition(self.lock)
+        self.queue = deque()
+        self.jobs = OrderedDict()
+        self.workers = 0
+        self.idle = 0
+        self.nextId = 1
+
+        # the job executed by the current worker thread
+        self.local = threading.local()
+
+    def _checkSize(self, size, meth_name):
+        if type(size) is not int or size < 1:
+            raise DefaultPyshellException("(JobManager) "+meth_name+", size "
+                                          "must be an integer bigger or "
+                                          "equal to 1, got '"+str(size)+"'",
+                                          CORE_ERROR)
+
+    def setSize(self, size):
+        self._checkSize(size, "setSize")
+        with self.condition:
+            self.size = size
+            self._startWorkers()
+
+            # the workers over the limit will stop on wake up
+            self.condition.notify_all()
+
+    def getSize(self):
+        return self.size
+
+    def setQueueSize(self, size):
+        "the jobs already in the queue are kept if the queue is shrunk"
+        self._checkSize(size, "setQueueSize")
+        with self.condition:
+            self.queueSize = size
+
+    def getQueueSize(self):
+        return self.queueSize
+
+    def getCurrentJob(self):
+        "return the job executed by the calling thread, None if any"
+        return getattr(self.local, "job", None)
+
+    def _startWorkers(self):
+        # must be called with the lock
+        while (len(self.queue) > self.idle and
+               self.workers < self.size):
+            self.workers += 1
+            worker = threading.Thread(target=self._work,
+                                      name="pyshell-job-worker")
+            worker.daemon = True
+            worker.start()
+
+    def _work(self):
+        thread = threading.current_thread()
+        worker_name = thread.name
+
+        while True:
+            with self.condition:
+                while len(self.queue) == 0 and self.workers <= self.size:
+                    self.idle += 1
+                    self.condition.wait()
+                    self.idle -= 1
+
+                if self.workers > self.size:
+                    self.workers -= 1
+                    return
+
+                job, target, args = self.queue.popleft()
+                job._start()
+
+            if job.getName() is not None:
+                thread.name = job.getName()
+
+            self.local.job = job
+            try:
+                exception, engine = target(job, *args)
+            except Exception as ex:
+                exception, engine = ex, None
+            finally:
+                self.local.job = None
+                thread.name = worker_name
+
+            with self.condition:
+                callbacks = job._finish(exception, engine)
+                self._trimHistory()
+
+            job._runCallbacks(callbacks)
+
+    def _trimHistory(self):
+        # must be called with the lock
+        finished = [job_id
+                    for job_id, job in self.jobs.items()
+                    if job.isFinished()]
+
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self.jobs[job_id]
+
+    def submit(self, target, command, name=None, args=()):
+        """
+        queue the execution of target(job, *args) in the pool, target must
+        return a tuple (exception, engine)
+        """
+
+        with self.condition:
+            if len(self.queue) >= self.queueSize:
+                excmsg = ("(JobManager) submit, the job queue is full, %s "
+                          "job(s) are waiting for a worker")
+                excmsg %= str(len(self.queue))
+                raise DefaultPyshellException(excmsg, USER_ERROR)
+
+            job = Job(self.nextId, command, name)
+            self.nextId += 1
+            self.jobs[job.getId()] = job
+            self.queue.append((job, target, args,))
+            self._startWorkers()
+            self.condition.notify()
+
+        return job
+
+    def getJob(self, job_id):
+        with self.lock:
+            if job_id not in self.jobs:
+                excmsg = "(JobManager) getJob, unknown job id '%s'"
+                excmsg %= str(job_id)
+                raise DefaultPyshellException(excmsg, USER_ERROR)
+
+            return self.jobs[job_id]
+
+    def getJobs(self):
+        with self.lock:
+            return list(self.jobs.values())
+
+    def kill(self, job_id, reason=None):
+        """
+        a pending job is removed from the queue, a running job is asked
+        to stop after the current process.  Return False if the job was
+        already finished.
+        """
+
+        if reason is None:
+            reason = "job killed"
+
+        job = self.getJob(job_id)
+
+        with self.condition:
+            if job.isFinished():
+                return False
+
+            for item in self.queue:
+                if item[0] is job:
+                    self.queue.remove(item)
+                    callbacks = job._finish(None, None, JOB_KILLED)
+                    self._trimHistory()
+                    break
+            else:
+                callbacks = None
+
+        if callbacks is None:
+            job.kill(reason)
+        else:
+            job._runCallbacks(callbacks)
+
+        return True
+
+    def wait(self, job_ids=None, timeout=None):
+        """
+        wait the end of the jobs, or of every job in the table if no id
+        is given.  A job never waits for itself.  Return the list of the
+        jobs still running.
+        """
+
+        current = self.getCurrentJob()
+
+        if job_ids is None:
+            jobs = [job for job in self.getJobs() if job is not current]
+        else:
+            jobs = [self.getJob(job_id) for job_id in job_ids]
+
+            if current is not None and current in jobs:
+                excmsg = ("(JobManager) wait, the job %s can not wait for "
+                          "itself")
+                excmsg %= str(current.getId())
+                raise DefaultPyshellException(excmsg, USER_ERROR)
+
+        if timeout is not None:
+            deadline = time.time() + timeout
+
+        for job in jobs:
+            if timeout is None:
+                job.wait()
+            else:
+                job.wait(max(0, deadline - time.time()))
+
+        return [job for job in jobs if not job.isFinished()]
+
+    def clear(self):
+        "remove the finished jobs from the table"
+        with self.lock:
+            for job_id, job in list(self.jobs.items()):
+                if job.isFinished():
+                    del self.jobs[job_id]
@@ -16,10 +16,20 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import re
+import threading
+
+from pyshell.utils.constants import ENVIRONMENT_PARSER_CACHE_SIZE_DEFAULT
+from pyshell.utils.exception import CORE_ERROR
 from pyshell.utils.exception import DefaultPyshellException
 from pyshell.utils.exception import PARSE_ERROR
 from pyshell.utils.string65 import isString
 
+try:
+    from collections import OrderedDict
+except ImportError:
+    from pyshell.utils.ordereddict import OrderedDict
+
 # BNF GRAMMAR OF A COMMAND
 #
 # # RULE 1 ## <commands>  ::= <command> <threading> <EOL> | <command> "|"
@@ -29,6 +39,22 @@ from pyshell.utils.string65 import isString
 # # RULE 4 ## <token>     ::= <text> | "$" <text> | "-" <text>
 #
 
+# scanners used by the tokenizer, every character of the input is covered
+# by one of the alternatives so a match can never fail
+_UNWRAPPED_SCANNER = re.compile(r'(?P<separator>[ \t\n\r]+)'
+                                r'|(?P<pipe>\|)'
+                                r'|(?P<text>[^ \t\n\r|"\\]+)'
+                                r'(?P<end>[ \t\n\r]*)'
+                                r'|(?P<quote>")'
+                                r'|(?P<escape>\\[\s\S]?)')
+
+_WRAPPED_SCANNER = re.compile(r'(?P<text>[^"\\]+)'
+                              r'|(?P<quote>")'
+                              r'|(?P<escape>\\[\s\S]?)')
+
+# a token with one of these characters must be wrapped to stay one token
+_TO_WRAP = re.compile(r'[ \t\n\r|&]')
+
 
 class Parser(list):
     """
@@ -124,7 +150,63 @@ class Parser(list):
         else:
             self.currentToken += char
 
-    def parse(self):
+    def _scan(self):
+        string = self.string
+        length = len(string)
+        position = 0
+
+        while position < length:
+            if self.wrapped:
+                match = _WRAPPED_SCANNER.match(string, position)
+            else:
+                match = _UNWRAPPED_SCANNER.match(string, position)
+
+            position = match.end()
+            kind = match.lastgroup
+
+            if kind == "separator":
+                self._pushTokenInCommand()
+                continue
+
+            if kind == "pipe":
+                self._pushTokenInCommand()
+                self._pushCommandInList()
+                continue
+
+            token = self.currentToken
+            if token is None:
+                token = ""
+
+            if kind == "quote":
+                self.wrapped = not self.wrapped
+            elif kind == "escape":
+                token += match.group()[1:]
+            else:
+                text = match.group("text")
+                if len(token) == 0:
+                    if text[0] == '$':
+                        self.argSpotted.append(len(self.currentCommand))
+                    elif text[0] == '-':
+                        self.paramSpotted.append(len(self.currentCommand))
+
+                # "end" only exists in the unwrapped scanner
+                if kind == "end":
+                    index = text.rfind('&')
+                    if index > -1:
+                        self.lastBackground = (len(self),
+                                               len(self.currentCommand),
+                                               len(token) + index)
+
+                    if len(match.group("end")) > 0:
+                        self.currentToken = token + text
+                        self._pushTokenInCommand()
+                        continue
+
+                token += text
+
+            self.currentToken = token
+
+    def parse(self, by_character=False):
         del self[:]
         self.escapeChar = False
         self.runInBackground = False
@@ -134,9 +216,13 @@ class Parser(list):
         if len(self.string) == 0:
             return
 
-        for i in range(0, len(self.string)):
-            char = self.string[i]
-            self._parse(char)
+        if by_character:
+            # reference implementation, one character at a time
+            for i in range(0, len(self.string)):
+                char = self.string[i]
+                self._parse(char)
+        else:
+            self._scan()
 
         # push intermediate data
         self._pushTokenInCommand()
@@ -162,6 +248,13 @@ class Parser(list):
 
         self.parsed = True
 
+    def load(self, commands, run_in_background):
+        "fill the parser with the content of an already parsed string"
+        del self[:]
+        self.extend(commands)
+        self.runInBackground = run_in_background
+        self.parsed = True
+
     def isToRunInBackground(self):
         return self.runInBackground
 
@@ -176,3 +269,97 @@ class Parser(list):
                             str(hash(paramSpotted)))
 
         return hash(hash_string)
+
+
+def buildCommandLine(tokens):
+    """
+    build a command line parsed back into the tokens, the tokens are
+    already solved so a leading $ is escaped, a leading - is kept to be
+    parsed as a dashed parameter again
+    """
+
+    line = []
+    for token in tokens:
+        escaped = token.replace("\\", "\\\\").replace("\"", "\\\"")
+
+        if escaped[:1] == "$":
+            escaped = "\\" + escaped
+
+        if len(escaped) == 0 or _TO_WRAP.search(escaped) is not None:
+            escaped = "\"" + escaped + "\""
+
+        line.append(escaped)
+
+    return " ".join(line)
+
+
+class ParserCache(object):
+    """
+    Bounded and thread safe least recently used cache of parsed command
+    lines.  The parsed content is stored as tuples, every hit returns a new
+    parser filled with the cached content.
+    """
+
+    def __init__(self, size=ENVIRONMENT_PARSER_CACHE_SIZE_DEFAULT):
+        self._checkSize(size)
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _checkSize(self, size):
+        if type(size) is not int or size < 0:
+            raise DefaultPyshellException("(ParserCache) setSize, size must "
+                                          "be an integer bigger or equal "
+                                          "to 0, got '"+str(size)+"'",
+                                          CORE_ERROR)
+
+    def _trim(self):
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def setSize(self, size):
+        self._checkSize(size)
+        with self.lock:
+            self.size = size
+            self._trim()
+
+    def getSize(self):
+        return self.size
+
+    def getParser(self, string):
+        parser = Parser(string)
+
+        with self.lock:
+            entry = self.entries.pop(string, None)
+            if entry is None:
+                self.misses += 1
+            else:
+                # move the entry at the most recently used position
+                self.entries[string] = entry
+                self.hits += 1
+
+        if entry is None:
+            parser.parse()
+
+            if self.size > 0:
+                entry = (tuple(parser), parser.isToRunInBackground(),)
+                with self.lock:
+                    self.entries[string] = entry
+                    self._trim()
+        else:
+            parser.load(*entry)
+
+        return parser
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def getStatistics(self):
+        "return the size, the entry count, the hit and the miss counters"
+        with self.lock:
+            return self.size, len(self.entries), self.hits, self.misses
@@ -22,6 +22,7 @@ from pyshell.arg.checker.default import DefaultChecker
 from pyshell.arg.checker.integer import IntegerArgChecker
 from pyshell.arg.checker.list import ListArgChecker
 from pyshell.arg.decorator import shellMethod
+from pyshell.command.decorator import bunchProcessing
 from pyshell.utils.constants import CONTEXT_EXECUTION_KEY
 from pyshell.utils.constants import CONTEXT_EXECUTION_SHELL
 from pyshell.utils.constants import ENVIRONMENT_TAB_SIZE_KEY
@@ -33,61 +34,112 @@ from pyshell.utils.printing import strLength
 from pyshell.utils.string65 import isString
 
 
-# TODO should also limit the single column size
-@shellMethod(result=ListArgChecker(DefaultChecker.getArg()))
-def listResultHandler(result):
+_defaultArgCheckerInstance = DefaultChecker.getArg()
+
+
+def _printBunch(format_fun, data_list, key):
+    """
+    format every data of the bunch then print them in one call, the data are
+    the arguments checked by the single data method, format_fun takes the
+    same arguments.  Return the value of the argument key of every data.
+    """
+
+    to_print = []
+    for data in data_list:
+        string = format_fun(**data)
+        if string is not None:
+            to_print.append(string)
+
+    if len(to_print) > 0:
+        printShell("\n".join(to_print))
+
+    return [data[key] for data in data_list]
+
+
+def _formatListResult(result):
     if len(result) == 0:
-        return result
+        return None
 
     ret = ""
     for i in result:
         ret += str(i) + "\n"
 
-    printShell(ret[:-1])
+    return ret[:-1]
+
+
+def _listResultBunchHandler(data_list):
+    return _printBunch(_formatListResult, data_list, "result")
+
+
+# TODO should also limit the single column size
+@bunchProcessing(_listResultBunchHandler)
+@shellMethod(result=ListArgChecker(_defaultArgCheckerInstance))
+def listResultHandler(result):
+    string = _formatListResult(result)
+    if string is not None:
+        printShell(string)
+
     return result
 
 
-@shellMethod(result=ListArgChecker(DefaultChecker.getArg()))
-def listFlatResultHandler(result):
+def _formatListFlatResult(result):
     if len(result) == 0:
-        printShell("")
-        return result
+        return ""
 
     s = ""
     for i in result:
         s += str(i) + " "
 
-    printShell(s[:-1])
+    return s[:-1]
+
+
+def _listFlatResultBunchHandler(data_list):
+    return _printBunch(_formatListFlatResult, data_list, "result")
 
+
+@bunchProcessing(_listFlatResultBunchHandler)
+@shellMethod(result=ListArgChecker(_defaultArgCheckerInstance))
+def listFlatResultHandler(result):
+    printShell(_formatListFlatResult(result))
     return result
 
 
-@shellMethod(string=ListArgChecker(IntegerArgChecker(0, 255)))
-def printStringCharResult(string):
+def _formatStringCharResult(string):
     s = ""
     for char in string:
         s += chr(char)
 
-    printShell(s)
-    return string
+    return s
 
 
-@shellMethod(byte_list=ListArgChecker(IntegerArgChecker(0, 255)))
-def printBytesAsString(byte_list):
-    if len(byte_list) == 0:
-        printShell("")
-        return byte_list
+def _printStringCharBunchResult(data_list):
+    return _printBunch(_formatStringCharResult, data_list, "string")
+
 
+@bunchProcessing(_printStringCharBunchResult)
+@shellMethod(string=ListArgChecker(IntegerArgChecker(0, 255)))
+def printStringCharResult(string):
+    printShell(_formatStringCharResult(string))
+    return string
+
+
+def _formatBytesAsString(byte_list):
     ret = ""
     for b in byte_list:
         ret += "%-0.2X" % b
 
-    printShell(ret)
+    return ret
 
-    return byte_list
 
+def _printBytesAsStringBunch(data_list):
+    return _printBunch(_formatBytesAsString, data_list, "byte_list")
 
-_defaultArgCheckerInstance = DefaultChecker.getArg()
+
+@bunchProcessing(_printBytesAsStringBunch)
+@shellMethod(byte_list=ListArgChecker(IntegerArgChecker(0, 255)))
+def printBytesAsString(byte_list):
+    printShell(_formatBytesAsString(byte_list))
+    return byte_list
 
 
 def _computeSize(list_of_line, padding=2, extra_padding=0):
@@ -142,12 +194,9 @@ def _printUntilColumn(column_size, con_execution, tab_size):
     return len(column_size)-1, column_size[-1]
 
 
-@shellMethod(list_of_line=ListArgChecker(_defaultArgCheckerInstance),
-             tab_size=EnvironmentAccessor(ENVIRONMENT_TAB_SIZE_KEY),
-             con_execution=ContextAccessor(CONTEXT_EXECUTION_KEY))
-def printColumnWithouHeader(list_of_line, tab_size=None, con_execution=None):
+def _formatColumnWithoutHeader(list_of_line, tab_size, con_execution):
     if len(list_of_line) == 0:
-        return list_of_line
+        return None
 
     column_size = _computeSize(list_of_line)
     last_col, space_last_col = _printUntilColumn(column_size,
@@ -178,16 +227,28 @@ def printColumnWithouHeader(list_of_line, tab_size=None, con_execution=None):
                 line_to_print += column
             to_print += line_to_print + "\n"
 
-    printShell(to_print[:-1])
-    return list_of_line
+    return to_print[:-1]
+
+
+def _printColumnWithouHeaderBunch(data_list):
+    return _printBunch(_formatColumnWithoutHeader, data_list, "list_of_line")
 
 
+@bunchProcessing(_printColumnWithouHeaderBunch)
 @shellMethod(list_of_line=ListArgChecker(_defaultArgCheckerInstance),
              tab_size=EnvironmentAccessor(ENVIRONMENT_TAB_SIZE_KEY),
              con_execution=ContextAccessor(CONTEXT_EXECUTION_KEY))
-def printColumn(list_of_line, tab_size=None, con_execution=None):
+def printColumnWithouHeader(list_of_line, tab_size=None, con_execution=None):
+    string = _formatColumnWithoutHeader(list_of_line, tab_size, con_execution)
+    if string is not None:
+        printShell(string)
+
+    return list_of_line
+
+
+def _formatColumn(list_of_line, tab_size, con_execution):
     if len(list_of_line) == 0:
-        return list_of_line
+        return None
 
     column_size = _computeSize(list_of_line, extra_padding=1)
     last_col, space_last_col = _printUntilColumn(column_size,
@@ -223,5 +284,20 @@ def printColumn(list_of_line, tab_size=None, con_execution=None):
                 line_to_print += column
             to_print += line_to_print + "\n"
 
-    printShell(to_print[:-1])
+    return to_print[:-1]
+
+
+def _printColumnBunch(data_list):
+    return _printBunch(_formatColumn, data_list, "list_of_line")
+
+
+@bunchProcessing(_printColumnBunch)
+@shellMethod(list_of_line=ListArgChecker(_defaultArgCheckerInstance),
+             tab_size=EnvironmentAccessor(ENVIRONMENT_TAB_SIZE_KEY),
+             con_execution=ContextAccessor(CONTEXT_EXECUTION_KEY))
+def printColumn(list_of_line, tab_size=None, con_execution=None):
+    string = _formatColumn(list_of_line, tab_size, con_execution)
+    if string is not None:
+        printShell(string)
+
     return list_of_line
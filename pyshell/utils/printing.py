@@ -73,6 +73,10 @@ class Printer(object):
         self.promptShowedContext = DefaultValuable(False)
         self.params = None
 
+        # output captured by thread, used by the daemon to send the output
+        # of a command to its client
+        self.capture = threading.local()
+
     def __enter__(self):
         return Printer._printerLock.__enter__()
 
@@ -138,6 +142,26 @@ class Printer(object):
 
         return False
 
+    def startCapture(self, lines=None):
+        "the following output of the current thread is stored, not printed"
+        if lines is None:
+            lines = []
+
+        self.capture.lines = lines
+
+    def stopCapture(self):
+        "stop the capture of the current thread and return the stored lines"
+        lines = getattr(self.capture, "lines", None)
+        self.capture.lines = None
+
+        if lines is None:
+            return []
+
+        return lines
+
+    def isCapturing(self):
+        return getattr(self.capture, "lines", None) is not None
+
     def isPromptShowed(self):
         return self.promptShowedContext.getValue()
 
@@ -190,6 +214,13 @@ class Printer(object):
         if out is None:
             return
 
+        # the captured output is not sent to a terminal, there is no need
+        # to look up the coloration or the indentation settings
+        lines = getattr(self.capture, "lines", None)
+        if lines is not None:
+            lines.append(ANSI_ESCAPE.sub('', str(out)))
+            return
+
         # remove ansi annotation if not in shell mode or if stdout is
         # redirected to a file
         if (not self.isInShell() or
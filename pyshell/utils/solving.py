@@ -16,10 +16,11 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import threading
+
 from tries import multiLevelTries
 from tries.exception import triesException
 
-from pyshell.arg.checker.boolean import BooleanValueArgChecker
 from pyshell.arg.checker.default import DefaultChecker
 from pyshell.command.engine import EMPTY_MAPPED_ARGS
 from pyshell.system.manager.variable import VariableParameterManager
@@ -29,7 +30,13 @@ from pyshell.utils.exception import USER_WARNING
 from pyshell.utils.parsing import Parser
 
 
+SOLVER_CACHE_SIZE_DEFAULT = 1024
+
+
 class Solver(object):
+    def __init__(self, cache=None):
+        self.cache = cache
+
     def solve(self, parser, mltries, variables_container):
         if not isinstance(parser, Parser):
             excmsg = ("("+self.__class__.__name__+") __init__, fail to init "
@@ -101,42 +108,56 @@ class Solver(object):
         if len(arg_spotted) == 0:
             return token_list
 
-        token_list = list(token_list)
+        # get every variable with a single lookup, remove $ from the tokens
+        names = [token_list[arg_index][1:] for arg_index in arg_spotted]
+        variables = self.variables_container.getParameters(names)
+
+        solved_token_list = []
+        previous_index = 0
         index_correction = 0
+        param_cursor = 0
 
-        for arg_index in arg_spotted:
-            arg_index += index_correction
+        for name_index in range(0, len(arg_spotted)):
+            arg_index = arg_spotted[name_index]
 
-            # get the token and remove $
-            string_token = token_list[arg_index][1:]
+            # copy the tokens between the previous var and this one
+            solved_token_list.extend(token_list[previous_index:arg_index])
+            previous_index = arg_index + 1
 
-            # remove old key from token list
-            del token_list[arg_index]
+            # shift every spotted param located before this var
+            while (param_cursor < len(param_spotted) and
+                   param_spotted[param_cursor] < arg_index):
+                param_spotted[param_cursor] += index_correction
+                param_cursor += 1
 
             # if not existing var, act as an empty var
-            var = self.variables_container.getParameter(string_token)
+            var = variables[names[name_index]]
             if var is None:
-                var_size = 0
+                index_correction -= 1
             else:
                 # insert the var list at the correct place
                 # (var is always a list)
                 values = var.getValue()
-                pre_list = token_list[0:arg_index]
-                post_list = token_list[arg_index:]
-                token_list = pre_list + values + post_list
-                var_size = len(values)
+                solved_token_list.extend(values)
+                index_correction += len(values) - 1
+
+        solved_token_list.extend(token_list[previous_index:])
 
-            # update every spotted param index with an index bigger than
-            # the var if the value of the var is different of 1
-            if var_size != 1:
-                index_correction += var_size-1
-                _addValueToIndex(param_spotted, arg_index+1, index_correction)
+        # shift every spotted param located after the last var
+        for index in range(param_cursor, len(param_spotted)):
+            param_spotted[index] += index_correction
 
-        return token_list
+        return solved_token_list
 
     def _solveCommands(self, token_list):
         "indentify command name and args from output of method parseArgument"
 
+        if self.cache is not None:
+            result = self.cache.get(self.mltries, token_list)
+            if result is not None:
+                command, consumed = result
+                return command, list(token_list[consumed:])
+
         # search the command with advanced seach
         search_result = None
         try:
@@ -183,9 +204,32 @@ class Solver(object):
                       "of commands")
             raise DefaultPyshellException(excmsg, USER_WARNING)
 
+        command = search_result.getLastTokenFoundValue()
+        remaining_token_list = list(search_result.getNotFoundTokenList())
+
+        if self.cache is not None:
+            consumed = len(token_list) - len(remaining_token_list)
+            self.cache.put(self.mltries,
+                           token_list,
+                           command,
+                           consumed,
+                           self._isLeaf(token_list[:consumed]))
+
         # return the command found and the not found token
-        return (search_result.getLastTokenFoundValue(),
-                list(search_result.getNotFoundTokenList()),)
+        return command, remaining_token_list
+
+    def _isLeaf(self, command_token_list):
+        "check if no other command exists under this command path"
+        commands = self.mltries.buildDictionnary(command_token_list,
+                                                 True,
+                                                 True,
+                                                 False)
+
+        for key in commands.keys():
+            if len(key) > len(command_token_list):
+                return False
+
+        return True
 
     def _solveDashedParameters(self,
                                command,
@@ -225,9 +269,10 @@ class Solver(object):
         local_mapped_args = [EMPTY_MAPPED_ARGS,
                              EMPTY_MAPPED_ARGS,
                              EMPTY_MAPPED_ARGS]
-        param_found, remainingArgs = _mapDashedParams(remaining_token_list,
-                                                      feeder.arg_type_list,
-                                                      param_spotted)
+        param_found, remainingArgs = _mapDashedParams(
+            remaining_token_list,
+            feeder.getDashedParameters(),
+            param_spotted)
         local_mapped_args[index_to_set] = param_found
 
         return local_mapped_args, remainingArgs
@@ -253,7 +298,7 @@ def _addValueToIndex(index_list, starting_index, value_to_add=1):
         index_list[i] += value_to_add
 
 
-def _mapDashedParams(input_args, arg_type_map, param_spotted):
+def _mapDashedParams(input_args, dashed_params, param_spotted):
     if len(param_spotted) == 0:
         return {}, input_args
 
@@ -268,7 +313,7 @@ def _mapDashedParams(input_args, arg_type_map, param_spotted):
         param_name = input_args[index][1:]
 
         # remove false param
-        if param_name not in arg_type_map:
+        if param_name not in dashed_params:
             continue
 
         # manage last met param
@@ -286,7 +331,7 @@ def _mapDashedParams(input_args, arg_type_map, param_spotted):
             not_used_args.extend(input_args[0:index])
 
         current_name = param_name
-        current_param = arg_type_map[param_name]
+        current_param = dashed_params[param_name]
         current_index = index
 
     # never found any valid and existing param
@@ -315,7 +360,7 @@ def _mapDashedParamsManageParam(input_args,
     arg_available_count = last_index - current_index - 1
 
     # special case for boolean, parameter alone is equivalent to true
-    if isinstance(current_param, BooleanValueArgChecker):
+    if current_param.boolean:
         if arg_available_count == 0:
             param_found[current_name] = ("true",)
         elif _isValidBooleanValueForChecker(input_args[current_index+1]):
@@ -328,9 +373,9 @@ def _mapDashedParamsManageParam(input_args,
         # did we reach max size ?
         # don't care about minimum size, it will be check during
         # execution phase
-        if (current_param.getMaximumSize() is not None and
-           current_param.getMaximumSize() < arg_available_count):
-            pivot = current_index+1+current_param.getMaximumSize()
+        if (current_param.maximum is not None and
+           current_param.maximum < arg_available_count):
+            pivot = current_index+1+current_param.maximum
             param_found[current_name] = tuple(
                 input_args[current_index+1:pivot])
             not_used_args.extend(input_args[pivot:last_index])
@@ -339,9 +384,107 @@ def _mapDashedParamsManageParam(input_args,
             param_found[current_name] = params
 
 
+def _buildBooleanTokens():
+    "every string accepted by the default boolean checker, in lower case"
+    names = (DefaultChecker.getBoolean().true_name,
+             DefaultChecker.getBoolean().false_name,)
+    tokens = set()
+
+    for name in names:
+        for index in range(1, len(name)+1):
+            prefix = name[:index]
+            matching = [n for n in names if n.startswith(prefix)]
+
+            # a prefix shared by several names is ambiguous
+            if prefix in names or len(matching) == 1:
+                tokens.add(prefix)
+
+    return frozenset(tokens)
+
+
+_BOOLEAN_TOKENS = _buildBooleanTokens()
+
+
 def _isValidBooleanValueForChecker(value):
-    try:
-        DefaultChecker.getBoolean().getValue(value)
+    return type(value) is bool or str(value).lower() in _BOOLEAN_TOKENS
+
+
+class SolverCache(object):
+    """
+    Cache of the command resolutions done by the solver.  A key is the
+    token prefix read by the tries search, i.e. the command tokens plus the
+    first token not found, and the value is the command with the count of
+    consumed tokens.  If no other command exists under the command path,
+    the command tokens alone are used as key, whatever the next tokens are.
+
+    Only the registries with a generation number (see CommandRegistry) are
+    cached, the whole cache is dropped when the registry or its generation
+    change.  The cache is cleared when it reaches its size limit.
+    """
+
+    def __init__(self, size=SOLVER_CACHE_SIZE_DEFAULT):
+        self.size = size
+        self.entries = {}
+        self.registry = None
+        self.generation = None
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _isUpToDate(self, registry):
+        if not hasattr(registry, "getGeneration"):
+            return False
+
+        generation = registry.getGeneration()
+        if registry is not self.registry or generation != self.generation:
+            self.entries.clear()
+            self.registry = registry
+            self.generation = generation
+
         return True
-    except Exception:
-        return False
+
+    def get(self, registry, token_list):
+        with self.lock:
+            if not self._isUpToDate(registry):
+                return None
+
+            token_count = len(token_list)
+            for index in range(1, token_count+1):
+                entry = self.entries.get(tuple(token_list[:index]))
+
+                # the search stopped inside of this prefix, consumed every
+                # token or can not go deeper than this prefix
+                if entry is not None and (entry[1] < index or
+                                          index == token_count or
+                                          entry[2]):
+                    self.hits += 1
+                    return entry[0], entry[1]
+
+            self.misses += 1
+            return None
+
+    def put(self, registry, token_list, command, consumed, leaf=False):
+        with self.lock:
+            if not self._isUpToDate(registry):
+                return
+
+            if len(self.entries) >= self.size:
+                self.entries.clear()
+
+            if leaf:
+                key = tuple(token_list[:consumed])
+            else:
+                key = tuple(token_list[:consumed+1])
+
+            self.entries[key] = (command, consumed, leaf,)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def getStatistics(self):
+        "return the size, the entry count, the hit and the miss counters"
+        with self.lock:
+            return self.size, len(self.entries), self.hits, self.misses
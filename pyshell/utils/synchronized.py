@@ -17,6 +17,8 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from functools import wraps
+from threading import Condition
+from threading import Lock
 
 
 def synchronous():
@@ -32,6 +34,108 @@ def synchronous():
     return _synched
 
 
+def sharedSynchronous():
+    """
+    like synchronous, but for the methods that do not update the object,
+    several threads can execute them at the same time.  The _internalLock
+    must be a ReadWriteLock.
+
+    The method is first executed without any lock, its result is kept if
+    no writer has held the lock in the meantime, otherwise it is executed
+    again with the shared lock.
+    """
+
+    def _synched(func):
+        @wraps(func)
+        def _synchronizer(self, *args, **kwargs):
+            lock = self._internalLock
+            version = lock.version
+
+            # an odd version means a writer holds the lock
+            if version % 2 == 0:
+                try:
+                    result = func(self, *args, **kwargs)
+                except Exception:
+                    if lock.version == version:
+                        raise
+                else:
+                    if lock.version == version:
+                        return result
+
+            lock.acquireRead()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                lock.releaseRead()
+        return _synchronizer
+    return _synched
+
+
+class ReadWriteLock(object):
+    """
+    a lock shared by the readers and exclusive for a writer, acquire and
+    release are the writer methods so this lock can replace a Lock.
+
+    A waiting writer blocks the new readers, the readers can not starve the
+    writers.  The lock is not reentrant.
+
+    The version is incremented when a writer acquires and when it releases
+    the lock, it allows the readers to check that no update happened while
+    they were reading without the lock.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._lock = Lock()
+        self._condition = Condition(self._lock)
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquireRead(self):
+        with self._lock:
+            while self._writer or self._waiting_writers > 0:
+                self._condition.wait()
+
+            self._readers += 1
+
+    def releaseRead(self):
+        with self._lock:
+            self._readers -= 1
+
+            if self._readers == 0 and self._waiting_writers > 0:
+                self._condition.notify_all()
+
+    def acquire(self):
+        with self._condition:
+            self._waiting_writers += 1
+            try:
+                while self._writer or self._readers > 0:
+                    self._condition.wait()
+            except BaseException:
+                # the readers blocked by this writer must not wait forever
+                self._waiting_writers -= 1
+                self._condition.notify_all()
+                raise
+
+            self._waiting_writers -= 1
+            self._writer = True
+            self.version += 1
+
+    def release(self):
+        with self._condition:
+            self.version += 1
+            self._writer = False
+            self._condition.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.release()
+
+
 class FakeLock(object):
     def __enter__(self):
         return self
@@ -0,0 +1,116 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2012  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from tries import multiLevelTries
+
+from pyshell.command.registry import CommandRegistry
+from pyshell.utils.completion import CompletionEngine
+from pyshell.utils.completion import computeCandidates
+
+
+def _collect(engine, line, mltries):
+    candidates = []
+    index = 0
+    while True:
+        candidate = engine.complete(line, len(line), mltries, index)
+        if candidate is None:
+            return candidates
+        candidates.append(candidate)
+        index += 1
+
+
+class TestComputeCandidates(object):
+
+    def setup_method(self, method):
+        self.registry = CommandRegistry()
+        self.registry.insert(("context", "get",), "cmd1")
+        self.registry.insert(("context", "set",), "cmd2")
+        self.registry.insert(("echo",), "cmd3")
+
+    def test_emptyLine(self):
+        assert sorted(computeCandidates("", self.registry)) == ["context",
+                                                                "echo"]
+
+    def test_prefix(self):
+        assert computeCandidates("ec", self.registry) == ["echo"]
+
+    def test_innerLevel(self):
+        candidates = computeCandidates("context ", self.registry)
+        assert sorted(candidates) == ["get", "set"]
+
+    def test_completeCommand(self):
+        assert computeCandidates("echo", self.registry) == ["echo"]
+
+    def test_unknownPath(self):
+        assert computeCandidates("plop plip", self.registry) == []
+
+
+class TestCompletionEngine(object):
+
+    def setup_method(self, method):
+        self.registry = CommandRegistry()
+        self.registry.insert(("context", "get",), "cmd1")
+        self.registry.insert(("context", "set",), "cmd2")
+        self.registry.insert(("echo",), "cmd3")
+        self.engine = CompletionEngine()
+
+    def test_init(self):
+        assert self.engine.getStatistics() == (0, 0,)
+
+    def test_candidatesAreComputedOnce(self):
+        candidates = _collect(self.engine, "context ", self.registry)
+        assert sorted(candidates) == ["get", "set"]
+        assert self.engine.getStatistics() == (2, 1,)
+
+    def test_lineChange(self):
+        _collect(self.engine, "context ", self.registry)
+        assert _collect(self.engine, "ec", self.registry) == ["echo"]
+        assert self.engine.getStatistics() == (3, 2,)
+
+    def test_cursorChange(self):
+        self.engine.complete("context ", 8, self.registry, 0)
+        self.engine.complete("context ", 7, self.registry, 0)
+        assert self.engine.getStatistics() == (0, 2,)
+
+    def test_registryChange(self):
+        assert _collect(self.engine, "context ", self.registry) == \
+            ["get", "set"]
+        self.registry.insert(("context", "list",), "cmd4")
+        candidates = _collect(self.engine, "context ", self.registry)
+        assert sorted(candidates) == ["get", "list", "set"]
+        assert self.engine.getStatistics() == (5, 2,)
+
+    def test_registryReplaced(self):
+        _collect(self.engine, "context ", self.registry)
+        registry = CommandRegistry()
+        registry.insert(("context", "other",), "cmd1")
+        assert _collect(self.engine, "context ", registry) == ["other"]
+
+    def test_noGenerationNoCache(self):
+        mltries = multiLevelTries()
+        mltries.insert(("echo",), "cmd3")
+        assert _collect(self.engine, "ec", mltries) == ["echo"]
+        assert _collect(self.engine, "ec", mltries) == ["echo"]
+        assert self.engine.getStatistics() == (0, 4,)
+
+    def test_clear(self):
+        _collect(self.engine, "context ", self.registry)
+        self.engine.clear()
+        assert self.engine.getStatistics() == (0, 0,)
+        _collect(self.engine, "context ", self.registry)
+        assert self.engine.getStatistics() == (2, 1,)
@@ -17,7 +17,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import threading
-from time import sleep
+import time
 
 import pytest
 
@@ -36,6 +36,7 @@ from pyshell.command.exception import CommandException
 from pyshell.command.exception import EngineInterruptionException
 from pyshell.command.exception import ExecutionException
 from pyshell.command.exception import ExecutionInitException
+from pyshell.command.exception import ExecutionTimeoutException
 from pyshell.system.manager.parent import ParentManager
 from pyshell.system.parameter.context import ContextParameter
 from pyshell.system.parameter.environment import EnvironmentParameter
@@ -49,12 +50,28 @@ from pyshell.utils.constants import CONTEXT_EXECUTION_DAEMON
 from pyshell.utils.constants import CONTEXT_EXECUTION_KEY
 from pyshell.utils.constants import CONTEXT_EXECUTION_SHELL
 from pyshell.utils.constants import DEBUG_ENVIRONMENT_NAME
+from pyshell.utils.constants import ENVIRONMENT_EXECUTION_TIMEOUT_KEY
+from pyshell.utils.constants import ENVIRONMENT_JOB_POOL_SIZE_DEFAULT
+from pyshell.utils.constants import ENVIRONMENT_JOB_POOL_SIZE_KEY
+from pyshell.utils.constants import ENVIRONMENT_JOB_QUEUE_SIZE_DEFAULT
 from pyshell.utils.constants import ENVIRONMENT_LEVEL_TRIES_KEY
+from pyshell.utils.constants import ENVIRONMENT_PARSER_CACHE_SIZE_DEFAULT
+from pyshell.utils.constants import ENVIRONMENT_PARSER_CACHE_SIZE_KEY
 from pyshell.utils.constants import ENVIRONMENT_TAB_SIZE_KEY
+from pyshell.utils.exception import DefaultPyshellException
 from pyshell.utils.exception import ListOfException
+from pyshell.utils.executing import _AsyncSlots
 from pyshell.utils.executing import _generateSuffix
 from pyshell.utils.executing import execute
+from pyshell.utils.executing import executeAsync
+from pyshell.utils.executing import executeMany
+from pyshell.utils.executing import getJobManager
+from pyshell.utils.executing import getParserCache
+from pyshell.utils.jobs import JOB_DONE
+from pyshell.utils.jobs import JOB_FAILED
+from pyshell.utils.jobs import JOB_KILLED
 from pyshell.utils.parsing import Parser
+from pyshell.utils.printing import Printer
 
 
 RESULT = None
@@ -77,6 +94,16 @@ def tutuMeth(param):
     return param
 
 
+SLOW_CALLS = []
+
+
+@shellMethod(param=ListArgChecker(DefaultChecker.getArg()))
+def slowMeth(param):
+    SLOW_CALLS.append(param)
+    time.sleep(0.05)
+    return param
+
+
 @shellMethod(param=ListArgChecker(DefaultChecker.getArg()))
 def raiseExc1(param):
     raise ExecutionInitException("test 1")
@@ -205,6 +232,9 @@ class TestExecuting(object):
         param.settings.setRemovable(False)
         param.settings.setReadOnly(True)
 
+        self.mltries.insert(("slow",), UniCommand(slowMeth))
+        del SLOW_CALLS[:]
+
         RESULT = None
         RESULT_BIS = None
 
@@ -286,25 +316,42 @@ class TestExecuting(object):
         assert engine is None
 
         variables = self.params.getVariableManager()
-        thread_id = variables.getParameter("!").getValue()
+        job_id = variables.getParameter("!").getValue()
 
-        for t in threading.enumerate():
-            if t.ident == thread_id[0]:
-                t.join(4)
-                break
-        sleep(0.1)
+        job = getJobManager().getJob(int(job_id[0]))
+        assert job.wait(4)
+        assert job.getStatus() == JOB_DONE
+        assert job.getCommand() == "plop 1 2 3 &"
+        assert job.getEngine() is not None
 
         assert RESULT is not None
         assert len(RESULT) == 4
         assert RESULT[3] != threading.current_thread().ident
 
+    def test_execute8b(self):  # background job name and failure
+        last_exception, engine = execute("plop 1 2 3 | plapplap &",
+                                         self.params,
+                                         process_name="my_process")
+        assert last_exception is None
+        assert engine is None
+
+        variables = self.params.getVariableManager()
+        job_id = variables.getParameter("!").getValue()
+
+        job = getJobManager().getJob(int(job_id[0]))
+        assert job.wait(4)
+        assert job.getName() == "my_process"
+        assert job.getStatus() == JOB_FAILED
+        assert job.getException() is not None
+
     def test_execute9(self):  # test with an empty command
         assert RESULT is None
         with pytest.raises(Exception):
             execute("plap", self.params, process_arg=object())
         assert RESULT is None
 
-    def test_execute10(self):  # check if commands are correctly cloned
+    # check if the dynamic commands are not executed
+    def test_execute10(self):
         m = MultiCommand()
         m.addProcess(process=plopMeth)
 
@@ -324,6 +371,66 @@ class TestExecuting(object):
         assert RESULT == ["aa", "bb", "cc", threading.current_thread().ident]
         assert RESULT_BIS is None
 
+    # check if the registered command is shared, not updated, by executions
+    def test_execute10b(self):
+        m = MultiCommand()
+        m.addProcess(process=plopMeth)
+        self.mltries.insert(("tutu",), m)
+
+        last_exception, engine = execute("tutu aa", self.params)
+        assert last_exception is None
+        assert engine.cmd_list[0].getCommand() is m
+        assert engine.cmd_list[0].getProCount() == 1
+
+        last_exception, engine2 = execute("tutu bb", self.params)
+        assert last_exception is None
+        assert engine2.cmd_list[0].getCommand() is m
+        assert engine2.cmd_list[0] is not engine.cmd_list[0]
+        assert len(m) == 1
+        assert m.dymamic_count == 0
+
+    # check if the parsed command lines are reused between executions
+    def test_execute10c(self):
+        cache = getParserCache()
+        cache.clear()
+
+        execute("plop 1 2 3", self.params)
+        last_exception, engine = execute("plop 1 2 3", self.params)
+        assert last_exception is None
+        assert engine.getLastResult() == [["1", "2", "3",
+                                           threading.current_thread().ident]]
+        assert cache.getStatistics()[1:] == (1, 1, 1,)
+
+    def test_execute10d(self):  # cache size from the environment
+        self.params.getEnvironmentManager().setParameter(
+            ENVIRONMENT_PARSER_CACHE_SIZE_KEY,
+            EnvironmentParameter(
+                value=0,
+                settings=EnvironmentGlobalSettings(
+                    checker=IntegerArgChecker(0))),
+            local_param=False)
+        cache = getParserCache()
+        cache.clear()
+
+        try:
+            execute("plop 1 2 3", self.params)
+            execute("plop 1 2 3", self.params)
+            assert cache.getStatistics() == (0, 0, 0, 2,)
+        finally:
+            cache.setSize(ENVIRONMENT_PARSER_CACHE_SIZE_DEFAULT)
+
+    # the same command used twice in a pipeline gets a state per position
+    def test_execute10e(self):
+        last_exception, engine = execute("plop aa | plop | plop", self.params)
+        assert last_exception is None
+
+        first, middle, last = engine.cmd_list
+        assert first.getCommand() is middle.getCommand() is last.getCommand()
+        assert first is not middle and middle is not last
+        assert first.counters == [[1, 0, 1]]
+        assert middle.counters == [[1, 0, 1]]
+        assert last.counters == [[1, 1, 1]]
+
     def test_execute11(self, capsys):  # raise every exception
         # IDEA create a command that raise a defined exception, and call it
 
@@ -429,6 +536,328 @@ class TestExecuting(object):
         assert engine is not None
         assert out == "test 8\n"
 
+    # ## executeAsync test ## #
+    def test_executeAsync1(self):  # executed in the job pool
+        asyncio = pytest.importorskip("asyncio")
+        loop = asyncio.new_event_loop()
+
+        try:
+            future = executeAsync("plop 1 2 3", self.params, loop)
+            last_exception, engine = loop.run_until_complete(future)
+        finally:
+            loop.close()
+
+        assert last_exception is None
+        assert engine is not None
+        assert RESULT[0:3] == ["1", "2", "3"]
+        assert RESULT[3] != threading.current_thread().ident
+
+    def test_executeAsync2(self):  # with empty line
+        asyncio = pytest.importorskip("asyncio")
+        loop = asyncio.new_event_loop()
+
+        try:
+            future = executeAsync("", self.params, loop)
+            assert future.done()
+            assert loop.run_until_complete(future) == (None, None,)
+        finally:
+            loop.close()
+
+    def test_executeAsync3(self):  # background command is not awaited
+        asyncio = pytest.importorskip("asyncio")
+        loop = asyncio.new_event_loop()
+
+        try:
+            future = executeAsync("plop 1 2 3 &", self.params, loop)
+            assert loop.run_until_complete(future) == (None, None,)
+        finally:
+            loop.close()
+
+        variables = self.params.getVariableManager()
+        job_id = variables.getParameter("!").getValue()
+        assert getJobManager().getJob(int(job_id[0])).wait(4)
+
+    def test_executeAsync4(self):  # with failing command
+        asyncio = pytest.importorskip("asyncio")
+        loop = asyncio.new_event_loop()
+
+        try:
+            future = executeAsync("plapplap", self.params, loop)
+            last_exception, engine = loop.run_until_complete(future)
+        finally:
+            loop.close()
+
+        assert last_exception is not None
+        assert engine is None
+
+    def test_executeAsync5(self):  # cancellation stops the engine
+        asyncio = pytest.importorskip("asyncio")
+        started = threading.Event()
+        release = threading.Event()
+
+        @shellMethod(param=ListArgChecker(DefaultChecker.getArg()))
+        def blockMeth(param):
+            started.set()
+            release.wait(4)
+            return param
+
+        self.mltries.insert(("block",), UniCommand(blockMeth))
+        loop = asyncio.new_event_loop()
+
+        try:
+            future = executeAsync("block", self.params, loop)
+            job = getJobManager().getJobs()[-1]
+            assert started.wait(4)
+            future.cancel()
+            loop.run_until_complete(asyncio.sleep(0))
+        finally:
+            loop.close()
+            release.set()
+
+        assert job.wait(4)
+        assert job.getStatus() == JOB_KILLED
+        assert isinstance(job.getException(), EngineInterruptionException)
+
+    def test_executeAsync6(self):  # in flight executions are bounded
+        asyncio = pytest.importorskip("asyncio")
+        started = threading.Event()
+        release = threading.Event()
+
+        @shellMethod(param=ListArgChecker(DefaultChecker.getArg()))
+        def blockMeth(param):
+            started.set()
+            release.wait(4)
+            return param
+
+        self.mltries.insert(("block",), UniCommand(blockMeth))
+        self.params.getEnvironmentManager().setParameter(
+            ENVIRONMENT_JOB_POOL_SIZE_KEY,
+            EnvironmentParameter(
+                value=1,
+                settings=EnvironmentGlobalSettings(
+                    checker=IntegerArgChecker(1))),
+            local_param=False)
+        manager = getJobManager()
+        manager.wait(timeout=4)
+        manager.clear()
+        loop = asyncio.new_event_loop()
+
+        try:
+            first = executeAsync("block", self.params, loop)
+            second = executeAsync("plop 1 2 3", self.params, loop)
+            assert started.wait(4)
+
+            # the second execution waits for a slot, not in the job queue
+            assert len(manager.getJobs()) == 1
+            release.set()
+            results = loop.run_until_complete(asyncio.gather(first, second))
+        finally:
+            loop.close()
+            release.set()
+            manager.setSize(ENVIRONMENT_JOB_POOL_SIZE_DEFAULT)
+
+        assert [r[0] for r in results] == [None, None]
+        assert RESULT[0:3] == ["1", "2", "3"]
+        assert len(manager.getJobs()) == 2
+
+    def test_executeAsync7(self):  # cancelled while waiting for a slot
+        asyncio = pytest.importorskip("asyncio")
+        started = threading.Event()
+        release = threading.Event()
+
+        @shellMethod(param=ListArgChecker(DefaultChecker.getArg()))
+        def blockMeth(param):
+            started.set()
+            release.wait(4)
+            return param
+
+        self.mltries.insert(("block",), UniCommand(blockMeth))
+        manager = getJobManager()
+        manager.setSize(1)
+        manager.wait(timeout=4)
+        manager.clear()
+        loop = asyncio.new_event_loop()
+
+        try:
+            first = executeAsync("block", self.params, loop)
+            second = executeAsync("plop 1 2 3", self.params, loop)
+            assert started.wait(4)
+            second.cancel()
+            release.set()
+            assert loop.run_until_complete(first)[0] is None
+        finally:
+            loop.close()
+            release.set()
+            manager.setSize(ENVIRONMENT_JOB_POOL_SIZE_DEFAULT)
+
+        # the cancelled execution is never submitted
+        assert len(manager.getJobs()) == 1
+
+    def test_executeAsync8(self):  # too many waiting executions
+        asyncio = pytest.importorskip("asyncio")
+        started = threading.Event()
+        release = threading.Event()
+
+        @shellMethod(param=ListArgChecker(DefaultChecker.getArg()))
+        def blockMeth(param):
+            started.set()
+            release.wait(4)
+            return param
+
+        self.mltries.insert(("block",), UniCommand(blockMeth))
+        manager = getJobManager()
+        manager.setSize(1)
+        manager.setQueueSize(1)
+        manager.wait(timeout=4)
+        loop = asyncio.new_event_loop()
+
+        try:
+            first = executeAsync("block", self.params, loop)
+            second = executeAsync("plop 1 2 3", self.params, loop)
+            third = executeAsync("plop 1 2 3", self.params, loop)
+            assert started.wait(4)
+
+            # the third execution is rejected, the waiting list is full
+            assert third.done()
+            last_exception, engine = third.result()
+            assert isinstance(last_exception, DefaultPyshellException)
+            assert engine is None
+
+            release.set()
+            results = loop.run_until_complete(asyncio.gather(first, second))
+        finally:
+            loop.close()
+            release.set()
+            manager.setSize(ENVIRONMENT_JOB_POOL_SIZE_DEFAULT)
+            manager.setQueueSize(ENVIRONMENT_JOB_QUEUE_SIZE_DEFAULT)
+
+        assert [r[0] for r in results] == [None, None]
+
+    # ## executeMany test ## #
+    def test_executeMany1(self, capsys):
+        results = executeMany(["plop 1 2", "", "plop 3"], self.params)
+        out, err = capsys.readouterr()
+        assert out == ""
+
+        assert len(results) == 3
+        assert [r.line for r in results] == ["plop 1 2", "", "plop 3"]
+        assert [r.exception for r in results] == [None, None, None]
+        assert results[0].engine is not None
+        assert results[1].engine is None
+        assert results[2].engine.getLastResult()[0][0] == "3"
+        assert RESULT[0] == "3"
+
+    def test_executeMany2(self, capsys):  # failure is captured
+        results = executeMany(["plop 1", "plapplap", "plop 2"], self.params)
+        out, err = capsys.readouterr()
+        assert out == ""
+
+        assert len(results) == 3
+        assert results[1].exception is not None
+        assert results[1].engine is None
+        assert len(results[1].output) == 1
+        assert "plapplap" in results[1].output[0]
+        assert results[2].exception is None
+
+    def test_executeMany3(self):  # stop on error
+        results = executeMany(["plop 1", "plapplap", "plop 2"],
+                              self.params,
+                              stop_on_error=True)
+        assert len(results) == 2
+        assert results[1].exception is not None
+        assert RESULT[0] == "1"
+
+    def test_executeMany4(self):  # with parser and background line
+        p = Parser("plop 1 2")
+        results = executeMany([p, "plop 3 &"], self.params)
+        assert results[0].line is p
+        assert results[0].engine is not None
+        assert results[1].engine is None
+
+        variables = self.params.getVariableManager()
+        job_id = variables.getParameter("!").getValue()
+        assert getJobManager().getJob(int(job_id[0])).wait(4)
+
+    def test_executeMany5(self):  # enclosing capture is preserved
+        printer = Printer.getInstance()
+        printer.startCapture(["before"])
+
+        try:
+            results = executeMany(["plapplap"], self.params)
+            assert printer.isCapturing()
+        finally:
+            lines = printer.stopCapture()
+
+        assert lines == ["before"]
+        assert len(results[0].output) == 1
+
+    def test_executeMany6(self):  # without levelTries
+        with pytest.raises(DefaultPyshellException):
+            executeMany(["plop 1"], ParentManagerWithMainThread())
+
+    # ## timeout test ## #
+    def test_timeout1(self):  # per call timeout
+        ex, engine = execute("slow 1 | slow | slow", self.params, timeout=0.02)
+        assert isinstance(ex, ExecutionTimeoutException)
+        assert ex.abnormal
+        assert len(SLOW_CALLS) == 1
+
+    def test_timeout2(self):  # no limit
+        ex, engine = execute("slow 1 | slow | slow", self.params, timeout=0)
+        assert ex is None
+        assert len(SLOW_CALLS) == 3
+
+    def test_timeout3(self):  # default timeout from the environment
+        self.params.getEnvironmentManager().setParameter(
+            ENVIRONMENT_EXECUTION_TIMEOUT_KEY,
+            EnvironmentParameter(
+                value=0.02,
+                settings=EnvironmentGlobalSettings(
+                    checker=DefaultChecker.getFloat())),
+            local_param=False)
+
+        ex, engine = execute("slow 1 | slow | slow", self.params)
+        assert isinstance(ex, ExecutionTimeoutException)
+
+        # an explicit timeout overrides the environment
+        ex, engine = execute("slow 1 | slow", self.params, timeout=0)
+        assert ex is None
+
+    def test_timeout4(self):  # a nested execution inherits the deadline
+        nested = []
+
+        @shellMethod(param=ListArgChecker(DefaultChecker.getArg()))
+        def nest(param):
+            nested.append(execute("slow 1 | slow | slow",
+                                  self.params,
+                                  timeout=10))
+            return param
+
+        self.mltries.insert(("nest",), UniCommand(nest))
+        ex, engine = execute("nest", self.params, timeout=0.02)
+        assert isinstance(nested[0][0], ExecutionTimeoutException)
+        assert isinstance(ex, ExecutionTimeoutException)
+        assert len(SLOW_CALLS) == 1
+
+    def test_timeout5(self):  # each line of executeMany has its own deadline
+        results = executeMany(["slow 1 | slow", "slow 2 | slow"],
+                              self.params,
+                              timeout=0.02)
+        assert len(results) == 2
+        assert isinstance(results[0].exception, ExecutionTimeoutException)
+        assert isinstance(results[1].exception, ExecutionTimeoutException)
+        assert SLOW_CALLS == [["1"], ["2"]]
+
+    def test_timeout6(self):  # background job
+        execute("slow 1 | slow | slow &", self.params, timeout=0.02)
+
+        variables = self.params.getVariableManager()
+        job_id = variables.getParameter("!").getValue()
+        job = getJobManager().getJob(int(job_id[0]))
+        assert job.wait(4)
+        assert job.getStatus() == JOB_FAILED
+        assert isinstance(job.getException(), ExecutionTimeoutException)
+
     # ## _generateSuffix test ## #
     def test_generateSuffix0(self):  # no suffix production
         assert _generateSuffix(self.params,
@@ -499,3 +928,84 @@ class TestExecuting(object):
         assert _generateSuffix(self.params,
                                (("plop",),),
                                e) == expected
+
+
+class FakeExecution(object):
+    def __init__(self, started, cancelled=False, keep_slot=True):
+        self.started = started
+        self.cancelled = cancelled
+        self.keep_slot = keep_slot
+
+    def isCancelled(self):
+        return self.cancelled
+
+    def start(self):
+        self.started.append(self)
+        return self.keep_slot
+
+
+class TestAsyncSlots(object):
+
+    def setup_method(self, method):
+        self.slots = _AsyncSlots()
+        self.started = []
+
+    def test_limit(self):
+        first = FakeExecution(self.started)
+        second = FakeExecution(self.started)
+        self.slots.acquire(1, 10, first)
+        self.slots.acquire(1, 10, second)
+        assert self.started == [first]
+        assert self.slots.running == 1
+
+        self.slots.release()
+        assert self.started == [first, second]
+        assert self.slots.running == 1
+
+        self.slots.release()
+        assert self.slots.running == 0
+
+    def test_waitingLimit(self):
+        self.slots.acquire(1, 1, FakeExecution(self.started))
+        self.slots.acquire(1, 1, FakeExecution(self.started))
+
+        with pytest.raises(DefaultPyshellException):
+            self.slots.acquire(1, 1, FakeExecution(self.started))
+
+    def test_manyCancelled(self):
+        self.slots.acquire(1, 10000, FakeExecution(self.started))
+        for i in range(0, 5000):
+            execution = FakeExecution(self.started, cancelled=True)
+            self.slots.acquire(1, 10000, execution)
+        last = FakeExecution(self.started)
+        self.slots.acquire(1, 10000, last)
+
+        # the cancelled executions are skipped without any recursion
+        self.slots.release()
+        assert self.started[-1] is last
+        assert len(self.started) == 2
+        assert self.slots.running == 1
+        assert len(self.slots.waiting) == 0
+
+    def test_slotNotKept(self):
+        self.slots.acquire(1, 10000, FakeExecution(self.started))
+        for i in range(0, 5000):
+            execution = FakeExecution(self.started, keep_slot=False)
+            self.slots.acquire(1, 10000, execution)
+
+        # e.g. every submission fails, the slot goes back to the pool
+        self.slots.release()
+        assert len(self.started) == 5001
+        assert self.slots.running == 0
+        assert len(self.slots.waiting) == 0
+
+    def test_discard(self):
+        self.slots.acquire(1, 10, FakeExecution(self.started))
+        waiting = FakeExecution(self.started)
+        self.slots.acquire(1, 10, waiting)
+        self.slots.discard(waiting)
+        self.slots.discard(waiting)
+        assert len(self.slots.waiting) == 0
+
+        self.slots.release()
+        assert self.slots.running == 0
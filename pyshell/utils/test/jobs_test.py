@@ -0,0 +1,311 @@
+#!/usr/bin/env python -t
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2012  Jonathan Delvaux <pyshell@djoproject.net>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+from time import sleep
+
+import pytest
+
+from pyshell.utils.exception import DefaultPyshellException
+from pyshell.utils.jobs import JOB_DONE
+from pyshell.utils.jobs import JOB_FAILED
+from pyshell.utils.jobs import JOB_KILLED
+from pyshell.utils.jobs import JOB_PENDING
+from pyshell.utils.jobs import JOB_RUNNING
+from pyshell.utils.jobs import JobManager
+
+
+class FakeEngine(object):
+    def __init__(self):
+        self.reason = None
+
+    def requestStop(self, reason=None, abnormal=False):
+        self.reason = reason
+
+
+def _blockingTarget(job, started, release, engine=None):
+    if engine is not None:
+        job.setEngine(engine)
+    started.set()
+    release.wait(4)
+    return None, engine
+
+
+def _failingTarget(job):
+    return Exception("fail"), None
+
+
+def _raisingTarget(job):
+    raise Exception("raise")
+
+
+def _waitingTarget(job, manager, job_ids=None):
+    manager.wait(job_ids, 4)
+    return None, None
+
+
+def _doneTarget(job, result):
+    result.append(threading.current_thread().name)
+    return None, None
+
+
+class TestJobManager(object):
+
+    def setup_method(self, method):
+        self.manager = JobManager(2)
+
+    def test_init(self):
+        assert self.manager.getSize() == 2
+        assert self.manager.getJobs() == []
+
+    def test_invalidSize(self):
+        with pytest.raises(DefaultPyshellException):
+            JobManager(0)
+
+        with pytest.raises(DefaultPyshellException):
+            self.manager.setSize("2")
+
+        with pytest.raises(DefaultPyshellException):
+            JobManager(2, queue_size=0)
+
+        with pytest.raises(DefaultPyshellException):
+            self.manager.setQueueSize(None)
+
+    def test_submit(self):
+        result = []
+        job = self.manager.submit(_doneTarget, "cmd", "name", (result,))
+        assert job.getId() == 1
+        assert job.wait(4)
+        assert job.getStatus() == JOB_DONE
+        assert job.getException() is None
+        assert job.getDuration() >= 0
+        assert result == ["name"]
+        assert self.manager.getJob(1) is job
+
+    def test_workerNameRestored(self):
+        result = []
+        self.manager.setSize(1)
+        self.manager.submit(_doneTarget, "cmd", "name", (result,))
+        job = self.manager.submit(_doneTarget, "cmd", None, (result,))
+        assert job.wait(4)
+        assert result == ["name", "pyshell-job-worker"]
+
+    def test_failed(self):
+        job = self.manager.submit(_failingTarget, "cmd")
+        assert job.wait(4)
+        assert job.getStatus() == JOB_FAILED
+        assert str(job.getException()) == "fail"
+
+    def test_raised(self):
+        job = self.manager.submit(_raisingTarget, "cmd")
+        assert job.wait(4)
+        assert job.getStatus() == JOB_FAILED
+        assert str(job.getException()) == "raise"
+
+    def test_unknownJob(self):
+        with pytest.raises(DefaultPyshellException):
+            self.manager.getJob(42)
+
+    def test_boundedPool(self):
+        started = threading.Event()
+        release = threading.Event()
+        jobs = [self.manager.submit(_blockingTarget,
+                                    "cmd",
+                                    args=(started, release,))
+                for i in range(0, 5)]
+        assert started.wait(4)
+        assert self.manager.workers == 2
+        assert jobs[4].getStatus() == JOB_PENDING
+        assert jobs[4].getDuration() is None
+
+        release.set()
+        assert self.manager.wait(timeout=4) == []
+        assert self.manager.workers == 2
+        for job in jobs:
+            assert job.getStatus() == JOB_DONE
+
+    def test_waitTimeout(self):
+        started = threading.Event()
+        release = threading.Event()
+        job = self.manager.submit(_blockingTarget,
+                                  "cmd",
+                                  args=(started, release,))
+        assert started.wait(4)
+        assert self.manager.wait([job.getId()], 0.01) == [job]
+        assert job.getStatus() == JOB_RUNNING
+        release.set()
+        assert self.manager.wait([job.getId()], 4) == []
+
+    def test_killPending(self):
+        self.manager.setSize(1)
+        started = threading.Event()
+        release = threading.Event()
+        running = self.manager.submit(_blockingTarget,
+                                      "cmd",
+                                      args=(started, release,))
+        pending = self.manager.submit(_blockingTarget,
+                                      "cmd",
+                                      args=(started, release,))
+        assert started.wait(4)
+        assert self.manager.kill(pending.getId())
+        assert pending.isFinished()
+        assert pending.getStatus() == JOB_KILLED
+        assert pending.getDuration() is None
+
+        release.set()
+        assert running.wait(4)
+        assert running.getStatus() == JOB_DONE
+
+    def test_killRunning(self):
+        started = threading.Event()
+        release = threading.Event()
+        engine = FakeEngine()
+        job = self.manager.submit(_blockingTarget,
+                                  "cmd",
+                                  args=(started, release, engine,))
+        assert started.wait(4)
+        assert self.manager.kill(job.getId(), "stop it")
+        assert engine.reason == "stop it"
+
+        release.set()
+        assert job.wait(4)
+        assert job.getStatus() == JOB_KILLED
+        assert not self.manager.kill(job.getId())
+
+    def test_killBeforeEngine(self):
+        engine = FakeEngine()
+        job = self.manager.submit(_doneTarget, "cmd", args=([],))
+        job.kill("early")
+        job.setEngine(engine)
+        assert engine.reason == "early"
+
+    def test_historyIsBounded(self):
+        manager = JobManager(1, history=2)
+        jobs = [manager.submit(_doneTarget, "cmd", args=([],))
+                for i in range(0, 4)]
+        assert manager.wait(timeout=4) == []
+        assert jobs[-1].wait(4)
+        assert [job.getId() for job in manager.getJobs()] == [3, 4]
+
+    def test_clear(self):
+        job = self.manager.submit(_doneTarget, "cmd", args=([],))
+        assert job.wait(4)
+        self.manager.clear()
+        assert self.manager.getJobs() == []
+
+    def test_shrinkPool(self):
+        started = threading.Event()
+        release = threading.Event()
+        jobs = [self.manager.submit(_blockingTarget,
+                                    "cmd",
+                                    args=(started, release,))
+                for i in range(0, 2)]
+        assert started.wait(4)
+        self.manager.setSize(1)
+        release.set()
+        assert self.manager.wait([job.getId() for job in jobs], 4) == []
+        job = self.manager.submit(_doneTarget, "cmd", args=([],))
+        assert job.wait(4)
+        assert self.manager.workers == 1
+
+    def test_doneCallback(self):
+        started = threading.Event()
+        release = threading.Event()
+        done = []
+        job = self.manager.submit(_blockingTarget,
+                                  "cmd",
+                                  args=(started, release,))
+        job.addDoneCallback(done.append)
+        assert started.wait(4)
+        assert done == []
+
+        release.set()
+        assert job.wait(4)
+        assert self.manager.wait(timeout=4) == []
+
+        # the callbacks are called just after the end of the job
+        for i in range(0, 100):
+            if len(done) > 0:
+                break
+            sleep(0.01)
+        assert done == [job]
+
+    def test_doneCallbackFinishedJob(self):
+        done = []
+        job = self.manager.submit(_doneTarget, "cmd", args=([],))
+        assert job.wait(4)
+        job.addDoneCallback(done.append)
+        assert done == [job]
+
+    def test_doneCallbackKilledPending(self):
+        self.manager.setSize(1)
+        started = threading.Event()
+        release = threading.Event()
+        done = []
+        self.manager.submit(_blockingTarget, "cmd", args=(started, release,))
+        pending = self.manager.submit(_doneTarget, "cmd", args=([],))
+        pending.addDoneCallback(done.append)
+        assert started.wait(4)
+        assert self.manager.kill(pending.getId())
+        release.set()
+        assert done == [pending]
+
+    def test_queueFull(self):
+        manager = JobManager(1, queue_size=1)
+        assert manager.getQueueSize() == 1
+        started = threading.Event()
+        release = threading.Event()
+        manager.submit(_blockingTarget, "cmd", args=(started, release,))
+        assert started.wait(4)
+        pending = manager.submit(_doneTarget, "cmd", args=([],))
+
+        with pytest.raises(DefaultPyshellException):
+            manager.submit(_doneTarget, "cmd", args=([],))
+
+        assert len(manager.getJobs()) == 2
+        manager.setQueueSize(2)
+        manager.submit(_doneTarget, "cmd", args=([],))
+        release.set()
+        assert manager.wait(timeout=4) == []
+        assert pending.getStatus() == JOB_DONE
+
+    def test_waitExcludesCurrentJob(self):
+        started = threading.Event()
+        release = threading.Event()
+        other = self.manager.submit(_blockingTarget,
+                                    "cmd",
+                                    args=(started, release,))
+        assert started.wait(4)
+        job = self.manager.submit(_waitingTarget,
+                                  "wait",
+                                  args=(self.manager,))
+        release.set()
+
+        # the waiting job only waits for the other job
+        assert job.wait(4)
+        assert job.getStatus() == JOB_DONE
+        assert other.getStatus() == JOB_DONE
+        assert self.manager.getCurrentJob() is None
+
+    def test_waitItself(self):
+        job = self.manager.submit(_waitingTarget,
+                                  "wait",
+                                  args=(self.manager, [1],))
+        assert job.wait(4)
+        assert job.getStatus() == JOB_FAILED
+        assert isinstance(job.getException(), DefaultPyshellException)
@@ -16,7 +16,14 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import random
+
+import pytest
+
+from pyshell.utils.exception import DefaultPyshellException
 from pyshell.utils.parsing import Parser
+from pyshell.utils.parsing import ParserCache
+from pyshell.utils.parsing import buildCommandLine
 
 
 class TestParser(object):
@@ -364,3 +371,120 @@ class TestParser(object):
         assert len(p) == 2
         assert p == [(('aaa', 'bbb'), (), (),), (('ccc&c',), (), (),)]
         assert not p.isToRunInBackground()
+
+    # ### TOKENIZER ### #
+
+    def test_tokenizerMatchCharacterParser(self):
+        rand = random.Random(0x5eed)
+        alphabet = 'ab1.$-&|"\\ \t\n\r'
+
+        for i in range(0, 5000):
+            string = "".join(rand.choice(alphabet)
+                             for j in range(0, rand.randint(0, 24)))
+
+            scanned = Parser(string)
+            scanned.parse()
+            reference = Parser(string)
+            reference.parse(by_character=True)
+
+            assert scanned == reference, repr(string)
+            assert (scanned.isToRunInBackground() ==
+                    reference.isToRunInBackground()), repr(string)
+            assert scanned.isParsed() == reference.isParsed(), repr(string)
+
+    def test_tokenizerQuotedAndEscaped(self):
+        p = Parser('echo "a | b" c\\ d "$e" -"1" &')
+        p.parse()
+        assert p == [(('echo', 'a | b', 'c d', '$e', '-1'), (3,), (),)]
+        assert p.isToRunInBackground()
+
+
+class TestBuildCommandLine(object):
+
+    def _parse(self, tokens):
+        parser = Parser(buildCommandLine(tokens))
+        parser.parse()
+        return parser
+
+    def test_plainTokens(self):
+        assert buildCommandLine(("echo", "a", "b",)) == "echo a b"
+
+    def test_wrappedTokens(self):
+        tokens = ("echo", "a | b", "c d", "e&", "f\tg",)
+        parser = self._parse(tokens)
+        assert list(parser) == [(tokens, (), (),)]
+        assert not parser.isToRunInBackground()
+
+    def test_escapedTokens(self):
+        tokens = ("echo", "$a", "b\"c", "d\\e", "f$",)
+        parser = self._parse(tokens)
+        assert list(parser) == [(tokens, (), (),)]
+
+    def test_dashedParameter(self):
+        tokens = ("cmd", "-flag", "value",)
+        parser = self._parse(tokens)
+        assert list(parser) == [(tokens, (), (1,),)]
+
+
+class TestParserCache(object):
+
+    def setup_method(self, method):
+        self.cache = ParserCache(2)
+
+    def test_invalidSize(self):
+        with pytest.raises(DefaultPyshellException):
+            ParserCache(-1)
+
+        with pytest.raises(DefaultPyshellException):
+            self.cache.setSize("2")
+
+    def test_invalidString(self):
+        with pytest.raises(DefaultPyshellException):
+            self.cache.getParser(None)
+
+    def test_hit(self):
+        first = self.cache.getParser("aa $bb -cc | dd &")
+        second = self.cache.getParser("aa $bb -cc | dd &")
+
+        assert first is not second
+        assert first == second
+        assert second.isParsed()
+        assert second.isToRunInBackground()
+        assert self.cache.getStatistics() == (2, 1, 1, 1,)
+
+    def test_hitIsolation(self):
+        first = self.cache.getParser("aa bb")
+        del first[:]
+
+        second = self.cache.getParser("aa bb")
+        assert second == [(('aa', 'bb'), (), (),)]
+
+    def test_leastRecentlyUsedEviction(self):
+        self.cache.getParser("aa")
+        self.cache.getParser("bb")
+        self.cache.getParser("aa")
+        self.cache.getParser("cc")
+
+        assert list(self.cache.entries.keys()) == ["aa", "cc"]
+        assert self.cache.getStatistics() == (2, 2, 1, 3,)
+
+    def test_setSize(self):
+        self.cache.getParser("aa")
+        self.cache.getParser("bb")
+        self.cache.setSize(1)
+
+        assert list(self.cache.entries.keys()) == ["bb"]
+
+    def test_disabled(self):
+        self.cache.setSize(0)
+        parser = self.cache.getParser("aa")
+
+        assert parser == [(('aa',), (), (),)]
+        assert self.cache.getStatistics() == (0, 0, 0, 1,)
+
+    def test_clear(self):
+        self.cache.getParser("aa")
+        self.cache.getParser("aa")
+        self.cache.clear()
+
+        assert self.cache.getStatistics() == (2, 0, 0, 0,)
@@ -18,6 +18,8 @@
 
 from pyshell.arg.checker.default import DefaultChecker
 from pyshell.arg.checker.integer import IntegerArgChecker
+from pyshell.command.command import UniCommand
+from pyshell.command.engine import EngineV3
 from pyshell.system.manager.parent import ParentManager
 from pyshell.system.parameter.context import ContextParameter
 from pyshell.system.parameter.environment import EnvironmentParameter
@@ -250,3 +252,53 @@ class TestPostProcess(object):
         assert out == ("     TOTO         tata       plapplap\n      TUTUTU\n"
                        "      aaaaaaaaaa   bbbbbbbb   cccccc\n      lalala"
                        "       lulu\n")
+
+    ###
+
+    def _callBunch(self, method, bunch):
+        # the engine checks every data with the checker of the data method
+        # then gives the checked arguments to the bunch method
+        engine = EngineV3([UniCommand(process=method)],
+                          [[]],
+                          [[{}, {}, {}]],
+                          self.params)
+        data_list = [method.checker.checkArgs(args, {}, engine)
+                     for args in bunch]
+        return method.bunchProcess(data_list)
+
+    def test_listResultHandlerBunch(self, capsys):
+        r = self._callBunch(listResultHandler, ((), ("aa", 42,), "bb",))
+        out, err = capsys.readouterr()
+        assert out == "     aa\n     42\n     bb\n"
+        assert r == [[], ["aa", 42], ["bb"]]
+
+    def test_listFlatResultHandlerBunch(self, capsys):
+        r = self._callBunch(listFlatResultHandler, (("aa", 42,), (), "bb",))
+        out, err = capsys.readouterr()
+        assert out == "     aa 42\n     \n     bb\n"
+        assert r == [["aa", 42], [], ["bb"]]
+
+    def test_printStringCharResultBunch(self, capsys):
+        r = self._callBunch(printStringCharResult, ((60, 42,), (60,),))
+        out, err = capsys.readouterr()
+        assert out == "     <*\n     <\n"
+        assert r == [[60, 42], [60]]
+
+    def test_printBytesAsStringBunch(self, capsys):
+        r = self._callBunch(printBytesAsString, ((0x25, 0x42,), (), (0x25,),))
+        out, err = capsys.readouterr()
+        assert out == "     2542\n     \n     25\n"
+        assert r == [[0x25, 0x42], [], [0x25]]
+
+    def test_printColumnWithouHeaderBunch(self, capsys):
+        self._callBunch(printColumnWithouHeader,
+                        ((("TOTO", "tata"), "TUTUTU",), (), ("TOTO",),))
+        out, err = capsys.readouterr()
+        assert out == "     TOTO    tata\n     TUTUTU\n     TOTO\n"
+
+    def test_printColumnBunch(self, capsys):
+        self._callBunch(printColumn, ((("TOTO", "tata"), "TUTUTU",),
+                                      ("TOTO", "TUTUTU",),))
+        out, err = capsys.readouterr()
+        assert out == ("     TOTO    tata\n      TUTUTU\n     TOTO\n"
+                       "      TUTUTU\n")
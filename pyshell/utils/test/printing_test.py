@@ -17,6 +17,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import sys
+import threading
 
 import pytest
 
@@ -261,6 +262,41 @@ class TestPrinting(object):
         out, err = capsys.readouterr()
         assert out == "     plop\n"
 
+    def test_cprintCapture(self, capsys):
+        p = Printer.getInstance()
+
+        self.shellContext.setSelectedValue(CONTEXT_EXECUTION_SHELL)
+        p.startCapture()
+        try:
+            assert p.isCapturing()
+            p.cprint(p.formatRed("plop"))
+            p.cprint("plip\nplap")
+        finally:
+            lines = p.stopCapture()
+
+        # neither coloration nor indentation in the captured output
+        out, err = capsys.readouterr()
+        assert out == ""
+        assert lines == ["plop", "plip\nplap"]
+        assert not p.isCapturing()
+        assert p.stopCapture() == []
+
+    def test_cprintCaptureOtherThread(self, capsys):
+        p = Printer.getInstance()
+        captured = []
+
+        def capture():
+            p.startCapture()
+            p.cprint("plop")
+            captured.extend(p.stopCapture())
+
+        thread = threading.Thread(target=capture)
+        thread.start()
+        thread.join(4)
+
+        assert captured == ["plop"]
+        assert not p.isCapturing()
+
     def test_toLineString(self):
         assert _toLineString((), {}) == ""
 
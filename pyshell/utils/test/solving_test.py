@@ -27,12 +27,14 @@ from pyshell.arg.checker.list import ListArgChecker
 from pyshell.arg.decorator import shellMethod
 from pyshell.command.command import MultiCommand
 from pyshell.command.command import UniCommand
+from pyshell.command.registry import CommandRegistry
 from pyshell.system.manager.parent import ParentManager
 from pyshell.system.manager.variable import VariableParameterManager
 from pyshell.system.parameter.variable import VariableParameter
 from pyshell.utils.exception import DefaultPyshellException
 from pyshell.utils.parsing import Parser
 from pyshell.utils.solving import Solver
+from pyshell.utils.solving import SolverCache
 from pyshell.utils.solving import _addValueToIndex
 from pyshell.utils.solving import _isValidBooleanValueForChecker
 from pyshell.utils.solving import _removeEveryIndexUnder
@@ -268,6 +270,29 @@ class TestSolving(object):
         assert len(mappedArgsList[0][1]) == 0
         assert len(mappedArgsList[0][2]) == 0
 
+    # several vars with a size different of 1 and parameters around them
+    def test_var8(self):
+        p = Parser("plop -a $empty -b $many -c $plop -d")
+        p.parse()
+        s = Solver()
+
+        self.var.setParameter("empty", VariableParameter(()))
+        self.var.setParameter("many", VariableParameter(("x", "y", "z",)))
+        self.var.setParameter("plop", VariableParameter(("uhuh",)))
+        s.variables_container = self.var
+
+        token_list = s._solveVariables(p[0][0],
+                                       p[0][1],
+                                       list(p[0][2]))
+        assert token_list == ["plop", "-a", "-b", "x", "y", "z", "-c",
+                              "uhuh", "-d"]
+
+        param_spotted = list(p[0][2])
+        s._solveVariables(p[0][0], p[0][1], param_spotted)
+        assert param_spotted == [1, 2, 6, 8]
+        for index in param_spotted:
+            assert token_list[index].startswith("-")
+
     # ## SOLVING COMMAND ## #
 
     def test_solving1(self):  # ambiguous command
@@ -1194,3 +1219,99 @@ class TestSolving(object):
         assert not _isValidBooleanValueForChecker("plop")
         assert not _isValidBooleanValueForChecker("falo")
         assert not _isValidBooleanValueForChecker("trut")
+
+
+class TestSolverCache(object):
+
+    def setup_method(self, method):
+        self.registry = CommandRegistry()
+        self.plop = UniCommand(plopMeth)
+        self.registry.insert(("plop",), self.plop)
+        self.plopPlap = UniCommand(plopMeth)
+        self.registry.insert(("plop", "plap",), self.plopPlap)
+
+        self.var = VariableParameterManager(ParentManager())
+        self.cache = SolverCache()
+
+    def _solve(self, string, registry=None):
+        if registry is None:
+            registry = self.registry
+
+        p = Parser(string)
+        p.parse()
+        commands, args, mapped, names = Solver(self.cache).solve(p,
+                                                                 registry,
+                                                                 self.var)
+        return commands[0], args[0], names[0]
+
+    def test_hit(self):
+        assert self._solve("plop a b") == (self.plop, ["a", "b"], ("plop",))
+        assert self._solve("plop a c") == (self.plop, ["a", "c"], ("plop",))
+        assert self.cache.getStatistics() == (1024, 1, 1, 1,)
+
+    def test_longestPath(self):
+        assert self._solve("plop plap a") == (self.plopPlap,
+                                              ["a"],
+                                              ("plop", "plap",))
+        assert self._solve("plop a") == (self.plop, ["a"], ("plop",))
+        assert self._solve("plop plap") == (self.plopPlap,
+                                            [],
+                                            ("plop", "plap",))
+        assert self._solve("plop") == (self.plop, [], ("plop",))
+
+        assert self._solve("plop plap b") == (self.plopPlap,
+                                              ["b"],
+                                              ("plop", "plap",))
+        assert self._solve("plop b") == (self.plop, ["b"], ("plop",))
+        assert self._solve("plop") == (self.plop, [], ("plop",))
+        assert self.cache.getStatistics()[2:] == (3, 4,)
+
+    def test_leaf(self):
+        for arg in ("a", "b", "plop",):
+            assert self._solve("plop plap "+arg) == (self.plopPlap,
+                                                     [arg],
+                                                     ("plop", "plap",))
+
+        assert list(self.cache.entries.keys()) == [("plop", "plap",)]
+        assert self.cache.getStatistics()[2:] == (2, 1,)
+
+    def test_generationInvalidation(self):
+        assert self._solve("plop a") == (self.plop, ["a"], ("plop",))
+
+        plop_a = UniCommand(plopMeth)
+        self.registry.insert(("plop", "a",), plop_a)
+        assert self._solve("plop a") == (plop_a, [], ("plop", "a",))
+
+        self.registry.remove(("plop", "a",))
+        assert self._solve("plop a") == (self.plop, ["a"], ("plop",))
+        assert self.cache.getStatistics()[2:] == (0, 3,)
+
+    def test_unknownCommandNotCached(self):
+        for i in range(0, 2):
+            with pytest.raises(DefaultPyshellException):
+                self._solve("plip")
+
+        assert self.cache.getStatistics()[1] == 0
+
+    def test_registryWithoutGeneration(self):
+        mltries = multiLevelTries()
+        mltries.insert(("plop",), self.plop)
+
+        self._solve("plop a", mltries)
+        self._solve("plop a", mltries)
+        assert self.cache.getStatistics() == (1024, 0, 0, 0,)
+
+    def test_sizeLimit(self):
+        self.cache = SolverCache(2)
+        self._solve("plop a")
+        self._solve("plop b")
+        self._solve("plop c")
+
+        assert self.cache.getStatistics() == (2, 1, 0, 3,)
+
+    def test_clear(self):
+        self._solve("plop a")
+        self._solve("plop a")
+        self.cache.clear()
+
+        assert self.cache.getStatistics() == (1024, 0, 0, 0,)
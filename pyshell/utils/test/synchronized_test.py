@@ -16,8 +16,13 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import threading
 from threading import Lock
 
+import pytest
+
+from pyshell.utils.synchronized import ReadWriteLock
+from pyshell.utils.synchronized import sharedSynchronous
 from pyshell.utils.synchronized import synchronous
 
 
@@ -31,9 +36,152 @@ class SynchronizedTester(object):
         return 42
 
 
+class SharedTester(object):
+
+    def __init__(self, during_read=None):
+        self._internalLock = ReadWriteLock()
+        self.during_read = during_read
+        self.calls = 0
+
+    @sharedSynchronous()
+    def reader(self):
+        self.calls += 1
+        if self.during_read is not None:
+            during_read, self.during_read = self.during_read, None
+            during_read(self)
+
+        return self.calls
+
+    @sharedSynchronous()
+    def raiser(self):
+        self.calls += 1
+        raise KeyError("plop")
+
+    @synchronous()
+    def writer(self):
+        return 42
+
+
+def _startThread(target):
+    thread = threading.Thread(target=target)
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
 class TestSynchronized(object):
     # test synchronized, simple execution test without other thread
 
     def test_synchronized1(self):
         st = SynchronizedTester()
         assert st.tester() == 42
+
+    def test_sharedSynchronized1(self):  # no writer, one execution
+        st = SharedTester()
+        assert st.reader() == 1
+        assert st.writer() == 42
+        assert st.calls == 1
+
+    def test_sharedSynchronized2(self):  # a writer updated during the read
+        def write(tester):
+            tester.writer()
+
+        st = SharedTester(write)
+        assert st.reader() == 2
+
+    def test_sharedSynchronized3(self):  # the writer holds the lock
+        st = SharedTester()
+        st._internalLock.acquire()
+        thread = _startThread(st.reader)
+        thread.join(0.1)
+
+        # the reader waits for the writer
+        assert thread.is_alive()
+        assert st.calls == 0
+        st._internalLock.release()
+        thread.join(4)
+        assert not thread.is_alive()
+        assert st.calls == 1
+
+    def test_sharedSynchronized4(self):  # exception without writer
+        st = SharedTester()
+        with pytest.raises(KeyError):
+            st.raiser()
+        assert st.calls == 1
+
+
+class TestReadWriteLock(object):
+
+    def setup_method(self, method):
+        self.lock = ReadWriteLock()
+
+    def test_version(self):
+        assert self.lock.version == 0
+        self.lock.acquireRead()
+        self.lock.releaseRead()
+        assert self.lock.version == 0
+
+        with self.lock:
+            assert self.lock.version == 1
+        assert self.lock.version == 2
+
+    def test_sharedReaders(self):
+        self.lock.acquireRead()
+        thread = _startThread(self.lock.acquireRead)
+        thread.join(4)
+        assert not thread.is_alive()
+        self.lock.releaseRead()
+        self.lock.releaseRead()
+
+    def test_writerWaitsForReaders(self):
+        acquired = threading.Event()
+
+        def write():
+            with self.lock:
+                acquired.set()
+
+        self.lock.acquireRead()
+        thread = _startThread(write)
+        assert not acquired.wait(0.1)
+        self.lock.releaseRead()
+        assert acquired.wait(4)
+        thread.join(4)
+
+    def test_waitingWriterBlocksReaders(self):
+        read = threading.Event()
+
+        def readAndRelease():
+            self.lock.acquireRead()
+            read.set()
+            self.lock.releaseRead()
+
+        self.lock.acquireRead()
+        writer = _startThread(self.lock.acquire)
+
+        # wait the writer to be registered
+        while self.lock._waiting_writers == 0:
+            writer.join(0.01)
+
+        _startThread(readAndRelease)
+        assert not read.wait(0.1)
+
+        self.lock.releaseRead()
+        writer.join(4)
+        assert not writer.is_alive()
+        assert not read.is_set()
+
+        self.lock.release()
+        assert read.wait(4)
+
+    def test_exclusiveWriters(self):
+        acquired = threading.Event()
+
+        def write():
+            with self.lock:
+                acquired.set()
+
+        self.lock.acquire()
+        _startThread(write)
+        assert not acquired.wait(0.1)
+        self.lock.release()
+        assert acquired.wait(4)